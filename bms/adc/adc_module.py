@@ -1,6 +1,13 @@
 import numpy as np
 import pandas as pd
 
+from adc.calibration import ChannelCalibration, ranges_from_calibrations
+from utils.quantized_store import QuantizedWriter, is_quantized_file, save_ranges
+from utils.sim_results import iter_results
+
+# 양자화 대상 채널 (열 순서는 process_block 의 채널 축 순서)
+CHANNELS = ["Cell current [A]", "Terminal voltage [V]", "X-averaged cell temperature [K]"]
+
 
 class ADC:
     def __init__(self, adc_bits=16,
@@ -9,11 +16,12 @@ class ADC:
                  temp_adc_min=224.15, temp_adc_max=332.15,
                  gaussian_sigma=1, random_seed=42,
                  log_file="/home/sanggeun/battery/output_log2.csv",
-                 output_file="/home/sanggeun/battery/quantized_log.csv"):
+                 output_file="/home/sanggeun/battery/quantized_log.csv",
+                 cell=0, calibrations=None):
         """
         ADC 클래스 초기화
         Args:
-            adc_bits (int): ADC 비트 수 (기본값: 16)
+            adc_bits (int): ADC 비트 수 (기본값: 16, calibrations 로 채널마다 다르게 지정 가능)
             current_adc_min (float): 전류 ADC의 최소값
             current_adc_max (float): 전류 ADC의 최대값
             voltage_adc_min (float): 전압 ADC의 최소값
@@ -21,31 +29,48 @@ class ADC:
             temp_adc_min (float): 온도 ADC의 최소값 (K)
             temp_adc_max (float): 온도 ADC의 최대값 (K)
             gaussian_sigma (float): Gaussian 노이즈의 표준편차 스케일 (기본값: 1)
-            random_seed (int): 난수 생성기의 시드값 (기본값: 42)
+            random_seed (int): 난수 생성기의 시드값, 채널별 독립 Generator 를 만드는 데 사용 (기본값: 42)
+            cell (int): 시뮬레이션 결과에서 사용할 셀 번호 (기본값: 0)
+            calibrations (dict): 채널 이름 --> ChannelCalibration (지정한 채널은 위 범위/비트 수 대신 사용,
+                offset/gain trim 과 노이즈 표준편차 포함)
         """
         self.log_file = log_file
         self.output_file = output_file
-        self.adc_bits = adc_bits
-
-        self.current_adc_min = current_adc_min
-        self.current_adc_max = current_adc_max
-        self.voltage_adc_min = voltage_adc_min
-        self.voltage_adc_max = voltage_adc_max
-        self.temp_adc_min = temp_adc_min
-        self.temp_adc_max = temp_adc_max
+        self.cell = cell
 
         self.gaussian_sigma = gaussian_sigma
         self.random_seed = random_seed
-        np.random.seed(self.random_seed)
+        # 채널별 독립 난수 스트림 (전역 np.random 상태를 건드리지 않음)
+        seeds = np.random.SeedSequence(self.random_seed).spawn(len(CHANNELS))
+        self.rngs = {col: np.random.default_rng(seed) for col, seed in zip(CHANNELS, seeds)}
+
+        # 채널별 calibration (양자화와 디코딩이 같은 값을 사용)
+        defaults = {
+            "Cell current [A]": ChannelCalibration(current_adc_min, current_adc_max, adc_bits),
+            "Terminal voltage [V]": ChannelCalibration(voltage_adc_min, voltage_adc_max, adc_bits),
+            "X-averaged cell temperature [K]": ChannelCalibration(temp_adc_min, temp_adc_max, adc_bits),
+        }
+        defaults.update(calibrations or {})
+        self.calibrations = {col: defaults[col] for col in CHANNELS}
+        current, voltage, temp = (self.calibrations[col] for col in CHANNELS)
+        # 채널마다 비트 수가 다를 수 있으므로 코드 저장 형식은 가장 넓은 채널 기준
+        self.channel_bits = [self.calibrations[col].bits for col in CHANNELS]
+        self.adc_bits = max(self.channel_bits)
+        self.current_adc_min, self.current_adc_max = current.adc_min, current.adc_max
+        self.voltage_adc_min, self.voltage_adc_max = voltage.adc_min, voltage.adc_max
+        self.temp_adc_min, self.temp_adc_max = temp.adc_min, temp.adc_max
 
-        # 최소 resolution 및 표준편차 계산
-        self.current_min_resolution = (self.current_adc_max - self.current_adc_min) / (2 ** self.adc_bits)
-        self.voltage_min_resolution = (self.voltage_adc_max - self.voltage_adc_min) / (2 ** self.adc_bits)
-        self.temp_min_resolution = (self.temp_adc_max - self.temp_adc_min) / (2 ** self.adc_bits)
+        # 최소 resolution 및 표준편차
+        self.current_min_resolution = current.resolution
+        self.voltage_min_resolution = voltage.resolution
+        self.temp_min_resolution = temp.resolution
 
-        self.current_noise_std_dev = self.current_min_resolution * 5
-        self.voltage_noise_std_dev = self.voltage_min_resolution * 5
-        self.temp_noise_std_dev = self.temp_min_resolution * 5
+        self.current_noise_std_dev = current.noise_sigma
+        self.voltage_noise_std_dev = voltage.noise_sigma
+        self.temp_noise_std_dev = temp.noise_sigma
+
+        # 채널별 노이즈 표준편차 (CHANNELS 순서)
+        self.noise_std_devs = np.array([self.calibrations[col].noise_sigma for col in CHANNELS])
 
     def add_noise(self, data, data_type="Cell current [A]"):
         """
@@ -56,14 +81,10 @@ class ADC:
         Returns:
             노이즈가 추가된 데이터
         """
-        if data_type == "Cell current [A]":
-            noise = np.random.normal(0, self.current_noise_std_dev, data.shape)
-        elif data_type == "Terminal voltage [V]":
-            noise = np.random.normal(0, self.voltage_noise_std_dev, data.shape)
-        elif data_type == "X-averaged cell temperature [K]":
-            noise = np.random.normal(0, self.temp_noise_std_dev, data.shape)
-        else:
+        if data_type not in self.rngs:
             raise ValueError("Unsupported data_type")
+        std_dev = self.noise_std_devs[CHANNELS.index(data_type)]
+        noise = self.rngs[data_type].normal(0, std_dev, np.shape(data))
         return data + noise
 
     def quantize_data(self, data, data_type="Cell current [A]"):
@@ -75,41 +96,180 @@ class ADC:
         Returns:
             numpy.array: 양자화된 정수 데이터
         """
-        if data_type == "Cell current [A]":
-            adc_min, adc_max = self.current_adc_min, self.current_adc_max
-        elif data_type == "Terminal voltage [V]":
-            adc_min, adc_max = self.voltage_adc_min, self.voltage_adc_max
-        else:
-            adc_min, adc_max = self.temp_adc_min, self.temp_adc_max
+        # 알 수 없는 data_type 은 온도 채널 범위 사용
+        return self.calibrations.get(data_type, self.calibrations[CHANNELS[2]]).quantize(data)
+
+    def quantize_depths(self, data, bits, data_type="Cell current [A]"):
+        """
+        한 trace 를 여러 비트 수로 한 번에 양자화 (비트 수 민감도 분석용)
+        Args:
+            data (numpy.array): (samples,) 양자화할 데이터 (노이즈 포함)
+            bits (iterable): 비트 수 목록
+            data_type (str): 채널 이름 (CHANNELS)
+        Returns:
+            numpy.array: (depths, samples) 양자화된 정수 데이터
+        """
+        return self.calibrations[data_type].quantize_depths(data, bits)
+
+    def ranges(self):
+        """
+        디코딩에 필요한 ADC 설정 (run_bms 의 adc dict 형식, 디코더는 calibrations_from_ranges 로 복원)
+        Returns:
+            dict: q_levels 및 채널별 최소/최대값, offset/gain trim, 노이즈 표준편차
+        """
+        return ranges_from_calibrations(self.calibrations)
+
+    def process_block(self, values):
+        """
+        세 채널 노이즈 추가 --> 채널별 ChannelCalibration.quantize 로 양자화 (디코딩과 같은 calibration 사용)
+        Args:
+            values (numpy.array): (samples, 3) 채널 데이터 (CHANNELS 순서)
+        Returns:
+            tuple: (노이즈가 추가된 (samples, 3) 배열, 양자화된 (samples, 3) 정수 배열)
+        """
+        values = np.asarray(values, dtype=float)
+        n = values.shape[0]
+        noise = np.empty_like(values)
+        for k, col in enumerate(CHANNELS):
+            noise[:, k] = self.rngs[col].normal(0, self.noise_std_devs[k], n)
+        noisy = values + noise
+
+        quantized = np.empty(values.shape, dtype=np.int64)
+        for k, col in enumerate(CHANNELS):
+            quantized[:, k] = self.calibrations[col].quantize(noisy[:, k])
+        return noisy, quantized
+
+    def _channel_values(self, data):
+        # (samples, 3) 채널 배열 (셀 변수는 self.cell 열만 사용)
+        columns = []
+        for col in CHANNELS:
+            series = np.asarray(data[col], dtype=float)
+            columns.append(series[:, self.cell] if series.ndim == 2 else series)
+        return np.column_stack(columns)
+
+    def process_arrays(self, data):
+        """
+        시뮬레이션 결과 배열에 노이즈 추가 --> 양자화 (파일 입출력 없음)
+        Args:
+            data (dict): "Time [s]" 및 채널별 배열 (셀 변수는 (time,) 또는 (time, cells))
+        Returns:
+            dict: 원본, "Noisy ...", "Quantized ..." 채널 배열
+        """
+        values = self._channel_values(data)
+        noisy, quantized = self.process_block(values)
 
-        q_levels = 2 ** self.adc_bits
-        rng = adc_max - adc_min
-        clipped = np.clip(data, adc_min, adc_max)
-        scaled = (clipped - adc_min) / rng * (q_levels - 1)
-        return np.floor(scaled).astype(int)
+        result = {"Time [s]": np.asarray(data["Time [s]"], dtype=float)}
+        for k, col in enumerate(CHANNELS):
+            result[col] = values[:, k]
+            result[f"Noisy {col}"] = noisy[:, k]
+            result[f"Quantized {col}"] = quantized[:, k]
+        return result
 
-    def process_adc_data(self):
+    def process_depths(self, data, bits):
+        """
+        노이즈는 한 번만 추가하고 여러 비트 수로 한 번에 양자화 (파일 입출력 없음)
+        decode_quantized 결과는 (depths, samples) 이므로 estimate_soc_batch 의 셀 축으로 바로 사용 가능
+        Args:
+            data (dict): process_arrays 입력 형식
+            bits (iterable): 비트 수 목록
+        Returns:
+            dict: "Time [s]", "bits", 채널별 원본 / "Noisy ..." (samples,) 및 "Quantized ..." (depths, samples)
+        """
+        values = self._channel_values(data)
+        noisy, _ = self.process_block(values)
+
+        result = {"Time [s]": np.asarray(data["Time [s]"], dtype=float), "bits": np.asarray(bits, dtype=int)}
+        for k, col in enumerate(CHANNELS):
+            result[col] = values[:, k]
+            result[f"Noisy {col}"] = noisy[:, k]
+            result[f"Quantized {col}"] = self.quantize_depths(noisy[:, k], bits, col)
+        return result
+
+    def ensemble_seeds(self, n_realizations, seed=None):
+        """
+        ensemble 멤버별 random_seed (멤버 k 의 노이즈는 ADC(random_seed=seeds[k]) 단일 실행과 같음)
+        Args:
+            n_realizations (int): 멤버 수
+            seed (int): ensemble 시드 (None 이면 self.random_seed)
+        Returns:
+            list: 멤버별 정수 시드
+        """
+        sequence = np.random.SeedSequence(self.random_seed if seed is None else seed)
+        return [int(s) for s in sequence.generate_state(n_realizations, dtype=np.uint64)]
+
+    def process_ensemble(self, data, n_realizations, seed=None):
+        """
+        독립 Generator 로 만든 K 개의 노이즈 realization 을 한 번에 양자화 (Monte-Carlo ensemble)
+        decode_quantized 결과는 (K, samples) 이므로 estimate_soc_batch 의 셀 축으로 바로 사용 가능
+        Args:
+            data (dict): process_arrays 입력 형식
+            n_realizations (int): realization 수 K
+            seed (int): ensemble 시드 (None 이면 self.random_seed)
+        Returns:
+            dict: "Time [s]", "seeds", 채널별 원본 (samples,) 및 "Noisy ...", "Quantized ..." (K, samples)
+        """
+        values = self._channel_values(data)
+        seeds = self.ensemble_seeds(n_realizations, seed)
+        n = values.shape[0]
+        noisy = np.empty((len(CHANNELS), n_realizations, n))
+        for k, member_seed in enumerate(seeds):
+            # 멤버마다 ADC.__init__ 과 같은 방식으로 채널별 독립 스트림 생성
+            children = np.random.SeedSequence(member_seed).spawn(len(CHANNELS))
+            for c, child in enumerate(children):
+                noisy[c, k] = np.random.default_rng(child).normal(0, self.noise_std_devs[c], n)
+        noisy += values.T[:, None, :]
+
+        result = {"Time [s]": np.asarray(data["Time [s]"], dtype=float), "seeds": np.array(seeds, dtype=np.uint64)}
+        for c, col in enumerate(CHANNELS):
+            result[col] = values[:, c]
+            result[f"Noisy {col}"] = noisy[c]
+            result[f"Quantized {col}"] = self.calibrations[col].quantize(noisy[c])
+        return result
+
+    def iter_process(self, chunks):
+        """
+        시뮬레이션 결과 블록을 차례로 처리하는 generator (블록 크기만큼만 메모리 사용)
+        Args:
+            chunks (iterable): process_arrays 입력 형식의 dict 블록
+        Yields:
+            dict: 블록별 처리 결과
+        """
+        for chunk in chunks:
+            yield self.process_arrays(chunk)
+
+    def process_adc_data(self, chunk_size=None):
         """
         log file 읽어 노이즈 추가 --> 양자화 --> 저장
+        CSV 출력은 채널별 비트 수/범위/trim 을 <output_file>.ranges.json 에 함께 저장 (디코딩에서 사용)
+        Args:
+            chunk_size (int): 한 번에 읽고 쓰는 샘플 수 (None 이면 전체를 한 번에 처리)
+                output_file 확장자가 .qadc 이면 양자화 코드만 정수 binary 로 저장
         Returns:
-            pandas.DataFrame: 처리된 데이터프레임
-        """
-        cols = [
-            "Time [s]", "Cell current [A]", "Terminal voltage [V]",
-            "X-averaged cell temperature [K]", "Battery open-circuit voltage [V]",
-            "Pack terminal voltage [V]"
-        ]
-        df = pd.read_csv(self.log_file, names=cols)
-        for col in ["Cell current [A]", "Terminal voltage [V]", "X-averaged cell temperature [K]"]:
-            series = pd.to_numeric(df[col].str.replace(r'[\[\]]', '', regex=True), errors="coerce")
-            
-            # 노이즈 추가 -> Gaussian 필터 -> 양자화
-            noisy = self.add_noise(series, col)
-            quantized = self.quantize_data(noisy, col)
-            df[f"Noisy {col}"] = noisy
-            df[f"Quantized {col}"] = quantized
-        df.to_csv(self.output_file, index=False)
-        return df
+            pandas.DataFrame: 처리된 데이터프레임 (chunk_size 를 지정하면 None)
+        """
+        blocks = self.iter_process(iter_results(self.log_file, chunk_size))
+        if is_quantized_file(self.output_file):
+            return self._write_quantized(blocks, keep_frame=chunk_size is None)
+        save_ranges(self.output_file, self.ranges())
+        if chunk_size is None:
+            df = pd.DataFrame(next(blocks))
+            df.to_csv(self.output_file, index=False)
+            return df
+
+        for i, block in enumerate(blocks):
+            pd.DataFrame(block).to_csv(self.output_file, mode="w" if i == 0 else "a",
+                                       header=i == 0, index=False)
+        return None
+
+    def _write_quantized(self, blocks, keep_frame):
+        frames = []
+        with QuantizedWriter(self.output_file, self.ranges(), self.adc_bits) as writer:
+            for block in blocks:
+                codes = np.column_stack([block[f"Quantized {col}"] for col in CHANNELS])
+                writer.append(block["Time [s]"], codes)
+                if keep_frame:
+                    frames.append(pd.DataFrame(block))
+        return pd.concat(frames, ignore_index=True) if frames else None
 
     def run(self):
         self.process_adc_data()
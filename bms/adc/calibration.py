@@ -0,0 +1,196 @@
+import numpy as np
+
+# ranges dict (ADC.ranges() 형식) 의 채널 접두어 (adc.adc_module.CHANNELS 순서)
+RANGE_PREFIXES = {
+    "Cell current [A]": "current",
+    "Terminal voltage [V]": "voltage",
+    "X-averaged cell temperature [K]": "temp",
+}
+
+# 채널별 기본 ADC 입력 범위 (ADC 기본값과 동일)
+DEFAULT_CHANNEL_RANGES = {
+    "Cell current [A]": (-9, 9),
+    "Terminal voltage [V]": (2.33, 4.37),
+    "X-averaged cell temperature [K]": (224.15, 332.15),
+}
+
+# noise_sigma 를 지정하지 않으면 (range / 2 ** bits) * NOISE_LSB
+NOISE_LSB = 5
+
+
+class ChannelCalibration:
+    def __init__(self, adc_min, adc_max, bits=16, offset=0.0, gain=1.0, noise_sigma=None):
+        """
+        ADC 채널 하나의 calibration (ADC 양자화와 디코딩이 같은 객체를 사용)
+        front-end 는 측정값 = gain * 입력 + offset 으로 보고, 디코딩에서 trim 을 되돌림
+        Args:
+            adc_min (float): ADC 입력 범위 최소값
+            adc_max (float): ADC 입력 범위 최대값
+            bits (int): ADC 비트 수
+            offset (float): offset trim (채널 단위)
+            gain (float): gain trim
+            noise_sigma (float): Gaussian 노이즈 표준편차 (채널 단위, None 이면 NOISE_LSB * resolution)
+        """
+        if adc_max <= adc_min:
+            raise ValueError("adc_max must be greater than adc_min")
+        if gain == 0:
+            raise ValueError("gain must be non-zero")
+        self.adc_min = float(adc_min)
+        self.adc_max = float(adc_max)
+        self.bits = int(bits)
+        self.offset = float(offset)
+        self.gain = float(gain)
+        self.noise_sigma = NOISE_LSB * self.resolution if noise_sigma is None else float(noise_sigma)
+
+    @property
+    def span(self):
+        return self.adc_max - self.adc_min
+
+    @property
+    def q_levels(self):
+        return 2 ** self.bits
+
+    @property
+    def resolution(self):
+        """
+        최소 resolution (range / 2 ** bits)
+        """
+        return self.span / self.q_levels
+
+    def _levels(self, bits):
+        bits = self.bits if bits is None else bits
+        return 2.0 ** np.asarray(bits, dtype=float) - 1
+
+    def measure(self, values):
+        """
+        입력값에 gain/offset 을 적용하고 ADC 범위로 clip
+        """
+        return np.clip(self.gain * np.asarray(values, dtype=float) + self.offset, self.adc_min, self.adc_max)
+
+    def quantize(self, values, bits=None):
+        """
+        입력값 양자화 (floor)
+        Args:
+            values (numpy.array): 입력값 (노이즈 포함)
+            bits (int): 비트 수 (None 이면 self.bits)
+        Returns:
+            numpy.array: int64 ADC code
+        """
+        unit = (self.measure(values) - self.adc_min) / self.span
+        return np.floor(unit * self._levels(bits)).astype(np.int64)
+
+    def quantize_depths(self, values, bits):
+        """
+        한 trace 를 여러 비트 수로 한 번에 양자화 (clip/정규화는 한 번만 계산)
+        Args:
+            values (numpy.array): (samples,) 입력값 (노이즈 포함)
+            bits (iterable): 비트 수 목록
+        Returns:
+            numpy.array: (depths, samples) int64 ADC code
+        """
+        unit = (self.measure(values) - self.adc_min) / self.span
+        return np.floor(unit[None, :] * self._levels(bits)[:, None]).astype(np.int64)
+
+    def decode_affine(self, bits=None):
+        """
+        디코딩을 값 = intercept + code * slope 로 쓴 계수 (trim 포함)
+        Args:
+            bits (int or numpy.array): 비트 수 (None 이면 self.bits)
+        Returns:
+            tuple: (intercept, slope)
+        """
+        slope = self.span / self._levels(bits) / self.gain
+        return (self.adc_min - self.offset) / self.gain, slope
+
+    def decode(self, codes, bits=None):
+        """
+        ADC code --> 채널 값
+        Args:
+            codes (numpy.array): ADC code ((samples,) 또는 quantize_depths 의 (depths, samples))
+            bits (int or iterable): 비트 수 (None 이면 self.bits, 목록이면 codes 의 첫 축과 대응)
+        Returns:
+            numpy.array: float 채널 값
+        """
+        codes = np.asarray(codes, dtype=float)
+        levels = self._levels(bits)
+        if levels.ndim:
+            levels = levels.reshape((-1,) + (1,) * (codes.ndim - 1))
+        raw = self.adc_min + (codes / levels) * self.span
+        if self.offset == 0 and self.gain == 1:
+            return raw
+        return (raw - self.offset) / self.gain
+
+    def noise(self, rng, shape):
+        """
+        Gaussian 노이즈 생성
+        Args:
+            rng (numpy.random.Generator): 난수 생성기
+            shape (tuple): 출력 shape
+        Returns:
+            numpy.array: 노이즈
+        """
+        return rng.normal(0, self.noise_sigma, shape)
+
+
+def default_calibrations(bits=16):
+    """
+    DEFAULT_CHANNEL_RANGES 로 채널별 ChannelCalibration 생성 (trim 없음)
+    Args:
+        bits (int): ADC 비트 수
+    Returns:
+        dict: 채널 이름 --> ChannelCalibration
+    """
+    return {col: ChannelCalibration(lo, hi, bits) for col, (lo, hi) in DEFAULT_CHANNEL_RANGES.items()}
+
+
+def calibrations_from_ranges(ranges, channels=tuple(RANGE_PREFIXES)):
+    """
+    ADC.ranges() 형식 dict 를 채널별 ChannelCalibration 으로 변환
+    (trim 키 "<prefix>_offset", "<prefix>_gain" 이 없는 이전 형식은 trim 없음,
+    채널 비트 수 "<prefix>_bits" 가 없으면 q_levels 의 비트 수로 처리)
+    Args:
+        ranges (dict): q_levels 및 채널별 최소/최대값
+        channels (iterable): 변환할 채널 이름
+    Returns:
+        dict: 채널 이름 --> ChannelCalibration
+    """
+    bits = int(round(np.log2(ranges["q_levels"])))
+    calibrations = {}
+    for col in channels:
+        prefix = RANGE_PREFIXES[col]
+        calibrations[col] = ChannelCalibration(
+            ranges[f"{prefix}_min"], ranges[f"{prefix}_max"], int(ranges.get(f"{prefix}_bits", bits)),
+            offset=ranges.get(f"{prefix}_offset", 0.0),
+            gain=ranges.get(f"{prefix}_gain", 1.0),
+            noise_sigma=ranges.get(f"{prefix}_noise_sigma"),
+        )
+    return calibrations
+
+
+def ranges_from_calibrations(calibrations):
+    """
+    채널별 ChannelCalibration 을 ADC.ranges() 형식 dict 로 변환 (디코딩 / .qadc 헤더용)
+    Args:
+        calibrations (dict): 채널 이름 --> ChannelCalibration (채널마다 비트 수가 달라도 됨)
+    Returns:
+        dict: q_levels (가장 넓은 채널 기준, 코드 저장 형식용) 및 채널별 최소/최대값, 비트 수, trim,
+            노이즈 표준편차
+    """
+    ranges = {"q_levels": max(cal.q_levels for cal in calibrations.values())}
+    for col, cal in calibrations.items():
+        prefix = RANGE_PREFIXES[col]
+        ranges.update({
+            f"{prefix}_min": cal.adc_min, f"{prefix}_max": cal.adc_max, f"{prefix}_bits": cal.bits,
+            f"{prefix}_offset": cal.offset, f"{prefix}_gain": cal.gain,
+            f"{prefix}_noise_sigma": cal.noise_sigma,
+        })
+    return ranges
+
+
+def ranges_bits(ranges):
+    """
+    ADC.ranges() 형식 dict 에서 채널별 비트 수 (RANGE_PREFIXES 순서)
+    Returns:
+        list: 채널별 비트 수 ("<prefix>_bits" 가 없으면 q_levels 의 비트 수)
+    """
+    return [cal.bits for cal in calibrations_from_ranges(ranges).values()]
@@ -0,0 +1,143 @@
+import argparse
+
+import numpy as np
+
+# bms/ (main.py 가 있는 디렉터리) 에서 python -m benchmarks.pipeline_benchmark 로 실행
+from adc.adc_module import ADC
+from adc.calibration import calibrations_from_ranges
+from bms.mybms_module import MyBMS
+from configs.bms_config import ocv_array, r_table_array, soc_array
+from utils.profiling import StageProfiler
+
+SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+MODES = ["current-only", "current-voltage", "temperature-compensated"]
+
+BMS_CONFIGURATION = {
+    "charging_eta": 1.0,
+    "discharging_eta": 1.0,
+    "alpha": 0.5,
+    "r_table": r_table_array,
+    "soc_ocv_table": np.column_stack([soc_array, ocv_array]),
+}
+CAPACITY = 5
+
+
+def synthetic_trace(n_samples, chunk_size=10 ** 6, seed=0, segment=600):
+    """
+    pybamm 없이 전류/전압/온도 trace 를 블록 단위로 생성 (1 s 간격)
+    segment 초마다 방전/충전/휴지 전류를 바꾸고, 전압은 OCV(SOC) - I * R(SOC), 온도는 천천히 변함
+    Args:
+        n_samples (int): 전체 샘플 수
+        chunk_size (int): 블록 크기
+        seed (int): 난수 시드
+        segment (int): 전류 구간 길이 (샘플 수)
+    Yields:
+        dict: "Time [s]" 및 adc.adc_module.CHANNELS 순서의 채널 배열
+    """
+    rng = np.random.default_rng(seed)
+    soc = 0.9
+    ocv_soc = np.argsort(soc_array)
+    r_soc = np.argsort(r_table_array[:, 0])
+    for start in range(0, n_samples, chunk_size):
+        n = min(chunk_size, n_samples - start)
+        t = np.arange(start, start + n, dtype=float)
+
+        n_segments = -(-n // segment)
+        level = rng.choice([2.5, -2.5, 0.0], size=n_segments, p=[0.45, 0.35, 0.2])
+        noise = rng.normal(0, 0.02, n)
+        current = np.empty(n)
+        soc_t = np.empty(n)
+        # 구간마다 현재 SOC 로 방향을 정함 (구간 끝 SOC 가 0.1 아래면 충전, 0.95 위면 방전, 양의 전류가 방전)
+        for k in range(n_segments):
+            lo, hi = k * segment, min((k + 1) * segment, n)
+            end = soc - level[k] * (hi - lo) / (3600 * CAPACITY)
+            if end < 0.1:
+                level[k] = -abs(level[k])
+            elif end > 0.95:
+                level[k] = abs(level[k])
+            current[lo:hi] = level[k] + noise[lo:hi]
+            soc_t[lo:hi] = soc - np.cumsum(current[lo:hi]) / (3600 * CAPACITY)
+            soc = float(soc_t[hi - 1])
+
+        ocv = np.interp(soc_t, soc_array[ocv_soc], ocv_array[ocv_soc])
+        r = np.interp(soc_t, r_table_array[r_soc, 0], r_table_array[r_soc, 1])
+        yield {
+            "Time [s]": t,
+            "Cell current [A]": current,
+            "Terminal voltage [V]": ocv - current * r,
+            "X-averaged cell temperature [K]": 298.15 + 5 * np.sin(t / 3600),
+        }
+
+
+def _decode_block(codes, ranges):
+    calibrations = calibrations_from_ranges(ranges)
+    return tuple(cal.decode(codes[:, k]) for k, cal in enumerate(calibrations.values()))
+
+
+def run(sizes=SIZES, modes=MODES, chunk_size=10 ** 6, hook=None, track_memory=True):
+    """
+    크기별 ADC --> decode --> BMS 처리량 측정 (chunk_size 블록 단위, 메모리는 블록 크기만큼 사용)
+    Args:
+        sizes (list): 샘플 수 목록 (10^3 ~ 10^8)
+        modes (list): 측정할 MyBMS 추정 모드 (상태를 이어받지 않는 "temperature-compensated" 는
+            n <= chunk_size 일 때만 측정)
+        chunk_size (int): 블록 크기
+        hook (str): StageProfiler hook (None, "cprofile", "tracemalloc")
+        track_memory (bool): 단계별 peak memory 측정 여부
+    Returns:
+        StageProfiler: 블록/단계별 측정 기록 ("단계 [n=크기]")
+    """
+    profiler = StageProfiler(track_memory=track_memory, hook=hook)
+    for n in sizes:
+        adc = ADC(log_file=None, output_file=None)
+        ranges = adc.ranges()
+        bms = MyBMS(0.9, 1, CAPACITY, dict(BMS_CONFIGURATION))
+        streams = {mode: bms.stream(mode) for mode in modes if mode != "temperature-compensated"}
+
+        def timed(name, samples, fn, *args):
+            with profiler.stage(f"{name} [n={n}]", samples):
+                return fn(*args)
+
+        for block in synthetic_trace(n, chunk_size):
+            m = len(block["Time [s]"])
+            values = np.column_stack([block[col] for col in
+                                      ("Cell current [A]", "Terminal voltage [V]",
+                                       "X-averaged cell temperature [K]")])
+            _, codes = timed("adc", m, adc.process_block, values)
+            cur, vol, tmp = timed("decode", m, _decode_block, codes, ranges)
+            for mode in modes:
+                if mode in streams:
+                    timed(f"bms ({mode})", m, streams[mode].update_batch, cur, vol, tmp, block["Time [s]"])
+                elif n <= chunk_size:
+                    timed(f"bms ({mode})", m, bms.estimate_soc_batch, cur, vol, tmp, block["Time [s]"], mode)
+    return profiler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetic ADC --> BMS throughput benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES,
+                        help="samples per run (10^3 ~ 10^8)")
+    parser.add_argument("--modes", nargs="+", default=MODES)
+    parser.add_argument("--chunk-size", type=int, default=10 ** 6)
+    parser.add_argument("--hook", choices=["cprofile", "tracemalloc"], default=None)
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc peak memory")
+    args = parser.parse_args(argv)
+
+    profiler = run(args.sizes, args.modes, args.chunk_size, args.hook, not args.no_memory)
+    table = profiler.report()
+    # 블록별 기록을 크기/단계별로 합산
+    summary = table.groupby("stage", sort=False).agg({
+        "samples": "sum", "wall_time [s]": "sum", "peak_memory [MB]": "max",
+    })
+    summary["samples/s"] = summary["samples"] / summary["wall_time [s]"]
+    print(summary.to_string(float_format=lambda v: f"{v:.4g}"))
+    if args.hook is not None:
+        # 단계별 마지막 블록의 상세 profile
+        profiles = {r["stage"]: r["profile"] for r in profiler.records if "profile" in r}
+        for stage, profile in profiles.items():
+            print(f"\n[{stage}] {args.hook}\n{profile}")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
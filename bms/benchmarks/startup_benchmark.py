@@ -0,0 +1,62 @@
+import os
+import statistics
+import subprocess
+import sys
+
+# bms/ (main.py 가 있는 디렉터리) 를 기준으로 import
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "bms.mybms_module",
+    "adc.adc_module",
+    "utils.io_pipeline",
+    "utils.pipeline",
+    "utils.sweep",
+    "simulation.battery_simulation",
+]
+
+# 참고용: 시뮬레이션/plot 에서만 필요한 무거운 의존성
+HEAVY_MODULES = ["pybamm", "liionpack", "matplotlib.pyplot"]
+
+_SNIPPET = (
+    "import time; t = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - t); "
+    "import sys; print(','.join(m for m in ({heavy}) if m in sys.modules))"
+)
+
+
+def measure_import_time(module, repeats=5):
+    """
+    새 인터프리터에서 module import 에 걸리는 시간 측정
+    Args:
+        module (str): import 할 모듈 이름
+        repeats (int): 반복 횟수
+    Returns:
+        tuple: (중앙값 시간 (s), 함께 로드된 무거운 의존성 리스트)
+    """
+    heavy = ", ".join(repr(m) for m in HEAVY_MODULES) + ","
+    times, loaded = [], []
+    for _ in range(repeats):
+        proc = subprocess.run(
+            [sys.executable, "-c", _SNIPPET.format(module=module, heavy=heavy)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        elapsed, loaded_line = (proc.stdout.splitlines() + [""])[:2]
+        times.append(float(elapsed))
+        loaded = [m for m in loaded_line.split(",") if m]
+    return statistics.median(times), loaded
+
+
+def main(repeats=5):
+    print(f"{'module':<34} {'import [ms]':>12}  heavy deps loaded")
+    for module in MODULES:
+        try:
+            elapsed, loaded = measure_import_time(module, repeats)
+        except subprocess.CalledProcessError as e:
+            print(f"{module:<34} {'failed':>12}  {e.stderr.strip().splitlines()[-1]}")
+            continue
+        print(f"{module:<34} {elapsed * 1e3:>12.1f}  {', '.join(loaded) or '-'}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,352 @@
+import numpy as np
+
+from bms.lookup_table import get_lookup
+
+# 모드 판정 임계값 기본값 (BMS_configuration 에 같은 키가 있으면 그 값을 사용)
+DEFAULT_THRESHOLDS = {
+    "i_low": 0.1,
+    "i_ocv": 0.05,
+    "t_relx_minutes": 120,
+    "t_ocv_minutes": 30,
+}
+
+# streaming / batch 추정기의 SOC 추정 모드 (Kalman filter, 온도 보상 모드는 MyBMS 에서 분기)
+STREAMING_MODES = ("current-only", "voltage-only", "current-voltage")
+
+# Coulomb Counting 적분 방식 (BMS_configuration["integration"])
+#   rectangular: I[k] * (t[k] - t[k-1])
+#   trapezoidal: (I[k-1] + I[k]) / 2 * (t[k] - t[k-1])
+INTEGRATION_METHODS = ("rectangular", "trapezoidal")
+
+# 샘플별 SOC 갱신 방식
+KIND_CC = 0      # Coulomb Counting
+KIND_OCV = 1     # OCV 기반 SOC
+KIND_BLEND = 2   # alpha * CC + (1 - alpha) * OCV
+
+
+def get_thresholds(BMS_configuration):
+    """
+    BMS_configuration 에서 모드 판정 임계값 읽기 (없는 키는 기본값)
+    Args:
+        BMS_configuration (dict): BMS 설정값
+    Returns:
+        dict: "i_low", "i_ocv", "t_relx_minutes", "t_ocv_minutes"
+    """
+    return {key: BMS_configuration.get(key, value) for key, value in DEFAULT_THRESHOLDS.items()}
+
+
+def get_integration(BMS_configuration):
+    """
+    BMS_configuration 에서 Coulomb Counting 적분 방식 읽기 (기본값 "rectangular")
+    """
+    method = BMS_configuration.get("integration", "rectangular")
+    if method not in INTEGRATION_METHODS:
+        raise ValueError(f"Unsupported integration: {method}")
+    return method
+
+
+def check_mode(mode):
+    """
+    streaming / batch 추정 모드 확인 (STREAMING_MODES 가 아니면 ValueError)
+    """
+    if mode not in STREAMING_MODES:
+        raise ValueError(f"Unsupported mode: {mode!r} (expected one of {STREAMING_MODES})")
+    return mode
+
+
+def run_start_index(mask):
+    """
+    mask 가 연속으로 True 인 구간(run)마다 시작 인덱스 계산
+    Args:
+        mask (numpy.array): (cells, samples) bool 배열
+    Returns:
+        numpy.array: 각 위치가 속한 run 의 시작 인덱스 (mask 가 False 인 위치는 의미 없음)
+    """
+    prev = np.zeros_like(mask)
+    prev[:, 1:] = mask[:, :-1]
+    starts = mask & ~prev
+    idx = np.broadcast_to(np.arange(mask.shape[1]), mask.shape)
+    return np.maximum.accumulate(np.where(starts, idx, 0), axis=1)
+
+
+def classify_samples(current, time_stamps, mode, relax_start=None, ocv_start=None, thresholds=None):
+    """
+    estimate_soc 의 분기 조건을 run-length mask 로 한 번에 계산
+    첫 번째 열은 직전 샘플(이미 처리된 상태)로 간주하여 분류하지 않음
+    Args:
+        current (numpy.array): (cells, samples) 전류 데이터 (A)
+        time_stamps (numpy.array): (cells, samples) 타임스탬프 (s)
+        mode (str): SOC 추정 모드 ("current-only", "voltage-only", "current-voltage")
+        relax_start (numpy.array): (cells,) 진행 중인 relax 구간의 시작 시각 (비활성은 NaN)
+        ocv_start (numpy.array): (cells,) 진행 중인 OCV 구간의 시작 시각 (비활성은 NaN)
+        thresholds (dict): get_thresholds 형식의 임계값 (None 이면 기본값)
+    Returns:
+        tuple: (샘플별 갱신 방식, 마지막 샘플 기준 relax 시작 시각, 마지막 샘플 기준 OCV 시작 시각)
+    """
+    check_mode(mode)
+    cells = current.shape[0]
+    kinds = np.full(current.shape, KIND_CC, dtype=np.int8)
+    inactive = np.full(cells, np.nan)
+    if mode == "current-only":
+        return kinds, inactive, inactive
+    if mode == "voltage-only":
+        kinds[:, 1:] = KIND_OCV
+        return kinds, inactive, inactive
+
+    if thresholds is None:
+        thresholds = DEFAULT_THRESHOLDS
+    if relax_start is None:
+        relax_start = inactive
+    if ocv_start is None:
+        ocv_start = inactive
+
+    abs_current = np.abs(current)
+    relax = abs_current < thresholds["i_ocv"]
+    low = abs_current < thresholds["i_low"]
+    return kinds_from_masks(relax, low, time_stamps, relax_start, ocv_start,
+                            thresholds["t_relx_minutes"] * 60, thresholds["t_ocv_minutes"] * 60)
+
+
+def kinds_from_masks(relax, low, time_stamps, relax_start, ocv_start, t_relx, t_ocv):
+    """
+    relax(|I| < i_ocv) / low(|I| < i_low) mask 와 타이머로 샘플별 갱신 방식 결정
+    Args:
+        relax (numpy.array): (cells, samples) relax 전류 mask (첫 열은 덮어씀)
+        low (numpy.array): (cells, samples) 저전류 mask (첫 열은 덮어씀)
+        time_stamps (numpy.array): (cells, samples) 타임스탬프
+        relax_start (numpy.array): (cells,) 진행 중인 relax 구간의 시작 시각 (비활성은 NaN)
+        ocv_start (numpy.array): (cells,) 진행 중인 OCV 구간의 시작 시각 (비활성은 NaN)
+        t_relx (float): OCV 로 전환하는 relax 지속 시간 (time_stamps 와 같은 단위)
+        t_ocv (float): blend 로 전환하는 저전류 지속 시간 (time_stamps 와 같은 단위)
+    Returns:
+        tuple: (샘플별 갱신 방식, 마지막 샘플 기준 relax 시작 시각, 마지막 샘플 기준 OCV 시작 시각)
+    """
+    cells = relax.shape[0]
+    kinds = np.full(relax.shape, KIND_CC, dtype=np.int8)
+    relax[:, 0] = ~np.isnan(relax_start)
+    low[:, 0] = ~np.isnan(ocv_start)
+
+    # 첫 열에 이전 구간의 시작 시각을 넣어 run 이 배치 경계를 넘어 이어지도록 함
+    relax_t = np.array(time_stamps, dtype=float)
+    ocv_t = relax_t.copy()
+    relax_t[:, 0] = relax_start
+    ocv_t[:, 0] = ocv_start
+
+    rows = np.arange(cells)[:, None]
+    relax_begin = relax_t[rows, run_start_index(relax)]
+    ocv_begin = ocv_t[rows, run_start_index(low)]
+    relax_duration = time_stamps - relax_begin
+    ocv_duration = time_stamps - ocv_begin
+
+    kinds[relax & (relax_duration >= t_relx)] = KIND_OCV
+    kinds[low & ~relax & (ocv_duration >= t_ocv)] = KIND_BLEND
+    kinds[:, 0] = KIND_CC
+
+    last_relax = np.where(relax[:, -1], relax_begin[:, -1], np.nan)
+    last_ocv = np.where(low[:, -1], ocv_begin[:, -1], np.nan)
+    return kinds, last_relax, last_ocv
+
+
+def coulomb_steps(current, time_stamps, np_value, capacity, charging_eta, discharging_eta,
+                  method="rectangular"):
+    """
+    샘플별 Coulomb Counting SOC 변화량 계산 (실제 샘플 간격 np.diff(time_stamps) 사용)
+    Args:
+        current (numpy.array): (cells, samples) 전류 데이터 (A)
+        time_stamps (numpy.array): (cells, samples) 타임스탬프 (s)
+        np_value (int): 병렬 연결된 셀의 수
+        capacity (float or numpy.array): 배터리의 정격 용량 (Ah), 배열이면 (cells, samples - 1) step 별 용량
+        charging_eta (float): 충전 효율
+        discharging_eta (float): 방전 효율
+        method (str): 적분 방식 (INTEGRATION_METHODS)
+    Returns:
+        numpy.array: SOC 감소량, 첫 샘플은 0
+    """
+    delta_t = np.diff(time_stamps, axis=1) / 3600
+    if method == "trapezoidal":
+        i_step = (current[:, :-1] + current[:, 1:]) / 2
+    else:
+        i_step = current[:, 1:]
+    charge = i_step * delta_t
+    dq = np.zeros(current.shape)
+    dq[:, 1:] = np.where(
+        i_step > 0,
+        charge * charging_eta / (np_value * capacity),
+        charge / (np_value * capacity * discharging_eta),
+    )
+    return dq
+
+
+def solve_anchored(initial_soc, dq, anchor_mask, step_fn, tol=1e-12, max_iter=None):
+    """
+    CC 구간은 누적합으로, 직전 SOC 에 의존하는 anchor 샘플은 고정점 반복으로 계산
+    Args:
+        initial_soc (numpy.array): (cells,) 셀별 초기 SOC
+        dq (numpy.array): (cells, samples) 샘플별 CC SOC 감소량 (정수 배열이면 정수 연산으로 계산)
+        anchor_mask (numpy.array): (cells, samples) CC 가 아닌 샘플 위치
+        step_fn (callable): (anchor flat 인덱스, 직전 SOC) -> anchor SOC
+        tol (float): 반복 종료 허용 오차
+        max_iter (int): 최대 반복 횟수 (None 이면 anchor 수 + 1, 이 경우 루프와 동일한 해 보장)
+    Returns:
+        numpy.array: (cells, samples) SOC
+    """
+    cells, n = dq.shape
+    if n == 0:
+        return np.empty((cells, 0), dtype=dq.dtype)
+    cum = np.cumsum(dq, axis=1).ravel()
+    fixed = anchor_mask.copy()
+    fixed[:, 0] = True
+
+    # 각 위치의 기준점 = 같은 행에서 가장 최근의 anchor (또는 초기값)
+    flat_idx = np.arange(cells * n)
+    base = np.maximum.accumulate(np.where(fixed.ravel(), flat_idx, 0))
+
+    values = np.empty(cells * n, dtype=cum.dtype)
+    values[::n] = initial_soc
+    anchors = np.flatnonzero(anchor_mask.ravel())
+    if anchors.size:
+        prev = anchors - 1
+        prev_base = base[prev]
+        offset = cum[prev] - cum[prev_base]
+        values[anchors] = np.repeat(initial_soc, n)[anchors] - cum[anchors]
+        if max_iter is None:
+            max_iter = anchors.size + 1
+        # 행끼리는 독립이므로 수렴한 행은 반복에서 제외 (행마다 단일 행 계산과 같은 반복 횟수)
+        rows = anchors // n
+        active = np.arange(anchors.size)
+        for _ in range(max_iter):
+            current = anchors[active]
+            x_prev = values[prev_base[active]] - offset[active]
+            new = step_fn(current, x_prev)
+            moving = np.abs(new - values[current]) > tol
+            values[current] = new
+            if not np.any(moving):
+                break
+            if cells > 1:
+                rows_moving = np.zeros(cells, dtype=bool)
+                rows_moving[rows[active[moving]]] = True
+                active = active[rows_moving[rows[active]]]
+
+    soc = values[base] - (cum - cum[base])
+    return soc.reshape(cells, n)
+
+
+def _estimate(current, voltage, time_stamps, initial_soc, relax_start, ocv_start,
+              np_value, capacity, BMS_configuration, mode, tol, max_iter):
+    """
+    첫 번째 열을 직전 상태로 두고 나머지 열의 SOC 계산
+    Returns:
+        tuple: ((cells, samples) SOC, 갱신된 상태 dict)
+    """
+    dq = coulomb_steps(current, time_stamps, np_value, capacity,
+                       BMS_configuration["charging_eta"], BMS_configuration["discharging_eta"],
+                       get_integration(BMS_configuration))
+    kinds, last_relax, last_ocv = classify_samples(
+        current, time_stamps, mode, relax_start, ocv_start, get_thresholds(BMS_configuration))
+
+    r_lookup = get_lookup(BMS_configuration, "r_lookup")
+    soc_ocv_lookup = get_lookup(BMS_configuration, "soc_ocv_lookup")
+    alpha = BMS_configuration["alpha"]
+
+    cur_flat = current.ravel()
+    vol_flat = voltage.ravel()
+    dq_flat = dq.ravel()
+    blend_flat = (kinds == KIND_BLEND).ravel()
+
+    def step(anchors, x_prev):
+        ocv = vol_flat[anchors] + cur_flat[anchors] * r_lookup(x_prev)
+        soc_ocv = soc_ocv_lookup(ocv)
+        soc_cc = x_prev - dq_flat[anchors]
+        return np.where(blend_flat[anchors], alpha * soc_cc + (1 - alpha) * soc_ocv, soc_ocv)
+
+    soc = solve_anchored(initial_soc, dq, kinds != KIND_CC, step, tol=tol, max_iter=max_iter)
+    state = {
+        "soc": soc[:, -1].copy(),
+        "time": np.array(time_stamps[:, -1], dtype=float),
+        "current": current[:, -1].copy(),
+        "relax_start": last_relax,
+        "ocv_start": last_ocv,
+    }
+    return soc, state
+
+
+def _as_cells(decoded_current, decoded_voltage, time_stamps):
+    current = np.asarray(decoded_current, dtype=float)
+    squeeze = current.ndim == 1
+    current = np.atleast_2d(current)
+    voltage = np.broadcast_to(np.asarray(decoded_voltage, dtype=float), current.shape)
+    t = np.broadcast_to(np.asarray(time_stamps, dtype=float), current.shape)
+    return current, voltage, t, squeeze
+
+
+def estimate_soc_batch(decoded_current, decoded_voltage, time_stamps, initial_soc,
+                       np_value, capacity, BMS_configuration, mode,
+                       tol=1e-12, max_iter=None):
+    """
+    MyBMS.estimate_soc 의 NumPy 벡터화 버전
+    Args:
+        decoded_current (numpy.array): 디코딩된 전류 데이터 (A), (samples,) 또는 (cells, samples)
+        decoded_voltage (numpy.array): 디코딩된 전압 데이터 (V), current 와 같은 shape
+        time_stamps (numpy.array): 타임스탬프 데이터 (s), (samples,) 또는 current 와 같은 shape
+        initial_soc (float or numpy.array): 초기 SOC (셀별 지정 가능)
+        np_value (int): 병렬 연결된 셀의 수
+        capacity (float): 배터리의 정격 용량 (Ah)
+        BMS_configuration (dict): BMS 설정값 (load_table 로 테이블이 로드된 상태)
+        mode (str): SOC 추정 모드 ("current-only", "voltage-only", "current-voltage")
+        tol (float): anchor 고정점 반복 허용 오차
+        max_iter (int): anchor 고정점 최대 반복 횟수
+    Returns:
+        numpy.array: 입력과 같은 shape 의 추정 SOC
+    """
+    check_mode(mode)
+    current, voltage, t, squeeze = _as_cells(decoded_current, decoded_voltage, time_stamps)
+    initial = np.broadcast_to(np.asarray(initial_soc, dtype=float), current.shape[:1])
+    if current.shape[1] == 0:
+        soc = np.empty(current.shape)
+    else:
+        soc, _ = _estimate(current, voltage, t, initial, None, None,
+                           np_value, capacity, BMS_configuration, mode, tol, max_iter)
+    return soc[0] if squeeze else soc
+
+
+def continue_soc_batch(state, decoded_current, decoded_voltage, time_stamps,
+                       np_value, capacity, BMS_configuration, mode,
+                       tol=1e-12, max_iter=None):
+    """
+    직전 상태(state)에 이어서 다음 샘플 배치의 SOC 계산
+    Args:
+        state (dict): 셀별 "soc", "time", "relax_start", "ocv_start" (비활성 구간은 NaN),
+            "current" (직전 샘플 전류, trapezoidal 적분에 사용, 없으면 0)
+        decoded_current (numpy.array): 디코딩된 전류 데이터 (A), (samples,) 또는 (cells, samples)
+        decoded_voltage (numpy.array): 디코딩된 전압 데이터 (V)
+        time_stamps (numpy.array): 타임스탬프 데이터 (s)
+        np_value (int): 병렬 연결된 셀의 수
+        capacity (float): 배터리의 정격 용량 (Ah)
+        BMS_configuration (dict): BMS 설정값
+        mode (str): SOC 추정 모드
+        tol (float): anchor 고정점 반복 허용 오차
+        max_iter (int): anchor 고정점 최대 반복 횟수
+    Returns:
+        tuple: (배치의 추정 SOC, 갱신된 상태 dict)
+    """
+    check_mode(mode)
+    current, voltage, t, squeeze = _as_cells(decoded_current, decoded_voltage, time_stamps)
+    cells = current.shape[0]
+    prev = {k: np.broadcast_to(np.asarray(v, dtype=float), (cells,)) for k, v in state.items()}
+    prev.setdefault("current", np.zeros(cells))
+    if current.shape[1] == 0:
+        soc = np.empty(current.shape)
+        new_state = {k: v.copy() for k, v in prev.items()}
+    else:
+        zeros = np.zeros((cells, 1))
+        soc, new_state = _estimate(
+            np.concatenate([prev["current"][:, None], current], axis=1),
+            np.concatenate([zeros, voltage], axis=1),
+            np.concatenate([prev["time"][:, None], t], axis=1),
+            prev["soc"], prev["relax_start"], prev["ocv_start"],
+            np_value, capacity, BMS_configuration, mode, tol, max_iter,
+        )
+        soc = soc[:, 1:]
+    if squeeze:
+        return soc[0], {k: float(v[0]) for k, v in new_state.items()}
+    return soc, new_state
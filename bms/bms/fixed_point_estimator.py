@@ -0,0 +1,324 @@
+from bisect import bisect_right
+
+import numpy as np
+
+from adc.calibration import calibrations_from_ranges
+from bms.batch_estimator import (
+    KIND_BLEND, KIND_CC, KIND_OCV, check_mode, estimate_soc_batch, get_integration, get_thresholds,
+    kinds_from_masks, solve_anchored,
+)
+from bms.lookup_table import LookupTable
+
+# 값별 소수부 비트 수 (Q-format), 모든 중간값은 int64 (순차 모델은 Python int) 로 계산
+DEFAULT_Q_FORMATS = {
+    "soc": 40,          # SOC
+    "current": 16,      # 전류 (A)
+    "voltage": 16,      # 전압 (V), OCV 계산 결과도 같은 형식
+    "resistance": 24,   # 내부 저항 (Ohm)
+    "alpha": 16,        # blend 가중치
+    "table_x": 16,      # 저항 테이블의 SOC 축
+    "slope_shift": 16,  # 테이블 기울기의 추가 소수부 비트
+    "guard": 20,        # ADC code -> 물리량 변환 시 추가 소수부 비트
+    "coulomb_shift": 8, # A*tick 당 SOC 변화량의 추가 소수부 비트
+}
+
+_TICKS_PER_SECOND = 1000  # 타이머 단위 (ms)
+
+
+def to_fixed(value, frac_bits):
+    """
+    실수를 소수부 frac_bits 비트의 정수로 변환 (반올림)
+    Args:
+        value (float or numpy.array): 변환할 값
+        frac_bits (int): 소수부 비트 수
+    Returns:
+        int or numpy.array: 정수 값 (배열은 int64)
+    """
+    if np.ndim(value) == 0:
+        return int(round(float(value) * 2 ** frac_bits))
+    return np.round(np.asarray(value, dtype=float) * 2 ** frac_bits).astype(np.int64)
+
+
+def round_shift(value, bits):
+    """
+    반올림 산술 오른쪽 shift (음수도 floor((v + 2^(bits-1)) / 2^bits))
+    """
+    if bits <= 0:
+        return value << -bits
+    return (value + (1 << (bits - 1))) >> bits
+
+
+class FixedPointTable:
+    def __init__(self, x, y, x_bits, y_bits, slope_shift):
+        """
+        정수 구간별 선형 보간 테이블 (LookupTable 과 같은 검증, 범위 밖은 양 끝 값으로 고정)
+        Args:
+            x (numpy.array): 입력 breakpoint (실수)
+            y (numpy.array): breakpoint 별 출력 값 (실수)
+            x_bits (int): 입력 소수부 비트 수
+            y_bits (int): 출력 소수부 비트 수
+            slope_shift (int): 기울기의 추가 소수부 비트 수
+        """
+        table = LookupTable(x, y)
+        self.x = to_fixed(table.x, x_bits)
+        self.y = to_fixed(table.y, y_bits)
+        if np.any(np.diff(self.x) <= 0):
+            raise ValueError("Lookup table breakpoints collapse at this Q-format")
+        self.slope_shift = slope_shift
+        self.slopes = np.round(np.diff(self.y) / np.diff(self.x) * 2 ** slope_shift).astype(np.int64)
+        if np.max(np.abs(np.diff(self.y))) * 2 ** slope_shift >= 2 ** 62:
+            raise ValueError("Lookup table interpolation overflows int64 at this Q-format")
+        self.x_min = int(self.x[0])
+        self.x_max = int(self.x[-1])
+
+        self._x_list = self.x.tolist()
+        self._y_list = self.y.tolist()
+        self._slope_list = self.slopes.tolist()
+
+    def __call__(self, q):
+        """
+        보간 값 조회
+        Args:
+            q (int or numpy.array): x_bits 형식의 조회 값
+        Returns:
+            int or numpy.array: y_bits 형식의 보간 값
+        """
+        if np.ndim(q) == 0:
+            q = min(max(int(q), self.x_min), self.x_max)
+            i = min(max(bisect_right(self._x_list, q) - 1, 0), len(self._x_list) - 2)
+            return self._y_list[i] + round_shift((q - self._x_list[i]) * self._slope_list[i],
+                                                 self.slope_shift)
+
+        q = np.clip(np.asarray(q, dtype=np.int64), self.x_min, self.x_max)
+        idx = np.clip(np.searchsorted(self.x, q, side="right") - 1, 0, self.x.size - 2)
+        return self.y[idx] + round_shift((q - self.x[idx]) * self.slopes[idx], self.slope_shift)
+
+
+class FixedPointBMS:
+    def __init__(self, initial_soc, np_value, capacity, BMS_configuration, ranges, q_formats=None):
+        """
+        FPU 없는 BMS 펌웨어의 정수 연산 모델 (ADC code 를 그대로 입력으로 사용)
+        Args:
+            initial_soc (float): 초기 SOC
+            np_value (int): 병렬 연결된 셀의 수
+            capacity (float): 배터리의 정격 용량 (Ah)
+            BMS_configuration (dict): BMS 설정값 (load_table 로 테이블이 로드된 상태)
+            ranges (dict): ADC.ranges() 형식의 ADC 설정
+            q_formats (dict): DEFAULT_Q_FORMATS 중 바꿀 항목
+        """
+        self.initial_soc = initial_soc
+        self.Np = np_value
+        self.capacity = capacity
+        self.BMS_configuration = BMS_configuration
+        self.ranges = ranges
+        self.q = dict(DEFAULT_Q_FORMATS)
+        self.q.update(q_formats or {})
+        q = self.q
+
+        # ADC code -> 물리량: (offset + code * lsb) >> guard (offset/gain trim 은 계수에 포함)
+        self.calibrations = calibrations_from_ranges(ranges)
+        intercept, slope = self.calibrations["Cell current [A]"].decode_affine()
+        self.current_offset = to_fixed(intercept, q["current"] + q["guard"])
+        self.current_lsb = to_fixed(slope, q["current"] + q["guard"])
+        intercept, slope = self.calibrations["Terminal voltage [V]"].decode_affine()
+        self.voltage_offset = to_fixed(intercept, q["voltage"] + q["guard"])
+        self.voltage_lsb = to_fixed(slope, q["voltage"] + q["guard"])
+
+        # Coulomb Counting: dq = (I * dt * k) >> (current + coulomb_shift), dt 는 tick 단위
+        # (k 는 A*tick 당 SOC 변화량, trapezoidal 은 I[k-1] + I[k] 를 쓰고 1 bit 더 shift)
+        self.integration = get_integration(BMS_configuration)
+        delta_t = 1 / (3600 * _TICKS_PER_SECOND)
+        k_bits = q["soc"] + q["coulomb_shift"]
+        self.k_charge = to_fixed(delta_t * BMS_configuration["charging_eta"] / (np_value * capacity), k_bits)
+        self.k_discharge = to_fixed(delta_t / (np_value * capacity * BMS_configuration["discharging_eta"]),
+                                    k_bits)
+        self.dq_shift = q["current"] + q["coulomb_shift"] + (self.integration == "trapezoidal")
+
+        self.alpha = to_fixed(BMS_configuration["alpha"], q["alpha"])
+        thresholds = get_thresholds(BMS_configuration)
+        self.i_low = to_fixed(thresholds["i_low"], q["current"])
+        self.i_ocv = to_fixed(thresholds["i_ocv"], q["current"])
+        self.t_relx = int(thresholds["t_relx_minutes"] * 60 * _TICKS_PER_SECOND)
+        self.t_ocv = int(thresholds["t_ocv_minutes"] * 60 * _TICKS_PER_SECOND)
+
+        r_table = np.asarray(BMS_configuration["r_table"], dtype=float)
+        soc_ocv_table = np.asarray(BMS_configuration["soc_ocv_table"], dtype=float)
+        self.r_table = FixedPointTable(r_table[:, 0], r_table[:, 1],
+                                       q["table_x"], q["resistance"], q["slope_shift"])
+        self.soc_ocv_table = FixedPointTable(soc_ocv_table[:, 1], soc_ocv_table[:, 0],
+                                             q["voltage"], q["soc"], q["slope_shift"])
+
+    def decode_codes(self, codes_current, codes_voltage):
+        """
+        ADC code 를 Q-format 전류/전압으로 변환
+        Returns:
+            tuple: (int64 전류, int64 전압)
+        """
+        guard = self.q["guard"]
+        cur = np.asarray(codes_current, dtype=np.int64)
+        vol = np.asarray(codes_voltage, dtype=np.int64)
+        return (round_shift(self.current_offset + cur * self.current_lsb, guard),
+                round_shift(self.voltage_offset + vol * self.voltage_lsb, guard))
+
+    def to_ticks(self, time_stamps):
+        """
+        타임스탬프 (s) 를 정수 타이머 tick (ms) 으로 변환
+        """
+        return np.round(np.asarray(time_stamps, dtype=float) * _TICKS_PER_SECOND).astype(np.int64)
+
+    def to_float(self, soc_q):
+        """
+        soc 형식 정수를 실수 SOC 로 변환
+        """
+        return np.asarray(soc_q, dtype=float) / 2 ** self.q["soc"]
+
+    def _coulomb_steps(self, current, ticks):
+        i_step = current[:, 1:]
+        if self.integration == "trapezoidal":
+            i_step = current[:, :-1] + i_step
+        dt = np.diff(ticks, axis=1)
+        bound = int(np.abs(i_step).max(initial=0)) * int(dt.max(initial=0)) * max(self.k_charge, self.k_discharge)
+        if bound >= 2 ** 63:
+            raise ValueError("Coulomb counting overflows int64; sample gap too long for this Q-format")
+        dq = np.zeros(current.shape, dtype=np.int64)
+        dq[:, 1:] = round_shift(i_step * dt * np.where(i_step > 0, self.k_charge, self.k_discharge),
+                                self.dq_shift)
+        return dq
+
+    def _soc_from_voltage(self, soc, current, voltage):
+        q = self.q
+        r = self.r_table(round_shift(soc, q["soc"] - q["table_x"]))
+        ocv = voltage + round_shift(current * r, q["current"] + q["resistance"] - q["voltage"])
+        return self.soc_ocv_table(ocv)
+
+    def _blend(self, soc_cc, soc_ocv):
+        one = 1 << self.q["alpha"]
+        return round_shift(self.alpha * soc_cc + (one - self.alpha) * soc_ocv, self.q["alpha"])
+
+    def estimate_soc_codes(self, codes_current, codes_voltage, time_stamps, mode="current-voltage"):
+        """
+        ADC code 로 SOC 추정 (정수 벡터 연산, estimate_soc_sequential 과 bit 단위로 동일)
+        Args:
+            codes_current (numpy.array): 전류 ADC code
+            codes_voltage (numpy.array): 전압 ADC code
+            time_stamps (numpy.array): 타임스탬프 (s)
+            mode (str): SOC 추정 모드 ("current-only", "voltage-only", "current-voltage")
+        Returns:
+            numpy.array: soc 형식의 int64 SOC
+        """
+        check_mode(mode)
+        current, voltage = self.decode_codes(codes_current, codes_voltage)
+        current, voltage = current.reshape(1, -1), voltage.reshape(1, -1)
+        n = current.shape[1]
+        if n == 0:
+            return np.empty(0, dtype=np.int64)
+
+        ticks = self.to_ticks(time_stamps).reshape(1, -1)
+        dq = self._coulomb_steps(current, ticks)
+
+        kinds = np.full(current.shape, KIND_CC, dtype=np.int8)
+        if mode == "voltage-only":
+            kinds[:, 1:] = KIND_OCV
+        elif mode != "current-only":
+            abs_current = np.abs(current)
+            inactive = np.full(1, np.nan)
+            kinds, _, _ = kinds_from_masks(abs_current < self.i_ocv, abs_current < self.i_low,
+                                           ticks.astype(float), inactive, inactive, self.t_relx, self.t_ocv)
+
+        cur_flat = current.ravel()
+        vol_flat = voltage.ravel()
+        dq_flat = dq.ravel()
+        blend_flat = (kinds == KIND_BLEND).ravel()
+
+        def step(anchors, x_prev):
+            soc_ocv = self._soc_from_voltage(x_prev, cur_flat[anchors], vol_flat[anchors])
+            soc_cc = x_prev - dq_flat[anchors]
+            return np.where(blend_flat[anchors], self._blend(soc_cc, soc_ocv), soc_ocv)
+
+        initial = np.array([to_fixed(self.initial_soc, self.q["soc"])], dtype=np.int64)
+        soc = solve_anchored(initial, dq, kinds != KIND_CC, step, tol=0)
+        return soc[0]
+
+    def estimate_soc_sequential(self, codes_current, codes_voltage, time_stamps, mode="current-voltage"):
+        """
+        펌웨어와 같은 샘플 단위 정수 연산 모델 (Python int, MyBMS.estimate_soc 와 같은 분기)
+        Args:
+            codes_current (numpy.array): 전류 ADC code
+            codes_voltage (numpy.array): 전압 ADC code
+            time_stamps (numpy.array): 타임스탬프 (s)
+            mode (str): SOC 추정 모드
+        Returns:
+            list: soc 형식의 정수 SOC
+        """
+        check_mode(mode)
+        guard = self.q["guard"]
+        soc = to_fixed(self.initial_soc, self.q["soc"])
+        ticks = self.to_ticks(time_stamps).tolist()
+        relax_start = ocv_start = None
+        soc_list = [soc] if ticks else []
+        prev_current = None
+        for i in range(len(ticks)):
+            current = round_shift(self.current_offset + int(codes_current[i]) * self.current_lsb, guard)
+            voltage = round_shift(self.voltage_offset + int(codes_voltage[i]) * self.voltage_lsb, guard)
+            if prev_current is None:
+                prev_current = current
+                continue
+            t = ticks[i]
+            i_step = prev_current + current if self.integration == "trapezoidal" else current
+            prev_current = current
+            k = self.k_charge if i_step > 0 else self.k_discharge
+            soc_cc = soc - round_shift(i_step * (t - ticks[i - 1]) * k, self.dq_shift)
+
+            if mode == "current-only":
+                soc = soc_cc
+            elif mode == "voltage-only":
+                soc = self._soc_from_voltage(soc, current, voltage)
+            elif abs(current) < self.i_ocv:
+                if relax_start is None:
+                    relax_start = t
+                if ocv_start is None:
+                    ocv_start = t
+                if t - relax_start >= self.t_relx:
+                    soc = self._soc_from_voltage(soc, current, voltage)
+                else:
+                    soc = soc_cc
+            elif abs(current) < self.i_low:
+                relax_start = None
+                if ocv_start is None:
+                    ocv_start = t
+                if t - ocv_start >= self.t_ocv:
+                    soc = self._blend(soc_cc, self._soc_from_voltage(soc, current, voltage))
+                else:
+                    soc = soc_cc
+            else:
+                relax_start = None
+                ocv_start = None
+                soc = soc_cc
+            soc_list.append(soc)
+        return soc_list
+
+    def drift_report(self, codes_current, codes_voltage, time_stamps, mode="current-voltage"):
+        """
+        같은 ADC code 를 디코딩한 float64 기준(estimate_soc_batch)과의 SOC 차이
+        Args:
+            codes_current (numpy.array): 전류 ADC code
+            codes_voltage (numpy.array): 전압 ADC code
+            time_stamps (numpy.array): 타임스탬프 (s)
+            mode (str): SOC 추정 모드
+        Returns:
+            dict: 정수/float SOC 와 max/mean/rms/final drift
+        """
+        current = self.calibrations["Cell current [A]"].decode(codes_current)
+        voltage = self.calibrations["Terminal voltage [V]"].decode(codes_voltage)
+        reference = estimate_soc_batch(current, voltage, time_stamps, self.initial_soc,
+                                       self.Np, self.capacity, self.BMS_configuration, mode)
+        soc = self.to_float(self.estimate_soc_codes(codes_current, codes_voltage, time_stamps, mode))
+        drift = soc - reference
+        return {
+            "soc": soc,
+            "reference": reference,
+            "max_drift": float(np.max(np.abs(drift))) if drift.size else 0.0,
+            "mean_drift": float(np.mean(drift)) if drift.size else 0.0,
+            "rms_drift": float(np.sqrt(np.mean(drift ** 2))) if drift.size else 0.0,
+            "final_drift": float(drift[-1]) if drift.size else 0.0,
+        }
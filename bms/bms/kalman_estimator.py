@@ -0,0 +1,117 @@
+import numpy as np
+
+from bms.batch_estimator import coulomb_steps, get_integration
+from bms.lookup_table import get_lookup
+
+# Kalman filter 잡음 파라미터 기본값 (BMS_configuration 에 같은 키가 있으면 그 값을 사용)
+DEFAULT_KALMAN = {
+    "kf_process_noise": 1e-7,       # SOC 공정 잡음 분산 증가율 (1/s)
+    "kf_measurement_noise": 1e-4,   # 단자 전압 측정 잡음 분산 (V^2)
+    "kf_initial_variance": 1e-2,    # 초기 SOC 분산
+}
+
+KALMAN_METHODS = ("ekf", "ukf")
+
+# UKF sigma point 파라미터 (상태 1 차원, n + kappa = 3)
+_UKF_ALPHA = 1.0
+_UKF_BETA = 2.0
+_UKF_KAPPA = 2.0
+
+
+def get_kalman_parameters(BMS_configuration):
+    """
+    BMS_configuration 에서 Kalman filter 잡음 파라미터 읽기 (없는 키는 기본값)
+    """
+    return {key: BMS_configuration.get(key, value) for key, value in DEFAULT_KALMAN.items()}
+
+
+def _ukf_weights():
+    lam = _UKF_ALPHA ** 2 * (1 + _UKF_KAPPA) - 1
+    wm = np.array([lam / (1 + lam), 0.5 / (1 + lam), 0.5 / (1 + lam)])
+    wc = wm.copy()
+    wc[0] += 1 - _UKF_ALPHA ** 2 + _UKF_BETA
+    return np.sqrt(1 + lam), wm[:, None], wc[:, None]
+
+
+def estimate_soc_kalman(decoded_current, decoded_voltage, time_stamps, initial_soc,
+                        np_value, capacity, BMS_configuration, method="ekf"):
+    """
+    SOC 1 상태 Kalman filter (예측: Coulomb Counting, 측정: V = OCV(SOC) - I * R(SOC))
+    셀 축은 NumPy broadcasting 으로 한 번에 갱신하므로 시간 루프 비용은 셀 수와 거의 무관
+    Args:
+        decoded_current (numpy.array): 디코딩된 전류 (A), (samples,) 또는 (cells, samples), 양수 = 방전
+        decoded_voltage (numpy.array): 디코딩된 전압 (V), current 와 같은 shape
+        time_stamps (numpy.array): 타임스탬프 (s), (samples,) 또는 current 와 같은 shape
+        initial_soc (float or numpy.array): 초기 SOC (셀별 지정 가능)
+        np_value (int): 병렬 연결된 셀의 수
+        capacity (float): 배터리의 정격 용량 (Ah)
+        BMS_configuration (dict): BMS 설정값 (load_table 로 테이블이 로드된 상태)
+        method (str): "ekf" (테이블 기울기로 Jacobian 계산) 또는 "ukf" (sigma point)
+    Returns:
+        dict: "SOC", "variance" (SOC 추정 분산), 입력과 같은 shape
+    """
+    if method not in KALMAN_METHODS:
+        raise ValueError(f"Unsupported Kalman method: {method}")
+    current = np.asarray(decoded_current, dtype=float)
+    squeeze = current.ndim == 1
+    current = np.atleast_2d(current)
+    voltage = np.broadcast_to(np.asarray(decoded_voltage, dtype=float), current.shape)
+    t = np.broadcast_to(np.asarray(time_stamps, dtype=float), current.shape)
+    cells, n = current.shape
+    params = get_kalman_parameters(BMS_configuration)
+
+    # 예측 단계는 상태와 무관하므로 CC 변화량과 공정 잡음을 미리 계산
+    dq = coulomb_steps(current, t, np_value, capacity,
+                       BMS_configuration["charging_eta"], BMS_configuration["discharging_eta"],
+                       get_integration(BMS_configuration))
+    q = np.zeros(current.shape)
+    q[:, 1:] = params["kf_process_noise"] * np.abs(np.diff(t, axis=1))
+    r_meas = params["kf_measurement_noise"]
+
+    ocv_lookup = get_lookup(BMS_configuration, "ocv_lookup")
+    r_lookup = get_lookup(BMS_configuration, "r_lookup")
+    if method == "ukf":
+        spread, wm, wc = _ukf_weights()
+        offsets = spread * np.array([[0.0], [1.0], [-1.0]])
+
+    # 시간 루프에서 샘플별 행을 연속 메모리로 읽도록 (samples, cells) 로 전치
+    dq_t = np.ascontiguousarray(dq.T)
+    q_t = np.ascontiguousarray(q.T)
+    current_t = np.ascontiguousarray(current.T)
+    voltage_t = np.ascontiguousarray(voltage.T)
+
+    soc = np.empty(current.shape)
+    variance = np.empty(current.shape)
+    x = np.array(np.broadcast_to(np.asarray(initial_soc, dtype=float), (cells,)))
+    p = np.full(cells, float(params["kf_initial_variance"]))
+    soc[:, 0] = x
+    variance[:, 0] = p
+    for k in range(1, n):
+        x = x - dq_t[k]
+        p = p + q_t[k]
+        i_k = current_t[k]
+        if method == "ekf":
+            ocv, d_ocv = ocv_lookup.value_and_slope(x)
+            resistance, d_resistance = r_lookup.value_and_slope(x)
+            predicted = ocv - i_k * resistance
+            h = d_ocv - i_k * d_resistance
+            s = h * p * h + r_meas
+            gain = p * h / s
+            x = x + gain * (voltage_t[k] - predicted)
+            p = (1 - gain * h) * p
+        else:
+            sigma = x + np.sqrt(p) * offsets
+            y = ocv_lookup(sigma) - i_k * r_lookup(sigma)
+            y_mean = (wm * y).sum(axis=0)
+            dy = y - y_mean
+            p_yy = (wc * dy * dy).sum(axis=0) + r_meas
+            p_xy = (wc * (sigma - x) * dy).sum(axis=0)
+            gain = p_xy / p_yy
+            x = x + gain * (voltage_t[k] - y_mean)
+            p = p - gain * p_yy * gain
+        soc[:, k] = x
+        variance[:, k] = p
+
+    if squeeze:
+        return {"SOC": soc[0], "variance": variance[0]}
+    return {"SOC": soc, "variance": variance}
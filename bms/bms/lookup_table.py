@@ -0,0 +1,189 @@
+from bisect import bisect_right
+
+import numpy as np
+
+
+class LookupTable:
+    def __init__(self, x, y, uniform_rtol=1e-9):
+        """
+        구간별 선형 보간 테이블 (load_table 에서 한 번 생성해 재사용)
+        Args:
+            x (numpy.array): 입력 breakpoint (단조 증가 또는 단조 감소)
+            y (numpy.array): breakpoint 별 출력 값
+            uniform_rtol (float): 등간격 grid 판정 허용 오차 (등간격이면 O(1) 인덱싱)
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        if x.shape != y.shape or x.size < 2:
+            raise ValueError("Lookup table needs at least two (x, y) pairs of equal length")
+
+        dx = np.diff(x)
+        if np.all(dx < 0):
+            x, y, dx = x[::-1], y[::-1], -dx[::-1]
+        elif not np.all(dx > 0):
+            raise ValueError("Lookup table breakpoints must be strictly monotonic")
+
+        self.x = np.ascontiguousarray(x)
+        self.y = np.ascontiguousarray(y)
+        self.slopes = np.ascontiguousarray(np.diff(y) / dx)
+        self.x_min = float(x[0])
+        self.x_max = float(x[-1])
+
+        step = (self.x_max - self.x_min) / (x.size - 1)
+        self.uniform = bool(np.allclose(dx, step, rtol=uniform_rtol, atol=0.0))
+        self.inv_step = 1.0 / step
+
+        # scalar 조회용 (numpy scalar 연산 오버헤드 회피)
+        self._x_list = self.x.tolist()
+        self._y_list = self.y.tolist()
+        self._slope_list = self.slopes.tolist()
+
+    @classmethod
+    def from_table(cls, table, x_col, y_col):
+        """
+        (N, 2) 테이블의 두 컬럼으로 LookupTable 생성
+        Args:
+            table (numpy.array): r_table, soc_ocv_table 등 (N, 2) 배열
+            x_col (int): 입력 축 컬럼 번호
+            y_col (int): 출력 축 컬럼 번호
+        Returns:
+            LookupTable: 생성된 테이블
+        """
+        table = np.asarray(table, dtype=float)
+        return cls(table[:, x_col], table[:, y_col])
+
+    def index(self, q):
+        """
+        q 가 속한 구간 번호 계산 (등간격이면 O(1), 아니면 이진 탐색)
+        Args:
+            q (numpy.array): 조회 값
+        Returns:
+            numpy.array: 0 ~ N-2 구간 번호
+        """
+        q = np.asarray(q, dtype=float)
+        if self.uniform:
+            idx = np.floor((q - self.x_min) * self.inv_step)
+            idx = np.nan_to_num(idx, nan=0.0)
+        else:
+            idx = np.searchsorted(self.x, q, side="right") - 1
+        return np.clip(idx, 0, self.x.size - 2).astype(np.intp)
+
+    def _scalar_index(self, q):
+        last = len(self._x_list) - 2
+        if self.uniform:
+            idx = int((q - self.x_min) * self.inv_step)
+        else:
+            idx = bisect_right(self._x_list, q) - 1
+        return min(max(idx, 0), last)
+
+    def __call__(self, q):
+        """
+        보간 값 조회 (범위 밖은 양 끝 값으로 고정)
+        Args:
+            q (float or numpy.array): 조회 값
+        Returns:
+            float or numpy.array: 보간된 값
+        """
+        if np.ndim(q) == 0:
+            q = min(max(float(q), self.x_min), self.x_max)
+            i = self._scalar_index(q)
+            return self._y_list[i] + (q - self._x_list[i]) * self._slope_list[i]
+
+        q = np.clip(np.asarray(q, dtype=float), self.x_min, self.x_max)
+        idx = self.index(q)
+        return self.y[idx] + (q - self.x[idx]) * self.slopes[idx]
+
+    def slope(self, q):
+        """
+        q 위치의 기울기 dy/dx 조회 (범위 밖은 0)
+        Args:
+            q (float or numpy.array): 조회 값
+        Returns:
+            float or numpy.array: 기울기
+        """
+        q_arr = np.asarray(q, dtype=float)
+        inside = (q_arr >= self.x_min) & (q_arr <= self.x_max)
+        result = np.where(inside, self.slopes[self.index(q_arr)], 0.0)
+        return float(result) if np.ndim(q) == 0 else result
+
+    def value_and_slope(self, q):
+        """
+        보간 값과 기울기를 구간 번호 한 번 계산으로 조회 (Jacobian 계산용)
+        Args:
+            q (numpy.array): 조회 값
+        Returns:
+            tuple: (__call__ 과 같은 보간 값, slope 와 같은 기울기)
+        """
+        q = np.asarray(q, dtype=float)
+        clipped = np.clip(q, self.x_min, self.x_max)
+        idx = self.index(clipped)
+        slope = self.slopes[idx]
+        value = self.y[idx] + (clipped - self.x[idx]) * slope
+        return value, np.where(clipped == q, slope, 0.0)
+
+
+class LookupGrid:
+    def __init__(self, x, y, values):
+        """
+        2-D 격자 bilinear 보간 테이블 (각 축의 구간 번호는 LookupTable.index 로 계산)
+        Args:
+            x (numpy.array): 첫 번째 축 breakpoint (단조 증가)
+            y (numpy.array): 두 번째 축 breakpoint (단조 증가)
+            values (numpy.array): (len(x), len(y)) 격자 값
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        values = np.asarray(values, dtype=float)
+        if not (np.all(np.diff(x) > 0) and np.all(np.diff(y) > 0)):
+            raise ValueError("Lookup grid axes must be strictly increasing")
+        if values.shape != (x.size, y.size):
+            raise ValueError("Lookup grid values must have shape (len(x), len(y))")
+        self.x_axis = LookupTable(x, np.arange(x.size, dtype=float))
+        self.y_axis = LookupTable(y, np.arange(y.size, dtype=float))
+        self.values = np.ascontiguousarray(values)
+
+    def __call__(self, qx, qy):
+        """
+        보간 값 조회 (범위 밖은 각 축의 양 끝으로 고정)
+        Args:
+            qx (float or numpy.array): 첫 번째 축 조회 값
+            qy (float or numpy.array): 두 번째 축 조회 값
+        Returns:
+            float or numpy.array: 보간된 값
+        """
+        scalar = np.ndim(qx) == 0 and np.ndim(qy) == 0
+        xa, ya = self.x_axis, self.y_axis
+        qx = np.clip(np.asarray(qx, dtype=float), xa.x_min, xa.x_max)
+        qy = np.clip(np.asarray(qy, dtype=float), ya.x_min, ya.x_max)
+        i = xa.index(qx)
+        j = ya.index(qy)
+        fx = (qx - xa.x[i]) / (xa.x[i + 1] - xa.x[i])
+        fy = (qy - ya.x[j]) / (ya.x[j + 1] - ya.x[j])
+        v = self.values
+        low = v[i, j] + (v[i + 1, j] - v[i, j]) * fx
+        high = v[i, j + 1] + (v[i + 1, j + 1] - v[i, j + 1]) * fx
+        result = low + (high - low) * fy
+        return float(result) if scalar else result
+
+
+def get_lookup(BMS_configuration, name):
+    """
+    BMS_configuration 에 저장된 LookupTable 반환 (없으면 원본 테이블로 생성 후 저장)
+    Args:
+        BMS_configuration (dict): BMS 설정값
+        name (str): "r_lookup" (SOC -> 저항), "soc_ocv_lookup" (OCV -> SOC) 또는 "ocv_lookup" (SOC -> OCV)
+    Returns:
+        LookupTable: 해당 테이블
+    """
+    lookup = BMS_configuration.get(name)
+    if lookup is None:
+        if name == "r_lookup":
+            lookup = LookupTable.from_table(BMS_configuration["r_table"], 0, 1)
+        elif name == "soc_ocv_lookup":
+            lookup = LookupTable.from_table(BMS_configuration["soc_ocv_table"], 1, 0)
+        elif name == "ocv_lookup":
+            lookup = LookupTable.from_table(BMS_configuration["soc_ocv_table"], 0, 1)
+        else:
+            raise ValueError(f"Unsupported lookup: {name}")
+        BMS_configuration[name] = lookup
+    return lookup
@@ -0,0 +1,84 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from bms.batch_estimator import estimate_soc_batch
+
+
+def _estimate_chunk(args):
+    current, voltage, time_stamps, initial_soc, capacity, BMS_configuration, mode = args
+    return estimate_soc_batch(current, voltage, time_stamps, initial_soc,
+                              1, capacity, BMS_configuration, mode)
+
+
+class PackBMS:
+    def __init__(self, initial_soc, np_value, ns_value, capacity, BMS_configuration):
+        """
+        PackBMS 클래스 초기화 (Np x Ns 팩의 모든 셀 SOC 를 동시에 추정)
+        셀 순서는 c = s * Np + p (s: 직렬 위치, p: 병렬 string 번호) 로 가정
+        Args:
+            initial_soc (float or numpy.array): 초기 SOC (셀별 지정 가능)
+            np_value (int): 병렬 string 의 수
+            ns_value (int): string 당 직렬 셀의 수
+            capacity (float): 셀 정격 용량 (Ah)
+            BMS_configuration (dict): BMS 설정값 (load_table 로 테이블이 로드된 상태)
+        """
+        self.Np = np_value
+        self.Ns = ns_value
+        self.n_cells = np_value * ns_value
+        self.initial_soc = np.broadcast_to(np.asarray(initial_soc, dtype=float), (self.n_cells,))
+        self.capacity = capacity
+        self.BMS_configuration = BMS_configuration
+
+    def estimate_soc(self, current, voltage, temp, time_stamps, mode="current-voltage",
+                     n_workers=None):
+        """
+        셀별 SOC 추정 (셀 전류 기준이므로 셀마다 Np = 1 로 계산)
+        Args:
+            current (numpy.array): (cells, samples) 셀 전류 (A)
+            voltage (numpy.array): (cells, samples) 셀 전압 (V)
+            temp (numpy.array): (cells, samples) 셀 온도 (K)
+            time_stamps (numpy.array): (samples,) 또는 (cells, samples) 타임스탬프 (s)
+            mode (str): SOC 추정 모드 ("current-only", "voltage-only", "current-voltage")
+            n_workers (int): 프로세스 풀 크기 (None 이면 현재 프로세스에서 전체 셀을 한 번에 계산)
+        Returns:
+            numpy.array: (cells, samples) 추정 SOC
+        """
+        current = np.asarray(current, dtype=float)
+        voltage = np.asarray(voltage, dtype=float)
+        if current.shape[0] != self.n_cells:
+            raise ValueError(f"Expected {self.n_cells} cells, got {current.shape[0]}")
+        time_stamps = np.broadcast_to(np.asarray(time_stamps, dtype=float), current.shape)
+
+        if not n_workers or n_workers <= 1:
+            return estimate_soc_batch(current, voltage, time_stamps, self.initial_soc,
+                                      1, self.capacity, self.BMS_configuration, mode)
+
+        n_workers = min(n_workers, self.n_cells, os.cpu_count() or 1)
+        bounds = np.linspace(0, self.n_cells, n_workers + 1).astype(int)
+        chunks = [
+            (current[a:b], voltage[a:b], time_stamps[a:b], self.initial_soc[a:b],
+             self.capacity, self.BMS_configuration, mode)
+            for a, b in zip(bounds[:-1], bounds[1:]) if b > a
+        ]
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            return np.concatenate(list(pool.map(_estimate_chunk, chunks)), axis=0)
+
+    def aggregate(self, soc):
+        """
+        팩 단위 SOC 통계 계산
+        Args:
+            soc (numpy.array): (cells, samples) 셀별 SOC
+        Returns:
+            dict: 시점별 팩 min/max/mean 및 string 별 min/max/mean ((Np, samples))
+        """
+        per_string = soc.reshape(self.Ns, self.Np, -1)
+        return {
+            "min": soc.min(axis=0),
+            "max": soc.max(axis=0),
+            "mean": soc.mean(axis=0),
+            "string_min": per_string.min(axis=0),
+            "string_max": per_string.max(axis=0),
+            "string_mean": per_string.mean(axis=0),
+        }
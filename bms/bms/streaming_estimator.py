@@ -0,0 +1,171 @@
+import math
+
+import numpy as np
+
+from bms.batch_estimator import check_mode, continue_soc_batch, get_integration, get_thresholds
+
+
+class StreamingSOCEstimator:
+    def __init__(self, bms, mode="current-voltage"):
+        """
+        샘플 단위 SOC 추정기 (마지막 SOC, relax/OCV 타이머만 유지하므로 샘플당 O(1))
+        Args:
+            bms (MyBMS): 용량, 효율, 테이블 조회를 제공하는 MyBMS 객체
+            mode (str): SOC 추정 모드 ("current-only", "voltage-only", "current-voltage")
+        """
+        self.bms = bms
+        self.mode = check_mode(mode)
+        self.thresholds = get_thresholds(bms.BMS_configuration)
+        self.integration = get_integration(bms.BMS_configuration)
+        self.reset()
+
+    def reset(self, soc=None):
+        """
+        상태 초기화
+        Args:
+            soc (float): 시작 SOC (None 이면 bms.initial_soc)
+        """
+        self.soc = self.bms.initial_soc if soc is None else soc
+        self.time = None
+        self.current = 0.0
+        self.relax_start = None
+        self.ocv_start = None
+        self.n_samples = 0
+
+    def _coulomb_count(self, current, delta_t):
+        config = self.bms.BMS_configuration
+        # 양수 전류 = 방전 (utils/evaluation.py 와 같은 부호), 효율 계수 선택은 기존 estimate_soc 와 동일
+        if current > 0: # Discharging
+            eta = config["charging_eta"]
+            return self.soc - (current * delta_t) * eta / (self.bms.Np * self.bms.capacity)
+        # Charging
+        eta = config["discharging_eta"]
+        return self.soc - (current * delta_t) / (self.bms.Np * self.bms.capacity * eta)
+
+    def _soc_from_voltage(self, current, voltage):
+        resistance = self.bms.get_resistance(self.soc)
+        return self.bms.get_soc_from_ocv(voltage + current * resistance)
+
+    def update(self, current, voltage, temp, t):
+        """
+        샘플 하나로 SOC 갱신
+        Args:
+            current (float): 디코딩된 전류 (A)
+            voltage (float): 디코딩된 전압 (V)
+            temp (float): 디코딩된 온도 (K)
+            t (float): 타임스탬프 (s)
+        Returns:
+            float: 갱신된 SOC (첫 샘플은 초기 SOC 그대로)
+        """
+        self.n_samples += 1
+        if self.time is None:
+            self.time = t
+            self.current = current
+            return self.soc
+
+        delta_t = (t - self.time) / 3600
+        i_step = (self.current + current) / 2 if self.integration == "trapezoidal" else current
+        self.time = t
+        self.current = current
+        soc_t_current = self._coulomb_count(i_step, delta_t)
+
+        if self.mode == "current-only":
+            soc_t = soc_t_current
+        elif self.mode == "voltage-only":
+            soc_t = self._soc_from_voltage(current, voltage)
+        elif abs(current) < self.thresholds["i_ocv"]:
+            if self.relax_start is None:
+                self.relax_start = t
+            if self.ocv_start is None:
+                self.ocv_start = t
+            if t - self.relax_start >= self.thresholds["t_relx_minutes"] * 60:
+                soc_t = self._soc_from_voltage(current, voltage)
+            else:
+                soc_t = soc_t_current
+        elif abs(current) < self.thresholds["i_low"]:
+            self.relax_start = None
+            if self.ocv_start is None:
+                self.ocv_start = t
+            if t - self.ocv_start >= self.thresholds["t_ocv_minutes"] * 60:
+                alpha = self.bms.BMS_configuration["alpha"]
+                soc_t = alpha * soc_t_current + (1 - alpha) * self._soc_from_voltage(current, voltage)
+            else:
+                soc_t = soc_t_current
+        else:
+            self.relax_start = None
+            self.ocv_start = None
+            soc_t = soc_t_current
+
+        self.soc = soc_t
+        return soc_t
+
+    def update_batch(self, current, voltage, temp, time_stamps):
+        """
+        샘플 배치로 SOC 갱신 (배치 내부는 벡터화, 배치 간에는 상태만 전달)
+        Args:
+            current (numpy.array): 디코딩된 전류 (A)
+            voltage (numpy.array): 디코딩된 전압 (V)
+            temp (numpy.array): 디코딩된 온도 (K)
+            time_stamps (numpy.array): 타임스탬프 (s)
+        Returns:
+            numpy.array: 배치 각 샘플의 SOC
+        """
+        current = np.asarray(current, dtype=float)
+        voltage = np.asarray(voltage, dtype=float)
+        time_stamps = np.asarray(time_stamps, dtype=float)
+        if current.size == 0:
+            return np.empty(0)
+
+        head = []
+        if self.time is None:
+            head = [self.update(current[0], voltage[0], None, time_stamps[0])]
+            current, voltage, time_stamps = current[1:], voltage[1:], time_stamps[1:]
+
+        soc, state = continue_soc_batch(
+            self.get_state(), current, voltage, time_stamps,
+            self.bms.Np, self.bms.capacity, self.bms.BMS_configuration, self.mode,
+        )
+        self.set_state(state)
+        self.n_samples += current.size
+        return np.concatenate([head, soc])
+
+    def process(self, batches):
+        """
+        (current, voltage, temp, time_stamps) 배치를 차례로 받아 SOC 배열을 생성하는 generator
+        Args:
+            batches (iterable): 배치 튜플의 iterable
+        Yields:
+            numpy.array: 배치별 SOC
+        """
+        for current, voltage, temp, time_stamps in batches:
+            yield self.update_batch(current, voltage, temp, time_stamps)
+
+    def get_state(self):
+        """
+        현재 상태 반환 (비활성 타이머는 NaN)
+        Returns:
+            dict: "soc", "time", "current", "relax_start", "ocv_start"
+        """
+        return {
+            "soc": self.soc,
+            "time": math.nan if self.time is None else self.time,
+            "current": self.current,
+            "relax_start": math.nan if self.relax_start is None else self.relax_start,
+            "ocv_start": math.nan if self.ocv_start is None else self.ocv_start,
+        }
+
+    def set_state(self, state):
+        """
+        get_state / continue_soc_batch 형식의 상태 복원
+        Args:
+            state (dict): "soc", "time", "current", "relax_start", "ocv_start"
+        """
+        def optional(value):
+            value = float(value)
+            return None if math.isnan(value) else value
+
+        self.soc = float(state["soc"])
+        self.time = optional(state["time"])
+        self.current = float(state.get("current", 0.0))
+        self.relax_start = optional(state["relax_start"])
+        self.ocv_start = optional(state["ocv_start"])
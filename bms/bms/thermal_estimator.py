@@ -0,0 +1,156 @@
+import numpy as np
+
+from bms.batch_estimator import KIND_OCV, coulomb_steps, get_integration, kinds_from_masks, solve_anchored
+from bms.lookup_table import LookupGrid, get_lookup
+from configs.bms_config import BMS_configuration as BMS_PARAMETERS
+
+# README 알고리즘 파라미터 (BMS_configuration 에 같은 키가 있으면 그 값을 사용)
+THERMAL_KEYS = [
+    "dsg_current_threshold",  # 이 값보다 큰 전류는 방전 (A)
+    "chg_current_threshold",  # 이 값보다 작은 전류는 충전 (A)
+    "relax_dvdt_threshold",   # relax 안정 판정 |dV/dt| 상한 (V/s)
+    "relax_time_threshold",   # relax 안정 판정 최소 지속 시간 (s)
+    "temp_coef",              # 저항 온도 계수 (1/degC), R(T) = R(SOC) * exp(-temp_coef * (T - temp_ref))
+    "temp_ref",               # 저항 테이블의 기준 온도 (degC)
+    "degradation_rate",       # 누적 충전량이 design_capacity 만큼 늘 때마다 줄어드는 용량 (%)
+    "design_capacity",        # 설계 용량 (Ah)
+]
+
+# R(SOC, T) 격자의 온도 축 (degC), SOC 축은 r_table breakpoint 를 그대로 사용
+TEMP_GRID = np.arange(-40.0, 81.0, 1.0)
+
+MODE_RELAX = 0
+MODE_DISCHARGE = 1
+MODE_CHARGE = 2
+
+
+def get_thermal_parameters(BMS_configuration):
+    """
+    BMS_configuration 에서 README 알고리즘 파라미터 읽기 (없는 키는 configs/bms_config.py 값)
+    Args:
+        BMS_configuration (dict): BMS 설정값
+    Returns:
+        dict: THERMAL_KEYS 및 "relax_dvdt_window" (dV/dt 계산 샘플 간격, 기본값 1)
+    """
+    params = {key: BMS_configuration.get(key, BMS_PARAMETERS[key]) for key in THERMAL_KEYS}
+    params["relax_dvdt_window"] = int(BMS_configuration.get("relax_dvdt_window", 1))
+    return params
+
+
+def get_r_temp_lookup(BMS_configuration):
+    """
+    온도 보상 저항 R(SOC, T) 격자 반환 (없으면 r_table 로 생성 후 "r_temp_lookup" 에 저장)
+    Args:
+        BMS_configuration (dict): BMS 설정값
+    Returns:
+        LookupGrid: (SOC, 온도 degC) -> 저항 (Ohm)
+    """
+    lookup = BMS_configuration.get("r_temp_lookup")
+    if lookup is None:
+        params = get_thermal_parameters(BMS_configuration)
+        r_lookup = get_lookup(BMS_configuration, "r_lookup")
+        factor = np.exp(-params["temp_coef"] * (TEMP_GRID - params["temp_ref"]))
+        lookup = LookupGrid(r_lookup.x, TEMP_GRID, np.outer(r_lookup.y, factor))
+        BMS_configuration["r_temp_lookup"] = lookup
+    return lookup
+
+
+def classify_modes(current, dsg_threshold, chg_threshold):
+    """
+    README 의 모드 판정 (방전 / 충전 / relax)
+    Args:
+        current (numpy.array): 전류 (A), 양수 = 방전
+        dsg_threshold (float): 방전 판정 임계값 (A)
+        chg_threshold (float): 충전 판정 임계값 (A, 음수)
+    Returns:
+        numpy.array: MODE_RELAX / MODE_DISCHARGE / MODE_CHARGE
+    """
+    modes = np.full(np.shape(current), MODE_RELAX, dtype=np.int8)
+    modes[current > dsg_threshold] = MODE_DISCHARGE
+    modes[current < chg_threshold] = MODE_CHARGE
+    return modes
+
+
+def capacity_fade(current, time_stamps, np_value, capacity, params):
+    """
+    누적 충전량에 비례하는 선형 용량 감소 (설계 용량의 1% 아래로는 줄이지 않음)
+    Args:
+        current (numpy.array): (cells, samples) 전류 (A), 음수 = 충전
+        time_stamps (numpy.array): (cells, samples) 타임스탬프 (s)
+        np_value (int): 병렬 연결된 셀의 수
+        capacity (float): 시작 용량 (Ah)
+        params (dict): get_thermal_parameters 결과
+    Returns:
+        tuple: ((cells, samples) 각 샘플 이후의 용량 (Ah), (cells, samples) 셀당 누적 충전량 (Ah))
+    """
+    charged = np.zeros(current.shape)
+    charged[:, 1:] = np.cumsum(np.maximum(-current[:, 1:], 0.0) * np.diff(time_stamps, axis=1), axis=1)
+    charged /= 3600 * np_value
+    fade = params["degradation_rate"] / 100 * charged
+    return np.maximum(capacity - fade, 0.01 * params["design_capacity"]), charged
+
+
+def estimate_soc_thermal(decoded_current, decoded_voltage, decoded_temp, time_stamps, initial_soc,
+                         np_value, capacity, BMS_configuration, tol=1e-12, max_iter=None):
+    """
+    README 알고리즘 (모드 판정, dV/dt 기반 relax 안정 판정, 온도 보상 IR 보정, 용량 감소) 벡터화 추정
+    Args:
+        decoded_current (numpy.array): 디코딩된 전류 (A), (samples,) 또는 (cells, samples)
+        decoded_voltage (numpy.array): 디코딩된 전압 (V), current 와 같은 shape
+        decoded_temp (numpy.array): 디코딩된 온도 (K), current 와 같은 shape
+        time_stamps (numpy.array): 타임스탬프 (s), (samples,) 또는 current 와 같은 shape
+        initial_soc (float or numpy.array): 초기 SOC (셀별 지정 가능)
+        np_value (int): 병렬 연결된 셀의 수
+        capacity (float): 시작 용량 (Ah)
+        BMS_configuration (dict): BMS 설정값 (load_table 로 테이블이 로드된 상태)
+        tol (float): anchor 고정점 반복 허용 오차
+        max_iter (int): anchor 고정점 최대 반복 횟수
+    Returns:
+        dict: "SOC", "mode" (MODE_*), "capacity" (샘플별 용량, Ah), "charged" (셀당 누적 충전량, Ah)
+            (입력과 같은 shape)
+    """
+    current = np.asarray(decoded_current, dtype=float)
+    squeeze = current.ndim == 1
+    current = np.atleast_2d(current)
+    voltage = np.broadcast_to(np.asarray(decoded_voltage, dtype=float), current.shape)
+    temp_c = np.broadcast_to(np.asarray(decoded_temp, dtype=float), current.shape) - 273.15
+    t = np.broadcast_to(np.asarray(time_stamps, dtype=float), current.shape)
+    cells, n = current.shape
+    initial = np.broadcast_to(np.asarray(initial_soc, dtype=float), (cells,))
+    params = get_thermal_parameters(BMS_configuration)
+
+    modes = classify_modes(current, params["dsg_current_threshold"], params["chg_current_threshold"])
+    # step k 는 직전 샘플까지의 충전량으로 줄어든 용량을 사용
+    capacity_now, charged = capacity_fade(current, t, np_value, capacity, params)
+    dq = coulomb_steps(current, t, np_value, capacity_now[:, :-1],
+                       BMS_configuration["charging_eta"], BMS_configuration["discharging_eta"],
+                       get_integration(BMS_configuration))
+
+    # relax 안정 판정: relax 지속 시간 (kinds_from_masks 의 OCV 판정) + window 샘플 간 |dV/dt|
+    relax = modes == MODE_RELAX
+    inactive = np.full(cells, np.nan)
+    kinds, _, _ = kinds_from_masks(relax.copy(), relax.copy(), t, inactive, inactive,
+                                   params["relax_time_threshold"], np.inf)
+    w = min(max(params["relax_dvdt_window"], 1), max(n - 1, 1))
+    dvdt = np.full(current.shape, np.inf)
+    lag = np.arange(n) - w
+    lag[:w] = 0
+    span = t - t[:, lag]
+    np.divide(np.abs(voltage - voltage[:, lag]), span, out=dvdt, where=span > 0)
+    anchor = (kinds == KIND_OCV) & (dvdt < params["relax_dvdt_threshold"])
+
+    r_temp_lookup = get_r_temp_lookup(BMS_configuration)
+    soc_ocv_lookup = get_lookup(BMS_configuration, "soc_ocv_lookup")
+    cur_flat = current.ravel()
+    vol_flat = voltage.ravel()
+    temp_flat = temp_c.ravel()
+
+    def step(anchors, x_prev):
+        ocv = vol_flat[anchors] + cur_flat[anchors] * r_temp_lookup(x_prev, temp_flat[anchors])
+        return soc_ocv_lookup(ocv)
+
+    soc = solve_anchored(initial, dq, anchor, step, tol=tol, max_iter=max_iter)
+    result = {"SOC": soc, "mode": modes, "capacity": capacity_now, "charged": charged}
+    if squeeze:
+        return {key: value[0] for key, value in result.items()}
+    return result
@@ -1,12 +1,20 @@
 from simulation.battery_simulation import BatterySimulation
+from simulation.result_cache import SimulationCache
 from adc.adc_module import ADC
-from utils.io_pipeline import run_bms, compute_MSE
+from utils.io_pipeline import compute_MSE
+from utils.pipeline import run_ensemble, run_pipeline
+from utils.plotting import plot_soc_overlay
+from utils.profiling import StageProfiler
+from configs.bms_config import BMS_configuration as BMS_PARAMETERS
 
 test_soc = 1.0
 np_value = 1
 capacity = 5
 output_csv_file = "/home/sanggeun/battery/simulation_data1.csv"
 
+# 단계별 시간/메모리 측정 (hook="cprofile" 또는 "tracemalloc" 으로 상세 profile)
+profiler = StageProfiler(hook=None)
+
 # Simulation 
 simulation = BatterySimulation(
     I_mag=5,
@@ -21,36 +29,66 @@ simulation = BatterySimulation(
 simulation.setup_circuit()
 # simulation.draw_circuit()
 simulation.setup_experiment()
-simulation.run_simulation()
-simulation.get_results()
-simulation.plot_results()
-simulation.get_ocv_from_output()
+with profiler.stage("simulation") as record:
+    simulation.run_simulation(cache=SimulationCache("/home/sanggeun/battery/sim_cache"))
+    record["samples"] = len(simulation.get_arrays()["Time [s]"])
+# 시뮬레이션 결과 plot (display 없이 파일로 저장)
+simulation.plot_results(out_file="/home/sanggeun/battery/simulation.png")
+with profiler.stage("reference soc"):
+    simulation.get_ocv_from_output()
 print("SIM COM")
 
 # ADC Quantization
 my_ADC = ADC()
-quantized_path = my_ADC.run()
-print("ADC COM")
 
 # BMS Config & Test
 BMS_configuration = {
     "charging_eta": 1.0,
     "discharging_eta": 1.0,
     "alpha": 0.5,
+    "i_low": 0.1,
+    "i_ocv": 0.05,
+    "t_relx_minutes": 120,
+    "t_ocv_minutes": 30,
+    "integration": "rectangular",  # 또는 "trapezoidal"
     "r_file": "/home/sanggeun/battery/reduced_r_table.csv",
     "soc_ocv_file": "/home/sanggeun/battery/reduced_soc_ocv_curve.csv",
+    # "temperature-compensated" 모드 (README 알고리즘) 파라미터
+    **{key: BMS_PARAMETERS[key] for key in (
+        "dsg_current_threshold", "chg_current_threshold",
+        "relax_dvdt_threshold", "relax_time_threshold",
+        "temp_coef", "temp_ref", "degradation_rate", "design_capacity",
+    )},
 }
+bms_mode = "current-voltage"  # 또는 "current-only", "voltage-only", "temperature-compensated"
 
-run_bms(
+# Simulation --> ADC --> BMS (파일 저장은 선택)
+result = run_pipeline(
+    simulation,
+    my_ADC,
     initial_soc=test_soc,
     np_value=np_value,
     capacity=capacity,
     BMS_configuration=BMS_configuration,
-    csv_file_path=quantized_path,
-    output_csv_file=output_csv_file,
+    mode=bms_mode,
+    sim_file=simulation.output_file,
+    adc_file=my_ADC.output_file,
+    bms_file=output_csv_file,
+    profiler=profiler,
 )
+print(f"Final SOC: {result['SOC'][-1]:.6f}")
 print("BMS COM")
 
 # MSE Calculate
-compute_MSE("/home/sanggeun/battery/soc_log.csv", output_csv_file)
+with profiler.stage("evaluation", len(result["SOC"])):
+    compute_MSE("/home/sanggeun/battery/soc_log.csv", output_csv_file, BMS_configuration)
+# 기준 SOC 와 BMS SOC 비교 plot (display 없이 파일로 저장)
+plot_soc_overlay("/home/sanggeun/battery/soc_log.csv", result,
+                 out_file="/home/sanggeun/battery/soc_overlay.png")
+
+# ADC 노이즈 Monte-Carlo ensemble (realization 을 셀 축으로 한 번에 추정, 기준 SOC 대비 오차 분포)
+ensemble = run_ensemble(simulation, my_ADC, 32, test_soc, np_value, capacity, BMS_configuration,
+                        "/home/sanggeun/battery/soc_log.csv", mode=bms_mode, profiler=profiler)
+print(ensemble["summary"])
+profiler.print_report()
 # simulation.discharge_and_log_soc_ocv_curve()
\ No newline at end of file
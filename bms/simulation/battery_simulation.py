@@ -1,23 +1,71 @@
-import liionpack as lp
-import pybamm
 import numpy as np
-import matplotlib.pyplot as plt
 import pandas as pd
 import os
+import warnings
 
-def load_drive_cycles():
-    os.chdir(pybamm.__path__[0] + "/..")
+from simulation.result_cache import SimulationCache
+from utils.array_store import ArrayStore, ArrayStoreWriter, is_array_store, read_manifest, save_store
+from utils.sim_results import TIME_COLUMN, collect_results, save_results, load_results
+
+def load_drive_cycles(names=("test3.csv",)):
+    """
+    pybamm 에 포함된 drive cycle 읽기 (작업 디렉터리는 변경하지 않음)
+    Args:
+        names (iterable): drive cycle 파일 이름 (예: "test3.csv", "compare3.csv") 또는 절대 경로
+    Returns:
+        list: (time, current) 배열 리스트
+    """
     return [
-        # pd.read_csv("pybamm/input/drive_cycles/compare3.csv", comment="#", header=None).to_numpy(),
-        pd.read_csv("pybamm/input/drive_cycles/test3.csv", comment="#", header=None).to_numpy(),
+        pd.read_csv(drive_cycle_path(name), comment="#", header=None).to_numpy()
+        for name in names
     ]
 
+
+def drive_cycle_path(name):
+    """
+    drive cycle 파일의 절대 경로
+    Args:
+        name (str): pybamm/input/drive_cycles 아래 파일 이름 또는 절대 경로
+    Returns:
+        str: 절대 경로
+    """
+    if os.path.isabs(name):
+        return name
+    import pybamm
+
+    return os.path.join(os.path.dirname(os.path.abspath(pybamm.__file__)), "input", "drive_cycles", name)
+
 class BatterySimulation:
+    OUTPUT_VARIABLES = [
+        "Terminal voltage [V]",
+        "X-averaged cell temperature [K]",
+        "Battery open-circuit voltage [V]",
+    ]
+    EXPERIMENT_PERIOD = "1 second"
+    MODEL_OPTIONS = {
+        "SEI": "ec reaction limited",
+        "SEI film resistance": "distributed",
+        "SEI porosity change": "true",
+        "thermal": "lumped",
+    }
+
     def __init__(self, I_mag, OCV_init, Ri_init, R_busbar, R_connection, Np, Ns, initial_soc,
                  output_file="/home/sanggeun/battery/output_log2.csv",
-                 soc_log="/home/sanggeun/battery/soc_log.csv"):
+                 soc_log="/home/sanggeun/battery/soc_log.csv",
+                 drive_cycles=None, nproc=None, store_dir=None, store_chunk=10 ** 5, checkpoint_steps=False,
+                 checkpoint_window=3600):
         """
         배터리 시뮬레이션 파라미터 초기화
+        Args:
+            drive_cycles (list): (time, current) drive cycle 배열 리스트 (None 이면 test3.csv)
+            nproc (int): lp.solve 워커 수 (None 이면 liionpack 기본값)
+            store_dir (str): 결과를 memory-map array store 로 저장할 디렉터리
+                (None 이면 메모리에 유지, 지정하면 solve 후 결과를 블록 단위로 옮기고 메모리에서 해제)
+            store_chunk (int): store 에 한 번에 쓰는 샘플 수
+            checkpoint_steps (bool): True 면 drive cycle 을 checkpoint_window 길이 구간으로 나눠 구간마다 lp.solve 를
+                따로 실행하고 끝난 구간을 store_dir 에 바로 추가 (중단 후 다시 실행하면 완료한 구간 다음부터 재개)
+                구간 사이에는 평균 SOC 만 이어지므로 한 번의 lp.solve 와 같은 시뮬레이션이 아닌 근사 (run_simulation 참고)
+            checkpoint_window (float): checkpoint 구간 길이 (drive cycle 시간, s, None 이면 drive cycle 단위)
         """
         self.I_mag = I_mag
         self.OCV_init = OCV_init
@@ -35,12 +83,29 @@ class BatterySimulation:
 
         self.output_file = output_file
         self.soc_log = soc_log
-        self.drive_cycles = load_drive_cycles()
+        self._drive_cycles = drive_cycles
+        self.nproc = nproc
+        self.store_dir = store_dir
+        self.store_chunk = store_chunk
+        self.checkpoint_steps = checkpoint_steps
+        self.checkpoint_window = checkpoint_window
+
+    @property
+    def drive_cycles(self):
+        """
+        drive cycle 배열 (처음 사용할 때 읽음)
+        """
+        if self._drive_cycles is None:
+            self._drive_cycles = load_drive_cycles()
+        return self._drive_cycles
 
     def setup_circuit(self):
         """
         회로 설정 
         """
+        import liionpack as lp
+        import pybamm
+
         self.parameter_values = pybamm.ParameterValues("Chen2020")
         self.netlist = lp.setup_circuit(
             Np=self.Np, Ns=self.Ns, Rb=self.R_busbar, Rc=self.R_connection
@@ -50,6 +115,8 @@ class BatterySimulation:
         """
         회로 출력
         """
+        import liionpack as lp
+
         lp.draw_circuit(self.netlist, cpt_size=kwargs.get("cpt_size", 1.0),
                         dpi=kwargs.get("dpi", 150), node_spacing=kwargs.get("node_spacing", 2.5))
 
@@ -57,20 +124,18 @@ class BatterySimulation:
         '''
         초기 실험 Setup
         '''
+        import pybamm
+
         self.experiment = pybamm.Experiment(
             [pybamm.step.current(dc) for dc in self.drive_cycles],
-            period="1 second",
+            period=self.EXPERIMENT_PERIOD,
         )
 
     def _sei_degradation_with_temperature_model(self, parameter_values=None):
-        model = pybamm.lithium_ion.SPM(
-            options={
-                "SEI": "ec reaction limited",
-                "SEI film resistance": "distributed",
-                "SEI porosity change": "true",
-                "thermal": "lumped",
-            }
-        )
+        import liionpack as lp
+        import pybamm
+
+        model = pybamm.lithium_ion.SPM(options=dict(self.MODEL_OPTIONS))
         model = lp.add_events_to_model(model)
 
         if parameter_values is None:
@@ -93,75 +158,224 @@ class BatterySimulation:
         )
         return sim
 
-    def run_simulation(self):
+    def cache_key(self):
+        """
+        시뮬레이션 결과를 결정하는 파라미터, 실험 정의, drive cycle, 라이브러리 버전의 hash
+        Returns:
+            str: SimulationCache key
+        """
+        import liionpack as lp
+        import pybamm
+
+        params = {
+            "I_mag": self.I_mag,
+            "OCV_init": self.OCV_init,
+            "Ri_init": self.Ri_init,
+            "R_busbar": self.R_busbar,
+            "R_connection": self.R_connection,
+            "Np": self.Np,
+            "Ns": self.Ns,
+            "initial_soc": self.initial_soc,
+            "parameter_set": "Chen2020",
+            "model_options": self.MODEL_OPTIONS,
+            "experiment": {"step": "current", "period": self.EXPERIMENT_PERIOD},
+            "output_variables": self.OUTPUT_VARIABLES,
+        }
+        if self.checkpoint_steps:
+            # step 별 solve 는 한 번에 solve 한 결과와 다르므로 다른 key 사용
+            params["checkpoint_steps"] = True
+            params["checkpoint_window"] = self.checkpoint_window
+        versions = {
+            "pybamm": getattr(pybamm, "__version__", "unknown"),
+            "liionpack": getattr(lp, "__version__", "unknown"),
+        }
+        return SimulationCache.make_key(params, self.drive_cycles, versions)
+
+    def run_simulation(self, cache=None):
         """
         시뮬레이션 실행
+        store_dir 를 지정하면 self.output 은 디스크의 ArrayStore (변수/셀/시간 단위로 lazy slicing)
+        checkpoint_steps 를 사용하면 구간마다 새로 solve 하고 다음 구간에는 Coulomb counting 한 셀 평균 SOC 만
+        넘기므로, 온도, SEI, 병렬 셀 간 SOC 편차는 구간마다 초기값으로 돌아감 (중단 없이 실행해도 한 번의
+        lp.solve 결과와 다름). 구간 경계의 물리 상태가 중요하면 checkpoint_steps 없이 실행
+        Args:
+            cache (SimulationCache): 결과 캐시 (같은 key 의 결과가 있으면 solve 생략)
         """
-        output_variables = [
-            "Terminal voltage [V]",
-            "X-averaged cell temperature [K]",
-            "Battery open-circuit voltage [V]",
-        ]
+        import liionpack as lp
+
+        key = None
+        if cache is not None or self.store_dir is not None:
+            key = self.cache_key()
+        if self.store_dir is not None and is_array_store(self.store_dir):
+            store = ArrayStore(self.store_dir)
+            if store.attrs.get("cache_key") == key and store.attrs.get("complete", True):
+                self.output = store
+                print(f"Loaded stored simulation: {self.store_dir}")
+                return
+        if cache is not None:
+            self.output = cache.get(key)
+            if self.output is not None:
+                print(f"Loaded cached simulation: {key[:12]}")
+                self._to_store(key)
+                return
+        if self.checkpoint_steps:
+            self._run_steps(key)
+            if cache is not None:
+                cache.put(key, self.output)
+            return
+
+        solve_kwargs = {} if self.nproc is None else {"nproc": self.nproc}
         self.output = lp.solve(
             netlist=self.netlist,
             parameter_values=self.parameter_values,
             experiment=self.experiment,
             sim_func=self._sei_degradation_with_temperature_model,
-            output_variables=output_variables,
+            output_variables=self.OUTPUT_VARIABLES,
             initial_soc=self.initial_soc,
+            **solve_kwargs,
         )
+        if cache is not None:
+            cache.put(key, self.output)
+        self._to_store(key)
 
-    def get_results(self):
+    def _segments(self):
+        # drive cycle 을 checkpoint_window 초 구간으로 나눔 (경계 샘플은 양쪽 구간에 포함, 구간 시간은 0 부터)
+        segments = []
+        for dc in self.drive_cycles:
+            dc = np.asarray(dc, dtype=float)
+            rel = dc[:, 0] - dc[0, 0]
+            cuts = [0, len(dc) - 1]
+            if self.checkpoint_window is not None:
+                edges = np.arange(self.checkpoint_window, rel[-1], self.checkpoint_window)
+                cuts = np.unique(np.concatenate([[0], np.searchsorted(rel, edges), [len(dc) - 1]]))
+            for lo, hi in zip(cuts[:-1], cuts[1:]):
+                segment = dc[lo:hi + 1].copy()
+                segment[:, 0] -= segment[0, 0]
+                segments.append(segment)
+        return segments
+
+    def _run_steps(self, key):
+        # 구간 하나씩 solve 하고, 구간 결과와 진행 상태를 같은 manifest 갱신으로 store 에 기록
+        # 다음 구간의 초기 SOC 는 셀 평균 전류의 Coulomb counting 으로 이어 받음
+        # (셀별 SOC 편차, 온도, SEI 등 나머지 상태는 구간마다 초기값에서 다시 시작)
+        import liionpack as lp
+        import pybamm
+
+        if self.store_dir is None:
+            raise ValueError("checkpoint_steps requires store_dir")
+        if self.Np > 1 or self.MODEL_OPTIONS.get("thermal", "isothermal") != "isothermal":
+            warnings.warn(
+                "checkpoint_steps restarts each window from the carried mean SOC only; temperature, SEI and "
+                f"per-cell SOC spread (Np={self.Np}) are reset, so results approximate a single lp.solve",
+                stacklevel=3,
+            )
+        segments = self._segments()
+        writer = None
+        progress = {"segments_done": 0, "soc": self.initial_soc, "time": None}
+        if is_array_store(self.store_dir):
+            attrs = read_manifest(self.store_dir)["attrs"]
+            if attrs.get("cache_key") == key and "segments_done" in attrs:
+                writer = ArrayStoreWriter(self.store_dir, None, resume=True)
+                progress = {name: attrs[name] for name in progress}
+                print(f"Resuming simulation from segment {progress['segments_done']} / {len(segments)}")
+        if writer is None:
+            writer = ArrayStoreWriter(self.store_dir, self.Np * self.Ns,
+                                      attrs=dict(progress, cache_key=key, complete=False))
+
+        capacity = self.parameter_values["Nominal cell capacity [A.h]"]
+        solve_kwargs = {} if self.nproc is None else {"nproc": self.nproc}
+        for k in range(progress["segments_done"], len(segments)):
+            experiment = pybamm.Experiment([pybamm.step.current(segments[k])], period=self.EXPERIMENT_PERIOD)
+            output = lp.solve(
+                netlist=self.netlist,
+                parameter_values=self.parameter_values,
+                experiment=experiment,
+                sim_func=self._sei_degradation_with_temperature_model,
+                output_variables=self.OUTPUT_VARIABLES,
+                initial_soc=progress["soc"],
+                **solve_kwargs,
+            )
+            data = collect_results(output)
+            t = data[TIME_COLUMN]
+            current = data["Cell current [A]"].mean(axis=1)
+            soc = progress["soc"] - np.sum(current[1:] * np.diff(t)) / (capacity * 3600)
+            if progress["time"] is not None:
+                # 첫 샘플은 이전 구간의 마지막 샘플과 같은 시점이므로 제외하고 이전 구간 끝에 이어 붙임
+                t = t - t[0] + progress["time"]
+                data = {name: values[1:] for name, values in data.items()}
+                data[TIME_COLUMN] = t[1:]
+            progress = {"segments_done": k + 1, "soc": float(soc), "time": float(t[-1])}
+            writer.append(data, attrs=progress)
+            print(f"Simulation segment {k + 1} / {len(segments)} stored")
+        writer.update_attrs({"complete": True})
+        writer.close()
+        self.output = ArrayStore(self.store_dir)
+
+    def _to_store(self, key):
+        # lp.solve 결과를 store 로 옮기고 메모리의 배열은 해제 (이후 읽기는 memmap)
+        if self.store_dir is None:
+            return
+        save_store(self.output, self.store_dir, chunk_size=self.store_chunk, attrs={"cache_key": key})
+        self.output = ArrayStore(self.store_dir)
+
+    def get_results(self, output_file=None, fmt=None):
         """
-        시뮬레이션 결과에서 필요한 정보만 출력
+        시뮬레이션 결과에서 필요한 정보만 한 번에 저장
+        Args:
+            output_file (str): 저장 경로 (None 이면 self.output_file)
+            fmt (str): "csv", "npz", "npy", "parquet" (None 이면 확장자로 판단)
+        Returns:
+            str: 저장 경로
         """
         if self.output is None:
             print("No output to save.")
-            return
+            return None
 
-        for i in range(len(self.output["Time [s]"])):
-            row = {
-                "Time [s]": [self.output["Time [s]"][i]],
-                "Cell current [A]": [self.output["Cell current [A]"][i]],
-                "Terminal voltage [V]": [self.output["Terminal voltage [V]"][i]],
-                "X-averaged cell temperature [K]": [self.output["X-averaged cell temperature [K]"][i]],
-                "Battery open-circuit voltage [V]": [self.output["Battery open-circuit voltage [V]"][i]],
-                "Cell internal resistance [Ohm]": [self.output["Cell internal resistance [Ohm]"][i]],
-            }
-            df = pd.DataFrame(row)
-            df.to_csv(self.output_file, mode="a", header=not os.path.exists(self.output_file), index=False)
+        return save_results(self.output, output_file or self.output_file, fmt=fmt)
+
+    def get_arrays(self):
+        """
+        시뮬레이션 결과를 파일 저장 없이 float 배열 dict 로 반환
+        Returns:
+            dict: "Time [s]" 는 (time,), 셀 변수는 (time, cells) 배열 (결과가 없으면 None)
+                (store_dir 를 쓰면 복사 없는 memmap 이므로 잘라 쓴 부분만 디스크에서 읽음)
+        """
+        if self.output is None:
+            return None
+        return collect_results(self.output)
 
-    def plot_results(self):
+    def plot_results(self, out_file=None, width_px=1200, cells=None):
         """
-        시뮬레이션 결과 Plot
+        시뮬레이션 결과 Plot (선마다 width_px 에 맞춰 min/max decimation 후 그림)
+        Args:
+            out_file (str): 저장 경로 (지정하면 display 없이 Agg 로 파일에 저장, None 이면 plt.show)
+            width_px (int): 가로 픽셀 수
+            cells (int, slice, list): 그릴 셀 (None 이면 전체)
+        Returns:
+            matplotlib.figure.Figure: 그린 figure (결과가 없으면 None)
         """
-        if self.output is not None:
-            lp.plot_output(self.output)
-            plt.show()
+        if self.output is None:
+            return None
+        from utils.plotting import plot_simulation
+
+        return plot_simulation(self.output, out_file, width_px, cells=cells, interactive=out_file is None)
 
     def discharge_and_log_soc_ocv_curve(self):
-        soc_ocv_data = []
+        data = self.get_arrays()
         total_capacity = self.Np * 5  # 배터리 총 용량 (예시)
-        soc = [self.initial_soc]
-        prev_t = self.output["Time [s]"][0]
-
-        for i in range(1, len(self.output["Time [s]"])):
-            current = self.output["Cell current [A]"][i] # 각 time step의 전류 값
-            t_now = self.output["Time [s]"][i]
-            dt = t_now - prev_t
-            prev_t = t_now
-            ocv = self.output["Battery open-circuit voltage [V]"][i] # 각 time step의 OCV 값
-
-            # SOC 계산 (Coulomb Counting 방식)
-            soc_t = soc[-1] - (current * dt) / (total_capacity * 3600)
-            soc_t = max(0.0, soc_t)
-            soc.append(soc_t)
-            soc_ocv_data.append((soc_t, ocv))
-            if soc_t <= 0:
-                break
+        t = data["Time [s]"]
+        current = data["Cell current [A]"][1:, 0]  # 각 time step의 전류 값
+        ocv = data["Battery open-circuit voltage [V]"][1:, 0]  # 각 time step의 OCV 값
+
+        # SOC 계산 (Coulomb Counting 누적 적분), 처음 0 이하가 되는 step 에서 0 으로 고정 후 종료
+        soc = self.initial_soc - np.cumsum(current * np.diff(t)) / (total_capacity * 3600)
+        empty = np.flatnonzero(soc <= 0)
+        if empty.size:
+            soc, ocv = soc[:empty[0] + 1], ocv[:empty[0] + 1]
+            soc[-1] = 0.0
 
         # SOC와 OCV pair 저장
-        df = pd.DataFrame(soc_ocv_data, columns=["SOC", "OCV"])
+        df = pd.DataFrame({"SOC": soc, "OCV": ocv})
         df.to_csv(self.soc_log.replace("soc_log.csv", "soc_ocv_curve.csv"), index=False)
         print("SOC-OCV 곡선 저장 완료.")
 
@@ -173,49 +387,33 @@ class BatterySimulation:
             print(f"CSV 파일을 찾을 수 없습니다: {csv_path}")
             return None
 
-        # output_log2.csv 읽기 (헤더 없는 경우를 대비해 names 지정)
-        column_names = [
-            "Time [s]", "Cell current [A]", "Terminal voltage [V]",
-            "X-averaged cell temperature [K]", "Battery open-circuit voltage [V]", "Pack terminal voltage [V]"
-        ]
         try:
-            output_df = pd.read_csv(self.output_file, header=None, names=column_names)
+            output_data = self.get_arrays() if self.output is not None else load_results(self.output_file)
         except FileNotFoundError:
             print(f"CSV 파일을 찾을 수 없습니다: {self.output_file}")
             return None
 
-        def clean(x):
-            if isinstance(x, str):
-                x = x.strip("[]")
-            return float(x)
-
         try:
-            soc_ocv_df["OCV"] = soc_ocv_df["OCV"].apply(clean)
-            soc_ocv_df["SOC"] = soc_ocv_df["SOC"].apply(clean)
+            for col in ("OCV", "SOC"):
+                if not pd.api.types.is_numeric_dtype(soc_ocv_df[col]):
+                    soc_ocv_df[col] = soc_ocv_df[col].astype(str).str.strip("[]").astype(float)
         except Exception as e:
             print(f"데이터 정리 중 오류: {e}")
             return None
 
         soc_ocv_df = soc_ocv_df.sort_values("OCV").drop_duplicates(subset="OCV")
-        results = []
-
         ocv_vals = soc_ocv_df["OCV"].values
         soc_vals = soc_ocv_df["SOC"].values
 
-        for ocv in output_df["Battery open-circuit voltage [V]"].dropna():
-            ocv = clean(ocv)
-            # 범위 밖이면 스킵
-            if ocv < ocv_vals.min() or ocv > ocv_vals.max():
-                continue
-            # 선형 보간
-            idx = np.searchsorted(ocv_vals, ocv)  # 오름차순 가정
-            idx = np.clip(idx, 1, len(ocv_vals) - 1)
-            x1, x2 = ocv_vals[idx - 1], ocv_vals[idx]
-            y1, y2 = soc_vals[idx - 1], soc_vals[idx]
-            soc = y1 + (ocv - x1) * (y2 - y1) / (x2 - x1)
-            results.append({"OCV": ocv, "SOC": soc})
-
-        res_df = pd.DataFrame(results)
+        # NaN 및 범위 밖 OCV 는 제외하고 한 번에 선형 보간
+        output_ocv = output_data["Battery open-circuit voltage [V]"][:, 0]
+        valid = (output_ocv >= ocv_vals[0]) & (output_ocv <= ocv_vals[-1])
+        ocv = output_ocv[valid]
+        res_df = pd.DataFrame({
+            "Time [s]": output_data["Time [s]"][valid],
+            "OCV": ocv,
+            "SOC": np.interp(ocv, ocv_vals, soc_vals),
+        })
         res_df.to_csv(self.soc_log, index=False)
         print(f"SOC 로그 저장: {self.soc_log}")
         return res_df
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+
+class SimulationCache:
+    def __init__(self, cache_dir, max_bytes=2 * 1024 ** 3):
+        """
+        시뮬레이션 결과 캐시 (파라미터 hash 를 key 로 사용, 용량 초과 시 LRU 삭제)
+        Args:
+            cache_dir (str): 캐시 디렉터리
+            max_bytes (int): 캐시 최대 용량 (byte)
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(params, arrays=(), versions=None):
+        """
+        파라미터, 입력 배열, 라이브러리 버전으로 content-addressed key 생성
+        Args:
+            params (dict): JSON 으로 직렬화 가능한 파라미터
+            arrays (iterable): 결과에 영향을 주는 입력 배열 (예: drive cycle)
+            versions (dict): 라이브러리 버전
+        Returns:
+            str: sha256 hex digest
+        """
+        h = hashlib.sha256()
+        h.update(json.dumps({"params": params, "versions": versions or {}},
+                            sort_keys=True, default=str).encode())
+        for arr in arrays:
+            arr = np.ascontiguousarray(arr)
+            h.update(str((arr.dtype.str, arr.shape)).encode())
+            h.update(arr.tobytes())
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def get(self, key):
+        """
+        캐시된 결과 읽기 (읽은 항목은 최근 사용으로 갱신)
+        Args:
+            key (str): make_key 결과
+        Returns:
+            dict: 저장된 출력 배열 (없으면 None)
+        """
+        path = self._path(key)
+        try:
+            with np.load(path) as npz:
+                output = {name: npz[name] for name in npz.files}
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        os.utime(path)
+        return output
+
+    def put(self, key, output):
+        """
+        결과 저장 후 용량 제한에 맞춰 오래된 항목 삭제
+        Args:
+            key (str): make_key 결과
+            output (dict): 저장할 출력 배열 (숫자 배열만 저장)
+        """
+        arrays = {}
+        for name, value in output.items():
+            arr = np.asarray(value)
+            if arr.dtype.kind in "biuf":
+                arrays[name] = arr
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict(keep=key)
+
+    def evict(self, keep=None):
+        """
+        최근 사용 시각(mtime)이 오래된 항목부터 삭제하여 max_bytes 이하로 유지
+        Args:
+            keep (str): 삭제하지 않을 key
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".npz"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if keep is not None and path == self._path(keep):
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,122 @@
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+from utils.sim_results import to_frame
+
+# BatterySimulation 기본 파라미터 (main.py 와 동일)
+DEFAULT_SCENARIO = {
+    "I_mag": 5,
+    "OCV_init": 3.6,
+    "Ri_init": 5e-2,
+    "R_busbar": 1.5e-3,
+    "R_connection": 1e-2,
+    "Np": 1,
+    "Ns": 1,
+    "initial_soc": 1.0,
+    "drive_cycles": ("test3.csv",),
+}
+
+
+def _run_scenario(name, scenario, lp_workers, cache_dir):
+    from simulation.battery_simulation import BatterySimulation, load_drive_cycles
+    from simulation.result_cache import SimulationCache
+
+    start = time.perf_counter()
+    try:
+        params = dict(DEFAULT_SCENARIO)
+        params.update(scenario)
+        cycles = params.pop("drive_cycles")
+        if cycles and isinstance(cycles[0], str):
+            cycles = load_drive_cycles(cycles)
+
+        simulation = BatterySimulation(drive_cycles=list(cycles), nproc=lp_workers, **params)
+        simulation.setup_circuit()
+        simulation.setup_experiment()
+        simulation.run_simulation(cache=SimulationCache(cache_dir) if cache_dir else None)
+        return name, simulation.get_arrays(), time.perf_counter() - start, None
+    except Exception:
+        return name, None, time.perf_counter() - start, traceback.format_exc()
+
+
+def _collect(futures, frames, report):
+    # 끝난 시나리오를 frames/report 에 기록하고, 풀이 깨져 결과가 없는 시나리오 이름을 반환
+    broken = []
+    for future in as_completed(futures):
+        name = futures[future]
+        try:
+            name, data, wall_time, error = future.result()
+        except BrokenProcessPool:
+            broken.append(name)
+            continue
+        except Exception:
+            data, wall_time, error = None, float("nan"), traceback.format_exc()
+        if error is None:
+            frames[name] = to_frame(data)
+            print(f"[{name}] done in {wall_time:.1f} s")
+        else:
+            print(f"[{name}] failed after {wall_time:.1f} s")
+        report.append({
+            "scenario": name,
+            "status": "ok" if error is None else "failed",
+            "wall_time [s]": wall_time,
+            "samples": 0 if data is None else len(data["Time [s]"]),
+            "error": error,
+        })
+    return broken
+
+
+def run_scenarios(scenarios, n_workers=None, lp_workers=None, cache_dir=None):
+    """
+    여러 시뮬레이션 시나리오를 프로세스 풀에서 동시에 실행
+    Args:
+        scenarios (dict): 시나리오 이름 -> BatterySimulation 파라미터 dict
+            ("drive_cycles" 는 파일 이름 또는 (time, current) 배열 리스트, 나머지는 DEFAULT_SCENARIO 참고)
+        n_workers (int): 동시에 실행할 시나리오 수 (None 이면 CPU 수와 시나리오 수 중 작은 값)
+        lp_workers (int): 시나리오별 lp.solve 워커 수 (None 이면 CPU 수 / n_workers)
+        cache_dir (str): SimulationCache 디렉터리 (None 이면 캐시 사용 안 함)
+    Returns:
+        tuple: (시나리오/샘플 MultiIndex 결과 DataFrame, 시나리오별 상태 DataFrame)
+    """
+    cpus = os.cpu_count() or 1
+    if n_workers is None:
+        n_workers = min(cpus, len(scenarios)) or 1
+    if lp_workers is None:
+        lp_workers = max(1, cpus // n_workers)
+
+    frames, report = {}, []
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        futures = {pool.submit(_run_scenario, name, scenario, lp_workers, cache_dir): name
+                   for name, scenario in scenarios.items()}
+        broken = _collect(futures, frames, report)
+
+    # 워커 프로세스가 비정상 종료 (solver segfault, OOM kill 등) 하면 풀 전체가 깨지므로
+    # 끝나지 않은 시나리오는 시나리오마다 별도 풀에서 다시 실행해 원인 시나리오만 실패로 기록
+    for start in range(0, len(broken), n_workers):
+        names = broken[start:start + n_workers]
+        pools = [ProcessPoolExecutor(max_workers=1) for _ in names]
+        try:
+            futures = {pool.submit(_run_scenario, name, scenarios[name], lp_workers, cache_dir): name
+                       for pool, name in zip(pools, names)}
+            for name in _collect(futures, frames, report):
+                print(f"[{name}] worker process terminated abruptly")
+                report.append({
+                    "scenario": name,
+                    "status": "failed",
+                    "wall_time [s]": float("nan"),
+                    "samples": 0,
+                    "error": "worker process terminated abruptly (BrokenProcessPool)",
+                })
+        finally:
+            for pool in pools:
+                pool.shutdown()
+
+    order = [name for name in scenarios if name in frames]
+    dataset = pd.concat([frames[name] for name in order], keys=order,
+                        names=["scenario", "sample"]) if order else pd.DataFrame()
+    report = pd.DataFrame(report).set_index("scenario").loc[list(scenarios)]
+    return dataset, report
@@ -0,0 +1,255 @@
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from adc.calibration import calibrations_from_ranges
+from bms.mybms_module import MyBMS
+from telemetry.protocol import MAX_FRAME_SAMPLES, SAMPLE_HEADER, encode_error, encode_result, read_frame
+from utils.io_pipeline import load_table
+from utils.quantized_store import record_dtype
+
+logger = logging.getLogger(__name__)
+
+# 워커별 추정기와 calibration (initializer 에서 한 번만 생성)
+_worker = {}
+
+
+def _init_worker(settings):
+    config = settings["BMS_configuration"]
+    if "r_table" not in config:
+        load_table(config)
+    bms = MyBMS(settings["initial_soc"], settings["np_value"], settings["capacity"], config)
+    _worker["estimator"] = bms.stream(settings["mode"])
+    _worker["calibrations"] = list(calibrations_from_ranges(settings["ranges"]).values())
+
+
+def _update_pack(state, time_stamps, codes):
+    # 워커는 상태를 갖지 않고 pack 상태를 받아 이어서 추정하므로 어느 워커에서 실행해도 결과가 같음
+    estimator = _worker["estimator"]
+    estimator.set_state(state)
+    current, voltage, temp = (cal.decode(codes[:, k]) for k, cal in enumerate(_worker["calibrations"]))
+    soc = estimator.update_batch(current, voltage, temp, time_stamps)
+    return soc, estimator.get_state()
+
+
+class _Frame:
+    __slots__ = ("connection", "seq", "sent_ns", "records")
+
+    def __init__(self, connection, seq, sent_ns, records):
+        self.connection = connection
+        self.seq = seq
+        self.sent_ns = sent_ns
+        self.records = records
+
+
+class _Connection:
+    def __init__(self, writer):
+        # 처리 중인 frame 수 (0 이 되면 idle), 연결을 닫기 전에 남은 결과를 모두 보냄
+        self.writer = writer
+        self.pending = 0
+        self.idle = asyncio.Event()
+        self.idle.set()
+
+    def add(self):
+        self.pending += 1
+        self.idle.clear()
+
+    def done(self):
+        self.pending -= 1
+        if self.pending == 0:
+            self.idle.set()
+
+
+class IngestServer:
+    def __init__(self, initial_soc, np_value, capacity, BMS_configuration, ranges, adc_bits,
+                 mode="current-voltage", max_batch=4096, max_delay=0.005, queue_frames=64,
+                 n_workers=None, use_processes=True, max_frame_samples=MAX_FRAME_SAMPLES):
+        """
+        pack controller 들의 양자화 샘플 frame 을 받아 pack 별로 micro-batch 후 SOC 를 추정하는 asyncio 서버
+        pack 마다 입력 queue 와 batch task 가 하나씩 있고, SOC 갱신은 워커 pool 에서 실행
+        (queue 가 차면 소켓 읽기를 멈추므로 TCP 흐름 제어로 송신 측에 backpressure 전달)
+        Args:
+            initial_soc (float): pack 별 초기 SOC
+            np_value (int): 병렬 연결된 셀의 수
+            capacity (float): 배터리의 정격 용량 (Ah)
+            BMS_configuration (dict): BMS 설정값
+            ranges (dict): ADC.ranges() 형식의 ADC 설정 (디코딩용, 채널별 비트 수 포함)
+            adc_bits (int): 코드 저장 비트 수 (frame 레코드 형식, 가장 넓은 채널 이상)
+            mode (str): streaming SOC 추정 모드 ("current-only", "voltage-only", "current-voltage")
+            max_batch (int): batch 하나의 최대 샘플 수
+            max_delay (float): 첫 frame 이후 batch 를 모으는 최대 대기 시간 (s)
+            queue_frames (int): pack 별 입력 queue 크기 (frame 수)
+            n_workers (int): 워커 수 (None 이면 CPU 수)
+            use_processes (bool): True 면 process pool, False 면 thread pool
+            max_frame_samples (int): frame 하나의 최대 샘플 수 (넘으면 해당 연결을 끊음)
+        """
+        self.dtype = record_dtype(adc_bits)
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue_frames = queue_frames
+        self.max_frame_samples = max_frame_samples
+        settings = {
+            "initial_soc": initial_soc, "np_value": np_value, "capacity": capacity,
+            "BMS_configuration": BMS_configuration, "ranges": ranges, "mode": mode,
+        }
+        self.initial_state = MyBMS(initial_soc, np_value, capacity, BMS_configuration).stream(mode).get_state()
+        pool = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self.pool = pool(max_workers=n_workers, initializer=_init_worker, initargs=(settings,))
+        self.packs = {}
+        self.states = {}
+        self.subscribers = []
+        self.handlers = set()
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=0):
+        """
+        연결 대기 시작
+        Args:
+            host (str): 주소
+            port (int): 포트 (0 이면 임의 포트)
+        Returns:
+            tuple: 실제 (host, port)
+        """
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self, host="0.0.0.0", port=8765):
+        """
+        연결 대기 시작 후 취소될 때까지 실행
+        """
+        await self.start(host, port)
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """
+        연결 대기를 멈추고 batch task 와 워커 pool 종료
+        """
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        tasks = list(self.handlers) + [task for _, task in self.packs.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.pool.shutdown()
+
+    def subscribe(self, maxsize=1024):
+        """
+        SOC 결과 구독 (queue 가 차면 해당 pack 의 batch 처리가 기다림)
+        Args:
+            maxsize (int): queue 크기 (batch 수)
+        Returns:
+            asyncio.Queue: (pack_id, 타임스탬프 배열, SOC 배열) 항목
+        """
+        queue = asyncio.Queue(maxsize)
+        self.subscribers.append(queue)
+        return queue
+
+    def _pack_queue(self, pack_id):
+        if pack_id not in self.packs:
+            queue = asyncio.Queue(self.queue_frames)
+            task = asyncio.get_running_loop().create_task(self._run_pack(pack_id, queue))
+            self.packs[pack_id] = (queue, task)
+            self.states[pack_id] = dict(self.initial_state)
+        return self.packs[pack_id][0]
+
+    async def _handle(self, reader, writer):
+        # close() 에서 남은 연결을 정리할 수 있도록 handler task 를 기록
+        task = asyncio.current_task()
+        self.handlers.add(task)
+        connection = _Connection(writer)
+        try:
+            while True:
+                try:
+                    pack_id, seq, sent_ns, records = await read_frame(reader, SAMPLE_HEADER, self.dtype,
+                                                                      self.max_frame_samples)
+                except asyncio.IncompleteReadError:
+                    break
+                except ValueError as e:
+                    # 잘못된 frame 이후로는 frame 경계를 알 수 없으므로 연결을 끊음 (남은 결과는 보내지 않음)
+                    logger.warning("Dropping connection %s: %s", writer.get_extra_info("peername"), e)
+                    return
+                connection.add()
+                await self._pack_queue(pack_id).put(_Frame(connection, seq, sent_ns, records))
+            await connection.idle.wait()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.handlers.discard(task)
+            writer.close()
+
+    async def _collect(self, queue):
+        # 첫 frame 을 기다린 뒤 이미 도착한 frame 을 모으고, max_batch 미만이면 max_delay 까지 더 기다림
+        frames = [await queue.get()]
+        n = len(frames[0].records)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_delay
+        while n < self.max_batch:
+            if queue.empty():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    frame = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                frame = queue.get_nowait()
+            frames.append(frame)
+            n += len(frame.records)
+        return frames
+
+    async def _run_pack(self, pack_id, queue):
+        # pack 상태는 batch 순서대로만 갱신되므로 pack 안에서는 batch 를 하나씩 처리
+        loop = asyncio.get_running_loop()
+        while True:
+            frames = await self._collect(queue)
+            records = np.concatenate([frame.records for frame in frames])
+            time_stamps = np.ascontiguousarray(records["time"])
+            try:
+                soc, self.states[pack_id] = await loop.run_in_executor(
+                    self.pool, _update_pack, self.states[pack_id], time_stamps,
+                    np.ascontiguousarray(records["codes"]))
+            except Exception:
+                # 실패한 batch 의 frame 에는 STATUS_ERROR 로 응답하고 pack 상태는 유지
+                logger.exception("pack %d: batch of %d samples failed", pack_id, len(records))
+                await self._reply(frames, [encode_error(pack_id, frame.seq, frame.sent_ns) for frame in frames])
+                continue
+            await self._publish(pack_id, frames, time_stamps, soc)
+
+    async def _reply(self, frames, payloads):
+        # frame 별 결과를 해당 연결로 보내고 drain 한 뒤 처리 완료로 표시
+        writers = []
+        for frame, payload in zip(frames, payloads):
+            writer = frame.connection.writer
+            if not writer.is_closing():
+                writer.write(payload)
+                if writer not in writers:
+                    writers.append(writer)
+        for writer in writers:
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+        for frame in frames:
+            frame.connection.done()
+
+    async def _publish(self, pack_id, frames, time_stamps, soc):
+        bounds = np.cumsum([0] + [len(frame.records) for frame in frames])
+        await self._reply(frames, [
+            encode_result(pack_id, frame.seq, frame.sent_ns, time_stamps[lo:hi], soc[lo:hi])
+            for frame, lo, hi in zip(frames, bounds[:-1], bounds[1:])
+        ])
+        for subscriber in self.subscribers:
+            await subscriber.put((pack_id, time_stamps, soc))
+
+    def get_states(self):
+        """
+        pack 별 추정기 상태 (StreamingSOCEstimator.get_state 형식)
+        """
+        return {pack_id: dict(state) for pack_id, state in self.states.items()}
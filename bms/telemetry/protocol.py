@@ -0,0 +1,77 @@
+import struct
+
+import numpy as np
+
+from utils.quantized_store import record_dtype
+
+# 샘플 frame: pack_id, seq, 송신 시각 (ns, 응답에 그대로 돌려줌), 샘플 수 + record_dtype 레코드
+# 레코드는 .qadc 와 같은 (타임스탬프, 채널별 ADC code) 형식
+SAMPLE_HEADER = struct.Struct("<IIQI")
+
+# 결과 frame: pack_id, seq, 송신 시각 (ns), 상태, 샘플 수 + 샘플별 (타임스탬프, SOC) float64
+# (처리에 실패한 frame 은 STATUS_ERROR 와 빈 레코드로 응답)
+RESULT_HEADER = struct.Struct("<IIQII")
+RESULT_DTYPE = np.dtype([("time", "<f8"), ("soc", "<f8")])
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+# frame 하나의 최대 샘플 수 (header 의 샘플 수를 그대로 믿으면 잘못된 frame 하나로 큰 메모리를 할당하게 됨)
+MAX_FRAME_SAMPLES = 1 << 16
+
+
+def encode_samples(pack_id, seq, sent_ns, time_stamps, codes, adc_bits):
+    """
+    양자화 샘플 블록을 frame bytes 로 변환
+    Args:
+        pack_id (int): pack 번호
+        seq (int): frame 번호
+        sent_ns (int): 송신 시각 (ns)
+        time_stamps (numpy.array): (samples,) 타임스탬프 (s)
+        codes (numpy.array): (samples, 3) ADC code (QUANTIZED_COLUMNS 순서)
+        adc_bits (int): ADC 비트 수
+    Returns:
+        bytes: header + 레코드
+    """
+    records = np.empty(len(time_stamps), dtype=record_dtype(adc_bits))
+    records["time"] = time_stamps
+    records["codes"] = codes
+    return SAMPLE_HEADER.pack(pack_id, seq, sent_ns, len(records)) + records.tobytes()
+
+
+def encode_result(pack_id, seq, sent_ns, time_stamps, soc, status=STATUS_OK):
+    """
+    SOC 결과를 frame bytes 로 변환 (STATUS_ERROR 면 time_stamps, soc 는 빈 배열)
+    """
+    records = np.empty(len(soc), dtype=RESULT_DTYPE)
+    records["time"] = time_stamps
+    records["soc"] = soc
+    return RESULT_HEADER.pack(pack_id, seq, sent_ns, status, len(records)) + records.tobytes()
+
+
+def encode_error(pack_id, seq, sent_ns):
+    """
+    처리에 실패한 frame 의 결과 frame bytes (STATUS_ERROR, 레코드 없음)
+    """
+    return encode_result(pack_id, seq, sent_ns, (), (), STATUS_ERROR)
+
+
+async def read_frame(reader, header, dtype, max_samples=MAX_FRAME_SAMPLES):
+    """
+    frame 하나 읽기
+    Args:
+        reader (asyncio.StreamReader): 입력 stream
+        header (struct.Struct): SAMPLE_HEADER 또는 RESULT_HEADER
+        dtype (numpy.dtype): 레코드 형식
+        max_samples (int): 허용하는 최대 샘플 수
+    Returns:
+        tuple: header 의 샘플 수를 제외한 필드 + 레코드 배열
+            (SAMPLE_HEADER 는 (pack_id, seq, sent_ns, 레코드), RESULT_HEADER 는 (pack_id, seq, sent_ns, status, 레코드))
+    Raises:
+        asyncio.IncompleteReadError: frame 중간에 연결이 끊긴 경우 (frame 경계에서 끊기면 partial 이 비어 있음)
+        ValueError: 샘플 수가 max_samples 보다 큰 경우 (payload 는 읽지 않음)
+    """
+    *fields, n = header.unpack(await reader.readexactly(header.size))
+    if n > max_samples:
+        raise ValueError(f"Frame of {n} samples exceeds the limit of {max_samples}")
+    payload = await reader.readexactly(n * dtype.itemsize)
+    return (*fields, np.frombuffer(payload, dtype=dtype))
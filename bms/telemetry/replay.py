@@ -0,0 +1,170 @@
+import argparse
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+
+# bms/ (main.py 가 있는 디렉터리) 에서 python -m telemetry.replay 로 실행
+from bms.batch_estimator import STREAMING_MODES
+from telemetry.protocol import RESULT_DTYPE, RESULT_HEADER, STATUS_OK, encode_samples, read_frame
+from utils.quantized_store import QUANTIZED_COLUMNS, csv_ranges, is_quantized_file, open_quantized, read_header
+
+LATENCY_PERCENTILES = (50, 95, 99)
+
+
+def load_log(path, adc_bits=None):
+    """
+    ADC 출력 (quantized_log.csv 또는 .qadc) 에서 타임스탬프와 양자화 코드 읽기
+    Args:
+        path (str): 파일 경로
+        adc_bits (int): 설정 파일이 없는 CSV 의 ADC 비트 수 (.qadc 는 헤더 값 사용)
+    Returns:
+        tuple: ((samples,) 타임스탬프, (samples, 3) 코드, 코드 저장 비트 수,
+            ADC.ranges() 형식의 디코딩 설정 (.qadc 는 헤더, CSV 는 함께 저장된 설정 파일 값))
+    """
+    if is_quantized_file(path):
+        data = open_quantized(path)
+        codes = np.column_stack([data[col] for col in QUANTIZED_COLUMNS])
+        header = read_header(path)
+        return np.asarray(data["Time [s]"], dtype=float), codes, header["adc_bits"], header["ranges"]
+    frame = pd.read_csv(path, usecols=["Time [s]"] + QUANTIZED_COLUMNS)
+    ranges = csv_ranges(path, adc_bits)
+    adc_bits = int(round(np.log2(ranges["q_levels"])))
+    return frame["Time [s]"].to_numpy(dtype=float), frame[QUANTIZED_COLUMNS].to_numpy(), adc_bits, ranges
+
+
+async def replay_pack(host, port, pack_id, time_stamps, codes, adc_bits, speed=1.0, frame_size=10):
+    """
+    pack controller 하나를 흉내 내어 샘플을 frame 단위로 보내고 SOC 결과를 받음
+    frame 은 마지막 샘플의 측정 시각 (타임스탬프 / speed) 에 맞춰 전송
+    Args:
+        host (str): 서버 주소
+        port (int): 서버 포트
+        pack_id (int): pack 번호
+        time_stamps (numpy.array): (samples,) 타임스탬프 (s)
+        codes (numpy.array): (samples, 3) ADC code
+        adc_bits (int): ADC 비트 수
+        speed (float): 실제 시간 대비 재생 배속 (None 또는 0 이면 최대 속도)
+        frame_size (int): frame 하나의 샘플 수
+    Returns:
+        dict: "latency" (frame 별 송신 --> 결과 수신 시간, s), "soc" (SOC 배열, 서버에서 실패한 frame 은 NaN),
+            "errors" (실패한 frame 수)
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    n = len(time_stamps)
+    n_frames = -(-n // frame_size)
+    latency = np.empty(n_frames)
+    soc = np.full(n, np.nan)
+    errors = 0
+
+    async def receive():
+        nonlocal errors
+        for _ in range(n_frames):
+            _, seq, sent_ns, status, records = await read_frame(reader, RESULT_HEADER, RESULT_DTYPE)
+            latency[seq] = (time.perf_counter_ns() - sent_ns) / 1e9
+            if status != STATUS_OK:
+                errors += 1
+                continue
+            soc[seq * frame_size:seq * frame_size + len(records)] = records["soc"]
+
+    receiver = asyncio.create_task(receive())
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for seq in range(n_frames):
+        lo, hi = seq * frame_size, min((seq + 1) * frame_size, n)
+        if speed:
+            delay = start + (time_stamps[hi - 1] - time_stamps[0]) / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        writer.write(encode_samples(pack_id, seq, time.perf_counter_ns(),
+                                    time_stamps[lo:hi], codes[lo:hi], adc_bits))
+        await writer.drain()
+    await receiver
+    writer.close()
+    await writer.wait_closed()
+    return {"latency": latency, "soc": soc, "errors": errors}
+
+
+async def run_replay(path, host, port, n_packs=1, speed=1.0, frame_size=10, adc_bits=None, limit=None):
+    """
+    같은 로그를 n_packs 개의 pack 연결로 동시에 재생하고 처리량과 지연 시간 측정
+    Args:
+        path (str): quantized_log.csv 또는 .qadc 경로
+        host (str): 서버 주소
+        port (int): 서버 포트
+        n_packs (int): 동시 연결 (pack) 수
+        speed (float): 재생 배속 (None 또는 0 이면 최대 속도)
+        frame_size (int): frame 하나의 샘플 수
+        adc_bits (int): 설정 파일이 없는 CSV 의 ADC 비트 수
+        limit (int): pack 별 최대 샘플 수 (None 이면 전체)
+    Returns:
+        dict: samples, wall_time [s], samples/s, latency p50/p95/p99/max [ms], 실패한 frame 수, pack 별 마지막 SOC
+    """
+    time_stamps, codes, adc_bits, _ = load_log(path, adc_bits)
+    if limit is not None:
+        time_stamps, codes = time_stamps[:limit], codes[:limit]
+    start = time.perf_counter()
+    results = await asyncio.gather(*(
+        replay_pack(host, port, pack_id, time_stamps, codes, adc_bits, speed, frame_size)
+        for pack_id in range(n_packs)
+    ))
+    wall = time.perf_counter() - start
+
+    latency = np.concatenate([r["latency"] for r in results]) * 1e3
+    samples = len(time_stamps) * n_packs
+    report = {"samples": samples, "wall_time [s]": wall, "samples/s": samples / wall}
+    for q, value in zip(LATENCY_PERCENTILES, np.percentile(latency, LATENCY_PERCENTILES)):
+        report[f"latency p{q} [ms]"] = float(value)
+    report["latency max [ms]"] = float(latency.max())
+    report["errors"] = sum(r["errors"] for r in results)
+    report["final_soc"] = [float(r["soc"][-1]) for r in results]
+    return report
+
+
+async def _replay_local(args):
+    # 같은 프로세스에서 서버를 띄우고 재생 (한 대의 머신에서 벤치마크)
+    from benchmarks.pipeline_benchmark import BMS_CONFIGURATION, CAPACITY
+    from telemetry.ingest import IngestServer
+
+    _, _, adc_bits, ranges = load_log(args.log, args.adc_bits)
+    server = IngestServer(args.initial_soc, 1, CAPACITY, dict(BMS_CONFIGURATION),
+                          ranges, adc_bits, mode=args.mode,
+                          max_batch=args.max_batch, max_delay=args.max_delay, n_workers=args.workers)
+    host, port = await server.start()
+    try:
+        return await run_replay(args.log, host, port, args.packs, args.speed, args.frame_size,
+                                adc_bits, args.limit)
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay quantized ADC logs into the telemetry ingest server")
+    parser.add_argument("log", help="quantized_log.csv or .qadc")
+    parser.add_argument("--host", default=None, help="server address (omit to start a local server)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--packs", type=int, default=8)
+    parser.add_argument("--speed", type=float, default=100.0, help="replay speed (0 = as fast as possible)")
+    parser.add_argument("--frame-size", type=int, default=10)
+    parser.add_argument("--adc-bits", type=int, default=None, help="ADC bits of a CSV log without .ranges.json")
+    parser.add_argument("--limit", type=int, default=None, help="samples per pack")
+    parser.add_argument("--mode", default="current-voltage", choices=STREAMING_MODES)
+    parser.add_argument("--initial-soc", type=float, default=1.0)
+    parser.add_argument("--max-batch", type=int, default=4096)
+    parser.add_argument("--max-delay", type=float, default=0.005)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.host is None:
+        report = asyncio.run(_replay_local(args))
+    else:
+        report = asyncio.run(run_replay(args.log, args.host, args.port, args.packs, args.speed,
+                                        args.frame_size, args.adc_bits, args.limit))
+    for key, value in report.items():
+        print(f"{key}: {value}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+import json
+import os
+from collections.abc import Mapping
+
+import numpy as np
+
+from utils.sim_results import CELL_COLUMNS, TIME_COLUMN
+
+VERSION = 1
+MANIFEST = "manifest.json"
+DTYPE = np.dtype("<f8")
+
+
+def _write_manifest(path, manifest):
+    # 읽는 쪽이 항상 완전한 manifest 를 보도록 임시 파일에 쓴 뒤 교체
+    tmp_path = os.path.join(path, MANIFEST + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, os.path.join(path, MANIFEST))
+
+
+def read_manifest(path):
+    """
+    array store manifest 읽기
+    Args:
+        path (str): store 디렉터리
+    Returns:
+        dict: n_time, n_cells, variables (변수 이름 --> 파일 이름), attrs 등
+    """
+    with open(os.path.join(path, MANIFEST)) as f:
+        return json.load(f)
+
+
+def is_array_store(path):
+    """
+    array store 디렉터리 여부 (manifest 기준)
+    """
+    return os.path.isfile(os.path.join(path, MANIFEST))
+
+
+class ArrayStoreWriter:
+    def __init__(self, path, n_cells, columns=CELL_COLUMNS, attrs=None, resume=False):
+        """
+        시뮬레이션 결과를 시간 블록 단위로 이어 쓰는 on-disk array store
+        변수마다 (time, cells) float64 raw 파일 하나를 두고, manifest 에 기록된 샘플 수까지만 유효
+        Args:
+            path (str): store 디렉터리 (resume 이 아니면 덮어씀)
+            n_cells (int): 셀 수
+            columns (list): 저장할 셀 변수 이름
+            attrs (dict): manifest 에 함께 저장할 JSON 값 (예: 시뮬레이션 cache key)
+            resume (bool): True 면 기존 store 의 manifest 를 읽어 이어 씀
+                (manifest 의 샘플 수 이후에 쓰다 중단된 데이터는 잘라냄, n_cells/columns/attrs 는 무시)
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        if resume:
+            self.manifest = read_manifest(path)
+        else:
+            self.manifest = {
+                "version": VERSION,
+                "dtype": DTYPE.str,
+                "n_time": 0,
+                "n_cells": int(n_cells),
+                "time": "time.bin",
+                "variables": {name: f"var{k}.bin" for k, name in enumerate(columns)},
+                "attrs": dict(attrs or {}),
+            }
+            _write_manifest(path, self.manifest)
+        n_time, cells = self.manifest["n_time"], self.manifest["n_cells"]
+        filenames = {TIME_COLUMN: (self.manifest["time"], n_time)}
+        for name, filename in self.manifest["variables"].items():
+            filenames[name] = (filename, n_time * cells)
+        self.files = {}
+        for name, (filename, n_values) in filenames.items():
+            f = open(os.path.join(path, filename), "r+b" if resume else "wb")
+            f.truncate(n_values * DTYPE.itemsize)
+            f.seek(0, os.SEEK_END)
+            self.files[name] = f
+
+    @property
+    def attrs(self):
+        return self.manifest["attrs"]
+
+    def append(self, data, attrs=None):
+        """
+        시간 블록 추가 (모든 변수를 쓴 뒤 manifest 의 샘플 수 갱신)
+        Args:
+            data (dict): "Time [s]" 는 (samples,), 셀 변수는 (samples, cells) 또는 (samples,) 배열
+            attrs (dict): 샘플 수와 같은 manifest 갱신으로 기록할 attrs 값 (예: 완료한 실험 step 수)
+        """
+        t = np.asarray(data[TIME_COLUMN], dtype=DTYPE).ravel()
+        n, cells = t.size, self.manifest["n_cells"]
+        blocks = {}
+        for name in self.manifest["variables"]:
+            values = np.asarray(data[name], dtype=DTYPE)
+            if values.size != n * cells:
+                raise ValueError(f"{name}: expected {n} x {cells} values, got shape {values.shape}")
+            blocks[name] = values.reshape(n, cells)
+
+        self.files[TIME_COLUMN].write(t.tobytes())
+        for name, values in blocks.items():
+            self.files[name].write(np.ascontiguousarray(values).tobytes())
+        for f in self.files.values():
+            f.flush()
+        self.manifest["n_time"] += n
+        self.manifest["attrs"].update(attrs or {})
+        _write_manifest(self.path, self.manifest)
+
+    def update_attrs(self, attrs):
+        """
+        데이터 추가 없이 manifest attrs 갱신
+        Args:
+            attrs (dict): 갱신할 JSON 값
+        """
+        self.manifest["attrs"].update(attrs)
+        _write_manifest(self.path, self.manifest)
+
+    def close(self):
+        """
+        파일 닫기
+        """
+        for f in self.files.values():
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ArrayStore(Mapping):
+    def __init__(self, path):
+        """
+        ArrayStoreWriter 로 저장한 결과를 memory-map 으로 읽는 읽기 전용 store
+        store["변수"] 는 복사 없는 (time, cells) memmap, "Time [s]" 는 (time,)
+        Args:
+            path (str): store 디렉터리
+        """
+        self.path = path
+        self.manifest = read_manifest(path)
+        self.dtype = np.dtype(self.manifest["dtype"])
+        self.n_time = self.manifest["n_time"]
+        self.n_cells = self.manifest["n_cells"]
+        self.attrs = self.manifest.get("attrs", {})
+        self._arrays = {}
+
+    def _open(self, name):
+        if name == TIME_COLUMN:
+            filename, shape = self.manifest["time"], (self.n_time,)
+        else:
+            filename, shape = self.manifest["variables"][name], (self.n_time, self.n_cells)
+        if self.n_time == 0:
+            return np.empty(shape, dtype=self.dtype)
+        return np.memmap(os.path.join(self.path, filename), dtype=self.dtype, mode="r", shape=shape)
+
+    def __getitem__(self, name):
+        if name != TIME_COLUMN and name not in self.manifest["variables"]:
+            raise KeyError(name)
+        if name not in self._arrays:
+            self._arrays[name] = self._open(name)
+        return self._arrays[name]
+
+    def __iter__(self):
+        yield TIME_COLUMN
+        yield from self.manifest["variables"]
+
+    def __len__(self):
+        return 1 + len(self.manifest["variables"])
+
+    def sel(self, name, cells=None, start=None, stop=None, step=None):
+        """
+        변수 하나를 셀/시간 구간으로 잘라 읽기 (필요한 부분만 디스크에서 읽음)
+        Args:
+            name (str): 변수 이름 ("Time [s]" 이면 cells 무시)
+            cells (int, slice, list): 셀 번호 (None 이면 전체)
+            start (int): 시작 샘플
+            stop (int): 끝 샘플 (미포함)
+            step (int): 샘플 간격
+        Returns:
+            numpy.array: 메모리로 읽은 배열 ((time,) 또는 (time, cells), cells 가 int 면 (time,))
+        """
+        rows = slice(start, stop, step)
+        values = self[name]
+        if name == TIME_COLUMN:
+            return np.array(values[rows])
+        return np.array(values[rows, slice(None) if cells is None else cells])
+
+    def iter_chunks(self, chunk_size, columns=None, cells=None, start=0, stop=None):
+        """
+        시간 블록 단위로 읽는 generator (블록 크기만큼만 메모리 사용)
+        Args:
+            chunk_size (int): 블록 샘플 수
+            columns (list): 읽을 셀 변수 (None 이면 전체)
+            cells (int, slice, list): 셀 번호 (None 이면 전체)
+            start (int): 시작 샘플
+            stop (int): 끝 샘플 (None 이면 끝까지)
+        Yields:
+            dict: load_results 형식의 블록 ("Time [s]" 및 변수별 배열)
+        """
+        columns = list(self.manifest["variables"]) if columns is None else columns
+        stop = self.n_time if stop is None else min(stop, self.n_time)
+        for lo in range(start, stop, chunk_size):
+            hi = min(lo + chunk_size, stop)
+            block = {TIME_COLUMN: self.sel(TIME_COLUMN, start=lo, stop=hi)}
+            for name in columns:
+                block[name] = self.sel(name, cells, lo, hi)
+            yield block
+
+
+def save_store(output, path, chunk_size=10 ** 5, columns=CELL_COLUMNS, attrs=None):
+    """
+    lp.solve 결과 (또는 collect_results / ArrayStore 형식 dict) 를 시간 블록 단위로 store 에 저장
+    Args:
+        output (dict): "Time [s]" 및 셀 변수 배열
+        path (str): store 디렉터리
+        chunk_size (int): 한 번에 쓰는 샘플 수
+        columns (list): 저장할 셀 변수 이름
+        attrs (dict): manifest 에 함께 저장할 값
+    Returns:
+        str: store 디렉터리
+    """
+    t = np.asarray(output[TIME_COLUMN]).ravel()
+    n = t.size
+    arrays = {name: np.asarray(output[name]).reshape(n, -1) for name in columns}
+    n_cells = arrays[columns[0]].shape[1] if columns else 1
+    with ArrayStoreWriter(path, n_cells, columns, attrs) as writer:
+        for lo in range(0, n, chunk_size):
+            block = {TIME_COLUMN: t[lo:lo + chunk_size]}
+            block.update({name: values[lo:lo + chunk_size] for name, values in arrays.items()})
+            writer.append(block)
+    return path
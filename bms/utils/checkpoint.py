@@ -0,0 +1,143 @@
+import json
+import os
+
+import pandas as pd
+
+from utils.io_pipeline import iter_quantized_data, load_table
+
+VERSION = 1
+
+# 일반 run_bms 와 같은 출력 CSV 열
+OUTPUT_COLUMNS = ["Time [s]", "Decoded cell current", "Decoded terminal voltage", "Decoded temperature", "SOC"]
+
+
+def save_checkpoint(path, checkpoint):
+    """
+    checkpoint 를 JSON 으로 저장 (임시 파일에 쓰고 fsync 후 교체하므로 중단되어도 이전 checkpoint 유지)
+    Args:
+        path (str): checkpoint 파일 경로
+        checkpoint (dict): JSON 으로 직렬화 가능한 값 (비활성 타이머 NaN 포함)
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path):
+    """
+    checkpoint 읽기
+    Args:
+        path (str): checkpoint 파일 경로
+    Returns:
+        dict: 저장된 checkpoint (없으면 None)
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def file_fingerprint(path):
+    """
+    입력 파일이 바뀌었는지 확인하는 값 (절대 경로, 크기, 수정 시각)
+    """
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _job(initial_soc, np_value, capacity, BMS_configuration, csv_file_path, output_csv_file, mode):
+    # 결과를 결정하는 값 (테이블 배열 등 JSON 으로 표현할 수 없는 설정값은 파일 경로로 대신함)
+    config = {key: value for key, value in BMS_configuration.items()
+              if isinstance(value, (bool, int, float, str))}
+    return {
+        "input": file_fingerprint(csv_file_path),
+        "output": os.path.abspath(output_csv_file),
+        "mode": mode,
+        "initial_soc": initial_soc,
+        "np_value": np_value,
+        "capacity": capacity,
+        "config": config,
+    }
+
+
+def _resumable(checkpoint, job, output_csv_file):
+    if checkpoint is None or checkpoint.get("version") != VERSION:
+        return False
+    if any(checkpoint.get(key) != value for key, value in job.items()):
+        print("Checkpoint does not match the current input or settings, starting over")
+        return False
+    if not os.path.exists(output_csv_file) or os.path.getsize(output_csv_file) < checkpoint["output_bytes"]:
+        print(f"Output shorter than checkpoint, starting over: {output_csv_file}")
+        return False
+    return True
+
+
+def resume_bms(initial_soc, np_value, capacity, BMS_configuration, csv_file_path, output_csv_file,
+               checkpoint_file, checkpoint_every=10 ** 5, adc=None, mode="current-voltage", adc_bits=None):
+    """
+    run_bms 를 checkpoint_every 샘플 블록 단위로 실행하고 블록마다 추정기 상태와 입력 위치를 저장
+    같은 입력/설정으로 다시 실행하면 마지막 checkpoint 부터 이어서 실행하며, 출력 CSV 는 checkpoint 시점의
+    크기로 잘라낸 뒤 이어 쓰므로 중단 후 재실행해도 중복 행이 생기지 않음
+    (블록 경계에서만 상태를 넘기므로 결과는 일반 run_bms 와 부동소수점 오차 범위에서 같음)
+    Args:
+        initial_soc (float): 초기 SOC
+        np_value (int): 병렬 연결된 셀의 수
+        capacity (float): 배터리의 정격 용량 (Ah)
+        BMS_configuration (dict): BMS 설정값
+        csv_file_path (str): quantized_log.csv 또는 .qadc 경로
+        output_csv_file (str): 결과 CSV 경로
+        checkpoint_file (str): checkpoint 파일 경로
+        checkpoint_every (int): checkpoint 간격 (샘플 수)
+        adc (dict): ADC.ranges() 형식의 ADC 설정
+        mode (str): streaming SOC 추정 모드 ("current-only", "voltage-only", "current-voltage")
+        adc_bits (int): 설정 파일이 없는 CSV 의 ADC 비트 수
+    Returns:
+        dict: 마지막 checkpoint (position: 처리한 샘플 수, state: 추정기 상태)
+    """
+    from bms.batch_estimator import STREAMING_MODES
+    from bms.mybms_module import MyBMS
+
+    if mode not in STREAMING_MODES:
+        raise ValueError(f"Checkpointing requires a streaming mode, got {mode!r}")
+    load_table(BMS_configuration)
+    estimator = MyBMS(initial_soc, np_value, capacity, BMS_configuration).stream(mode)
+    job = _job(initial_soc, np_value, capacity, BMS_configuration, csv_file_path, output_csv_file, mode)
+
+    checkpoint = load_checkpoint(checkpoint_file)
+    if _resumable(checkpoint, job, output_csv_file):
+        if checkpoint["done"]:
+            print(f"Already complete ({checkpoint['position']} samples), Final SOC: {checkpoint['state']['soc']:.6f}")
+            return checkpoint
+        estimator.set_state(checkpoint["state"])
+        print(f"Resuming from sample {checkpoint['position']}")
+    else:
+        checkpoint = dict(job, version=VERSION, position=0, output_bytes=0,
+                          state=estimator.get_state(), done=False)
+
+    # checkpoint 이후에 쓴 (checkpoint 에 기록되지 않은) 행은 잘라냄
+    with open(output_csv_file, "r+b" if checkpoint["position"] else "wb") as f:
+        f.truncate(checkpoint["output_bytes"])
+        f.seek(checkpoint["output_bytes"])
+        blocks = iter_quantized_data(csv_file_path, checkpoint_every, checkpoint["position"], adc, adc_bits)
+        for cur, vol, tmp, t in blocks:
+            soc = estimator.update_batch(cur, vol, tmp, t)
+            frame = pd.DataFrame(dict(zip(OUTPUT_COLUMNS, (t, cur, vol, tmp, soc))))
+            f.write(frame.to_csv(index=False, header=checkpoint["position"] == 0).encode())
+            # 출력을 디스크에 내린 뒤 checkpoint 를 갱신해야 checkpoint 가 출력보다 앞서지 않음
+            f.flush()
+            os.fsync(f.fileno())
+            checkpoint.update(position=checkpoint["position"] + len(t), output_bytes=f.tell(),
+                              state=estimator.get_state())
+            save_checkpoint(checkpoint_file, checkpoint)
+        if checkpoint["position"] == 0:
+            f.write(pd.DataFrame(columns=OUTPUT_COLUMNS).to_csv(index=False).encode())
+            checkpoint["output_bytes"] = f.tell()
+
+    checkpoint["done"] = True
+    save_checkpoint(checkpoint_file, checkpoint)
+    print(f"Final SOC: {checkpoint['state']['soc']:.6f}")
+    return checkpoint
@@ -0,0 +1,288 @@
+import numpy as np
+import pandas as pd
+
+from bms.batch_estimator import DEFAULT_THRESHOLDS
+from utils.sim_results import TIME_COLUMN
+
+# 구간별 통계 이름 (전류 부호는 시뮬레이션 출력과 같이 양수 = 방전, 음수 = 충전)
+MODES = ["relax", "charge", "discharge"]
+
+# 전류가 없어 구간을 알 수 없는 샘플 (overall 에는 포함)
+UNCLASSIFIED = "unclassified"
+BUCKETS = MODES + [UNCLASSIFIED]
+
+# 절대 오차 히스토그램 경계 (0, 1e-9 ~ 1 log 간격, percentile 상대 분해능 약 1%)
+ERROR_BINS = np.concatenate([[0.0], np.logspace(-9, 0, 1801)])
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def _strip_brackets(frame):
+    # 구 CSV 의 "[값]" 형식 문자열 컬럼을 float 로 변환
+    for col in frame.columns:
+        if not pd.api.types.is_numeric_dtype(frame[col]):
+            frame[col] = frame[col].astype(str).str.strip("[]").astype(float)
+    return frame
+
+
+class SOCReference:
+    def __init__(self, time_stamps, soc):
+        """
+        기준 SOC (시간 순 정렬, 같은 시각은 첫 값만 사용)
+        Args:
+            time_stamps (numpy.array): 타임스탬프 (s), None 이면 행 번호로 정렬 (구 soc_log 형식)
+            soc (numpy.array): 기준 SOC
+        """
+        soc = np.asarray(soc, dtype=float)
+        self.indexed = time_stamps is None
+        t = np.arange(soc.size, dtype=float) if self.indexed else np.asarray(time_stamps, dtype=float)
+        order = np.argsort(t, kind="stable")
+        t, soc = t[order], soc[order]
+        keep = np.concatenate([[True], np.diff(t) > 0]) if t.size else np.ones(0, dtype=bool)
+        self.time = t[keep]
+        self.soc = soc[keep]
+
+    @classmethod
+    def from_csv(cls, path):
+        """
+        soc_log.csv 읽기 ("Time [s]" 컬럼이 없으면 행 번호로 정렬)
+        """
+        frame = _strip_brackets(pd.read_csv(path, usecols=lambda c: c in (TIME_COLUMN, "SOC")))
+        time_stamps = frame[TIME_COLUMN].values if TIME_COLUMN in frame else None
+        return cls(time_stamps, frame["SOC"].values)
+
+    def align(self, time_stamps, tol=1e-6):
+        """
+        타임스탬프별 기준 SOC 찾기 (정렬된 기준 시각에 대한 searchsorted merge)
+        Args:
+            time_stamps (numpy.array): 추정 결과의 타임스탬프 (s)
+            tol (float): 같은 시각으로 볼 허용 오차 (s)
+        Returns:
+            tuple: (기준 시각이 있는 샘플 mask, 해당 샘플의 기준 SOC)
+        """
+        t = np.asarray(time_stamps, dtype=float)
+        if self.time.size == 0:
+            return np.zeros(t.shape, dtype=bool), np.empty(0)
+        right = np.clip(np.searchsorted(self.time, t), 0, self.time.size - 1)
+        left = np.clip(right - 1, 0, self.time.size - 1)
+        nearest = np.where(np.abs(self.time[left] - t) <= np.abs(self.time[right] - t), left, right)
+        matched = np.abs(self.time[nearest] - t) <= tol
+        return matched, self.soc[nearest[matched]]
+
+
+class ErrorAccumulator:
+    def __init__(self, thresholds=None):
+        """
+        SOC 오차 통계를 블록 단위로 누적 (메모리는 블록 크기와 무관)
+        Args:
+            thresholds (dict): get_thresholds 형식의 임계값 (None 이면 기본값),
+                추정기와 같은 기준으로 |I| < i_ocv 를 relax 로 분류
+        """
+        if thresholds is None:
+            thresholds = DEFAULT_THRESHOLDS
+        self.i_ocv = thresholds["i_ocv"]
+        self.count = np.zeros(len(BUCKETS), dtype=np.int64)
+        self.sum_se = np.zeros(len(BUCKETS))
+        self.sum_ae = np.zeros(len(BUCKETS))
+        self.sum_error = np.zeros(len(BUCKETS))
+        self.max_ae = np.zeros(len(BUCKETS))
+        self.max_time = np.full(len(BUCKETS), np.nan)
+        self.hist = np.zeros((len(BUCKETS), ERROR_BINS.size - 1), dtype=np.int64)
+
+    def update(self, time_stamps, error, current=None):
+        """
+        블록 누적
+        Args:
+            time_stamps (numpy.array): 타임스탬프 (s)
+            error (numpy.array): 추정 SOC - 기준 SOC
+            current (numpy.array): 전류 (A), None 이면 모든 샘플을 unclassified 로 분류
+        """
+        error = np.asarray(error, dtype=float)
+        if error.size == 0:
+            return
+        time_stamps = np.asarray(time_stamps, dtype=float)
+        if current is None:
+            mode = np.full(error.shape, BUCKETS.index(UNCLASSIFIED))
+        else:
+            current = np.asarray(current, dtype=float)
+            mode = np.where(current > 0, MODES.index("discharge"), MODES.index("charge"))
+            mode[np.abs(current) < self.i_ocv] = MODES.index("relax")
+
+        abs_error = np.abs(error)
+        bins = np.clip(np.searchsorted(ERROR_BINS, abs_error, side="right") - 1, 0, ERROR_BINS.size - 2)
+        np.add.at(self.hist, (mode, bins), 1)
+        self.count += np.bincount(mode, minlength=len(BUCKETS))
+        self.sum_se += np.bincount(mode, error ** 2, minlength=len(BUCKETS))
+        self.sum_ae += np.bincount(mode, abs_error, minlength=len(BUCKETS))
+        self.sum_error += np.bincount(mode, error, minlength=len(BUCKETS))
+        for m in np.unique(mode):
+            sel = np.flatnonzero(mode == m)
+            i = sel[np.argmax(abs_error[sel])]
+            if abs_error[i] > self.max_ae[m] or np.isnan(self.max_time[m]):
+                self.max_ae[m] = abs_error[i]
+                self.max_time[m] = time_stamps[i]
+
+    @staticmethod
+    def _summary(count, sum_se, sum_ae, sum_error, max_ae, max_time, hist):
+        if count == 0:
+            stats = {"samples": 0, "mse": np.nan, "mae": np.nan, "bias": np.nan,
+                     "max_error": np.nan, "max_time": np.nan}
+            stats.update({f"p{p}": np.nan for p in PERCENTILES})
+            return stats
+        stats = {
+            "samples": int(count),
+            "mse": sum_se / count,
+            "mae": sum_ae / count,
+            "bias": sum_error / count,
+            "max_error": float(max_ae),
+            "max_time": float(max_time),
+        }
+        cum = np.cumsum(hist)
+        for p in PERCENTILES:
+            # p 번째 샘플이 속한 bin 의 상한 (max_error 를 넘지 않도록 제한)
+            b = int(np.searchsorted(cum, np.ceil(p / 100 * count)))
+            stats[f"p{p}"] = float(min(ERROR_BINS[b + 1], max_ae))
+        return stats
+
+    def result(self):
+        """
+        전체 및 구간별 오차 통계
+        Returns:
+            dict: "overall" 과 BUCKETS 별 samples, mse, mae, bias, max_error, max_time, p50 ~ p99
+        """
+        best = int(np.argmax(self.max_ae)) if self.count.any() else 0
+        summary = {"overall": self._summary(
+            self.count.sum(), self.sum_se.sum(), self.sum_ae.sum(), self.sum_error.sum(),
+            self.max_ae[best], self.max_time[best], self.hist.sum(axis=0),
+        )}
+        for m, name in enumerate(BUCKETS):
+            summary[name] = self._summary(self.count[m], self.sum_se[m], self.sum_ae[m], self.sum_error[m],
+                                          self.max_ae[m], self.max_time[m], self.hist[m])
+        return summary
+
+
+def _iter_estimate(estimate, chunk_size):
+    if isinstance(estimate, str):
+        columns = {TIME_COLUMN, "SOC", "Decoded cell current"}
+        reader = pd.read_csv(estimate, usecols=lambda c: c in columns, chunksize=chunk_size)
+        for frame in map(_strip_brackets, reader):
+            yield (frame[TIME_COLUMN].values if TIME_COLUMN in frame else None,
+                   frame["SOC"].values,
+                   frame["Decoded cell current"].values if "Decoded cell current" in frame else None)
+    else:
+        t = estimate.get(TIME_COLUMN)
+        soc = np.asarray(estimate["SOC"], dtype=float)
+        current = estimate.get("Decoded cell current")
+        for start in range(0, soc.size, chunk_size):
+            stop = start + chunk_size
+            yield (None if t is None else np.asarray(t[start:stop], dtype=float),
+                   soc[start:stop],
+                   None if current is None else np.asarray(current[start:stop], dtype=float))
+
+
+def evaluate_soc(reference, estimate, chunk_size=100_000, thresholds=None, tol=1e-6):
+    """
+    기준 SOC 와 추정 SOC 를 "Time [s]" 로 맞춘 뒤 한 번의 스트리밍 pass 로 오차 통계 계산
+    Args:
+        reference (SOCReference or str): 기준 SOC 또는 soc_log.csv 경로
+        estimate (str or dict): run_bms 결과 CSV 경로 또는 "Time [s]", "SOC", "Decoded cell current" 배열 dict
+        chunk_size (int): 한 번에 읽는 샘플 수
+        thresholds (dict): get_thresholds 형식의 구간 분류 임계값 (None 이면 기본값)
+        tol (float): 같은 시각으로 볼 허용 오차 (s)
+    Returns:
+        dict: ErrorAccumulator.result 형식 ("overall" 에 기준 시각이 없는 샘플 수 "unmatched" 포함)
+    """
+    if isinstance(reference, str):
+        reference = SOCReference.from_csv(reference)
+
+    acc = ErrorAccumulator(thresholds)
+    unmatched = 0
+    position = 0
+    for t, soc, current in _iter_estimate(estimate, chunk_size):
+        if reference.indexed or t is None:
+            t = np.arange(position, position + soc.size, dtype=float)
+        position += soc.size
+        matched, ref_soc = reference.align(t, tol)
+        unmatched += int(np.count_nonzero(~matched))
+        acc.update(t[matched], soc[matched] - ref_soc, None if current is None else current[matched])
+
+    summary = acc.result()
+    summary["overall"]["unmatched"] = unmatched
+    return summary
+
+
+def evaluate_many(reference, estimates, chunk_size=100_000, thresholds=None, tol=1e-6):
+    """
+    여러 추정 결과를 같은 기준 SOC 로 채점 (기준은 한 번만 읽음)
+    Args:
+        reference (SOCReference or str): 기준 SOC 또는 soc_log.csv 경로
+        estimates (dict): 이름 -> evaluate_soc 의 estimate 형식
+        chunk_size (int): 한 번에 읽는 샘플 수
+        thresholds (dict): get_thresholds 형식의 구간 분류 임계값 (None 이면 기본값)
+        tol (float): 같은 시각으로 볼 허용 오차 (s)
+    Returns:
+        pandas.DataFrame: 이름별 전체 통계 및 구간별 mse/mae/max_error (mse 오름차순)
+    """
+    if isinstance(reference, str):
+        reference = SOCReference.from_csv(reference)
+
+    rows = []
+    for name, estimate in estimates.items():
+        summary = evaluate_soc(reference, estimate, chunk_size, thresholds, tol)
+        row = {"name": name}
+        row.update(summary["overall"])
+        for mode in BUCKETS:
+            for key in ("samples", "mse", "mae", "max_error"):
+                row[f"{mode}_{key}"] = summary[mode][key]
+        rows.append(row)
+    table = pd.DataFrame(rows)
+    if table.empty:
+        return table
+    return table.sort_values("mse", kind="stable").set_index("name")
+
+
+ENSEMBLE_METRICS = ["rmse", "mae", "max_error", "final_error"]
+
+
+def evaluate_ensemble(reference, time_stamps, soc, tol=1e-6, percentile=95):
+    """
+    Monte-Carlo ensemble (멤버별 SOC) 을 기준 SOC 로 채점하고 멤버 간 오차 분포 요약
+    기준 SOC 정렬은 한 번만 하고 모든 멤버를 한 번에 계산
+    Args:
+        reference (SOCReference or str): 기준 SOC 또는 soc_log.csv 경로
+        time_stamps (numpy.array): (samples,) 타임스탬프 (s)
+        soc (numpy.array): (members, samples) 추정 SOC
+        tol (float): 같은 시각으로 볼 허용 오차 (s)
+        percentile (float): 요약에 쓸 상위 percentile
+    Returns:
+        dict: "members" (멤버별 rmse/mae/max_error/final_error DataFrame),
+            "summary" (지표별 멤버 간 mean, p{percentile}, max DataFrame),
+            "samples" (기준 시각이 있는 샘플 수)
+    """
+    if isinstance(reference, str):
+        reference = SOCReference.from_csv(reference)
+    soc = np.atleast_2d(np.asarray(soc, dtype=float))
+    t = np.arange(soc.shape[1], dtype=float) if reference.indexed else np.asarray(time_stamps, dtype=float)
+    matched, ref_soc = reference.align(t, tol)
+
+    error = soc[:, matched] - ref_soc
+    abs_error = np.abs(error)
+    if error.shape[1]:
+        members = pd.DataFrame({
+            "rmse": np.sqrt(np.mean(error ** 2, axis=1)),
+            "mae": np.mean(abs_error, axis=1),
+            "max_error": np.max(abs_error, axis=1),
+            "final_error": error[:, -1],
+        })
+    else:
+        members = pd.DataFrame(np.nan, index=range(soc.shape[0]), columns=ENSEMBLE_METRICS)
+    members.index.name = "member"
+
+    # final_error 는 부호가 있으므로 크기 기준으로 요약
+    magnitude = members.abs()
+    summary = pd.DataFrame({
+        "mean": magnitude.mean(),
+        f"p{percentile:g}": magnitude.quantile(percentile / 100),
+        "max": magnitude.max(),
+    }).loc[ENSEMBLE_METRICS]
+    return {"members": members, "summary": summary, "samples": int(np.count_nonzero(matched))}
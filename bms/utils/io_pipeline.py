@@ -1,6 +1,10 @@
 import numpy as np
 import pandas as pd
 
+from adc.calibration import calibrations_from_ranges
+from bms.lookup_table import LookupTable
+from utils.quantized_store import csv_ranges, is_quantized_file, open_quantized
+
 
 def load_table(BMS_configuration):
     # R table
@@ -21,41 +25,84 @@ def load_table(BMS_configuration):
             so_rows.append([float(soc.strip("[]")), float(ocv.strip("[]"))])
     BMS_configuration["soc_ocv_table"] = np.array(so_rows)
 
+    # 조회용 보간 테이블 (단조성 검사 후 한 번만 생성)
+    BMS_configuration["r_lookup"] = LookupTable.from_table(BMS_configuration["r_table"], 0, 1)
+    BMS_configuration["soc_ocv_lookup"] = LookupTable.from_table(BMS_configuration["soc_ocv_table"], 1, 0)
+    BMS_configuration["ocv_lookup"] = LookupTable.from_table(BMS_configuration["soc_ocv_table"], 0, 1)
+
 
 def decode(quantized, adc_min, adc_max, q_levels):
     rng = adc_max - adc_min
     return adc_min + (quantized / (q_levels - 1)) * rng
 
 
-def process_quantized_data(csv_file_path, adc):
-    df = pd.read_csv(csv_file_path)
-    cur_q = df["Quantized Cell current [A]"].astype(float).values
-    vol_q = df["Quantized Terminal voltage [V]"].astype(float).values
-    tmp_q = df["Quantized X-averaged cell temperature [K]"].astype(float).values
-
-    current = decode(cur_q, adc["current_min"], adc["current_max"], adc["q_levels"])
-    voltage = decode(vol_q, adc["voltage_min"], adc["voltage_max"], adc["q_levels"])
-    temp = decode(tmp_q, adc["temp_min"], adc["temp_max"], adc["q_levels"])
-    t = df["Time [s]"].astype(float).values
+def decode_quantized(quantized, adc, bits=None):
+    """
+    양자화 코드를 채널별 ChannelCalibration 으로 디코딩
+    Args:
+        quantized (dict or pandas.DataFrame): "Time [s]" 및 "Quantized ..." 채널 코드
+        adc (dict): ADC.ranges() 형식의 ADC 설정 (trim 포함)
+        bits (iterable): 비트 수 목록 (ADC.process_depths 의 (depths, samples) 코드용,
+            None 이면 quantized["bits"] 또는 adc 의 q_levels)
+    Returns:
+        tuple: (current, voltage, temp, t), 코드와 같은 shape
+    """
+    if bits is None and isinstance(quantized, dict):
+        bits = quantized.get("bits")
+    calibrations = calibrations_from_ranges(adc)
+    current, voltage, temp = (cal.decode(np.asarray(quantized[f"Quantized {col}"]), bits)
+                              for col, cal in calibrations.items())
+    t = np.asarray(quantized["Time [s]"], dtype=float)
     return current, voltage, temp, t
 
 
-def run_bms(initial_soc, np_value, capacity, BMS_configuration, csv_file_path, output_csv_file):
+def process_quantized_data(csv_file_path, adc=None, adc_bits=None):
+    # .qadc 는 헤더의 ADC 범위를 사용하고 memory-map 된 코드를 바로 디코딩
+    if is_quantized_file(csv_file_path):
+        data = open_quantized(csv_file_path)
+        return decode_quantized(data, data["header"]["ranges"] if adc is None else adc)
+    # CSV 는 ADC 가 함께 저장한 설정 파일 (채널별 비트 수/범위/trim), 없으면 기본 범위
+    if adc is None:
+        adc = csv_ranges(csv_file_path, adc_bits)
+    return decode_quantized(pd.read_csv(csv_file_path), adc)
+
+
+def iter_quantized_data(csv_file_path, chunk_size, start=0, adc=None, adc_bits=None):
+    """
+    process_quantized_data 와 같은 디코딩을 chunk_size 샘플 블록 단위로 수행하는 generator
+    Args:
+        csv_file_path (str): quantized_log.csv 또는 .qadc 경로
+        chunk_size (int): 블록 샘플 수
+        start (int): 시작 샘플 (이전 샘플은 디코딩하지 않음)
+        adc (dict): ADC.ranges() 형식의 ADC 설정 (None 이면 .qadc 헤더 또는 CSV 의 설정 파일)
+        adc_bits (int): 설정 파일이 없는 CSV 의 ADC 비트 수 (adc 가 None 일 때만 사용)
+    Yields:
+        tuple: 블록별 (current, voltage, temp, t)
+    """
+    if is_quantized_file(csv_file_path):
+        data = open_quantized(csv_file_path)
+        adc = data["header"]["ranges"] if adc is None else adc
+        for lo in range(start, data["header"]["n_samples"], chunk_size):
+            block = {name: values[lo:lo + chunk_size] for name, values in data.items() if name != "header"}
+            yield decode_quantized(block, adc)
+        return
+    if adc is None:
+        adc = csv_ranges(csv_file_path, adc_bits)
+    for chunk in pd.read_csv(csv_file_path, skiprows=range(1, start + 1), chunksize=chunk_size):
+        yield decode_quantized(chunk, adc)
+
+
+def estimate_bms_soc(initial_soc, np_value, capacity, BMS_configuration,
+                     current, voltage, temp, t, mode="current-voltage"):
     from bms.mybms_module import MyBMS
 
-    adc = {
-        "q_levels": 2 ** 16,
-        "current_min": -9, "current_max": 9,
-        "voltage_min": 2.33, "voltage_max": 4.37,
-        "temp_min": 224.15, "temp_max": 332.15,
-    }
-
-    load_table(BMS_configuration)
+    if "r_table" not in BMS_configuration:
+        load_table(BMS_configuration)
     my_bms = MyBMS(initial_soc, np_value, capacity, BMS_configuration)
+    return my_bms.estimate_soc_batch(current, voltage, temp, t, mode=mode)
 
-    cur, vol, tmp, t = process_quantized_data(csv_file_path, adc)
-    soc = my_bms.estimate_soc(cur, vol, tmp, t, mode="current-voltage")
 
+def write_bms_output(output_csv_file, t, cur, vol, tmp, soc):
     out = pd.DataFrame({
         "Time [s]": t,
         "Decoded cell current": cur,
@@ -63,32 +110,65 @@ def run_bms(initial_soc, np_value, capacity, BMS_configuration, csv_file_path, o
         "Decoded temperature": tmp,
         "SOC": soc
     })
-    out.to_csv(output_csv_file, mode="a", index=False)
+    out.to_csv(output_csv_file, index=False)
+
+
+def run_bms(initial_soc, np_value, capacity, BMS_configuration, csv_file_path, output_csv_file,
+            adc=None, mode="current-voltage", adc_bits=None, checkpoint=None, checkpoint_every=10 ** 5,
+            resample=None):
+    # checkpoint 를 지정하면 블록 단위로 추정/저장하고, 중단 후 다시 실행하면 마지막 checkpoint 부터 이어서 실행
+    # resample 은 (방식, 간격 s) 로 디코딩 후 전하 보존 decimation / 균일 resampling 후 추정 (resample_samples 참고)
+    from utils.resampling import resample_samples
+
+    if checkpoint is not None:
+        if resample is not None:
+            raise ValueError("resample is not supported with checkpoint")
+        from utils.checkpoint import resume_bms
+
+        return resume_bms(initial_soc, np_value, capacity, BMS_configuration, csv_file_path,
+                          output_csv_file, checkpoint, checkpoint_every, adc, mode, adc_bits)
+    load_table(BMS_configuration)
+    cur, vol, tmp, t = resample_samples(*process_quantized_data(csv_file_path, adc, adc_bits), resample)
+    soc = estimate_bms_soc(initial_soc, np_value, capacity, BMS_configuration, cur, vol, tmp, t, mode=mode)
+
+    write_bms_output(output_csv_file, t, cur, vol, tmp, soc)
     print(f"Final SOC: {soc[-1]:.6f}")
 
 
-def compute_MSE(sim_result_csv, bms_result_csv):
-    try:
-        sim_df = pd.read_csv(sim_result_csv)
-        sim_soc = sim_df["SOC"].values
-    except FileNotFoundError:
-        print(f"BatterySimulation 결과 파일을 찾을 수 없습니다: {sim_result_csv}")
-        return None
+def run_pack_bms(initial_soc, np_value, ns_value, capacity, BMS_configuration,
+                 current, voltage, temp, time_stamps, mode="current-voltage", n_workers=None):
+    from bms.pack_estimator import PackBMS
+
+    load_table(BMS_configuration)
+    pack_bms = PackBMS(initial_soc, np_value, ns_value, capacity, BMS_configuration)
+    soc = pack_bms.estimate_soc(current, voltage, temp, time_stamps, mode=mode, n_workers=n_workers)
+    summary = pack_bms.aggregate(soc)
+    print(f"Final pack SOC: min {summary['min'][-1]:.6f}, "
+          f"max {summary['max'][-1]:.6f}, mean {summary['mean'][-1]:.6f}")
+    return soc, summary
+
+
+def compute_MSE(sim_result_csv, bms_result_csv, BMS_configuration=None):
+    # 구간 (relax/charge/discharge) 분류는 BMS_configuration 의 임계값 (None 이면 기본값) 사용
+    from bms.batch_estimator import get_thresholds
+    from utils.evaluation import MODES, PERCENTILES, UNCLASSIFIED, evaluate_soc
 
+    thresholds = None if BMS_configuration is None else get_thresholds(BMS_configuration)
     try:
-        bms_df = pd.read_csv(bms_result_csv)
-        bms_soc = bms_df["SOC"].values
-    except FileNotFoundError:
-        print(f"MyBMS 결과 파일을 찾을 수 없습니다: {bms_result_csv}")
+        summary = evaluate_soc(sim_result_csv, bms_result_csv, thresholds=thresholds)
+    except FileNotFoundError as e:
+        print(f"결과 파일을 찾을 수 없습니다: {e.filename}")
         return None
 
-    n = min(len(sim_soc), len(bms_soc))
-    sim_soc, bms_soc = sim_soc[:n], bms_soc[:n]
+    overall = summary["overall"]
+    print(f"MSE: {overall['mse']}, MAE: {overall['mae']} ({overall['samples']} samples, "
+          f"unmatched {overall['unmatched']})")
+    print(f"최대 오차: {overall['max_error']} (Time: {overall['max_time']} s)")
+    print("Percentile: " + ", ".join(f"p{p} {overall[f'p{p}']:.3g}" for p in PERCENTILES))
+    for mode in MODES + [UNCLASSIFIED]:
+        stats = summary[mode]
+        if mode == UNCLASSIFIED and stats["samples"] == 0:
+            continue
+        print(f"  {mode}: {stats['samples']} samples, MSE {stats['mse']}, max {stats['max_error']}")
+    return summary
 
-    se = (sim_soc - bms_soc) ** 2
-    mse = float(se.mean())
-    idx = int(se.argmax())
-    print(f"MSE: {mse}")
-    print(f"최대 오차: {se[idx]} (Index: {idx})")
-    print(f"OCV_SOC: {sim_soc[idx]}, BMS_SOC: {bms_soc[idx]}")
-    return mse, float(se[idx]), idx
\ No newline at end of file
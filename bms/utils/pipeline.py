@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+from utils.evaluation import evaluate_ensemble
+from utils.io_pipeline import decode_quantized, estimate_bms_soc, write_bms_output
+from utils.profiling import profile_stage
+from utils.quantized_store import QUANTIZED_COLUMNS, is_quantized_file, save_quantized, save_ranges
+from utils.resampling import resample_samples
+from utils.sim_results import save_results
+
+
+def run_pipeline(simulation, adc, initial_soc, np_value, capacity, BMS_configuration,
+                 mode="current-voltage", sim_file=None, adc_file=None, bms_file=None, profiler=None,
+                 resample=None):
+    """
+    Simulation --> ADC --> BMS 를 파일 왕복 없이 배열로 바로 전달
+    Args:
+        simulation (BatterySimulation): run_simulation 이 끝난 시뮬레이션 객체
+        adc (ADC): ADC 객체
+        initial_soc (float): BMS 초기 SOC
+        np_value (int): 병렬 연결된 셀의 수
+        capacity (float): 배터리의 정격 용량 (Ah)
+        BMS_configuration (dict): BMS 설정값
+        mode (str): SOC 추정 모드
+        sim_file (str): 시뮬레이션 결과 저장 경로 (None 이면 저장하지 않음)
+        adc_file (str): 양자화 결과 저장 경로 (None 이면 저장하지 않음, .qadc 면 정수 binary)
+        bms_file (str): BMS 결과 저장 경로 (None 이면 저장하지 않음)
+        profiler (StageProfiler): 단계별 시간/메모리 측정 (None 이면 측정하지 않음)
+        resample (tuple): 디코딩 값을 BMS 에 넘기기 전 적용할 (방식, 간격 s) ("decimate" 또는 "uniform",
+            None 이면 ADC 샘플 그대로)
+    Returns:
+        dict: 단계별 결과 배열 ("simulation", "adc", "Time [s]", 디코딩 값, "SOC",
+            resample 을 지정하면 "Time [s]" 이후 값은 resampling 결과)
+    """
+    sim_data = simulation.get_arrays()
+    if sim_data is None:
+        raise ValueError("Simulation has no output; call run_simulation first")
+    n = len(sim_data["Time [s]"])
+    if sim_file is not None:
+        with profile_stage(profiler, "save simulation", n):
+            save_results(sim_data, sim_file)
+
+    with profile_stage(profiler, "adc", n):
+        adc_data = adc.process_arrays(sim_data)
+    if adc_file is not None:
+        with profile_stage(profiler, "save adc", n):
+            if is_quantized_file(adc_file):
+                codes = np.column_stack([adc_data[col] for col in QUANTIZED_COLUMNS])
+                save_quantized(adc_file, adc_data["Time [s]"], codes, adc.ranges(), adc.adc_bits)
+            else:
+                pd.DataFrame(adc_data).to_csv(adc_file, index=False)
+                save_ranges(adc_file, adc.ranges())
+
+    with profile_stage(profiler, "decode", n):
+        cur, vol, tmp, t = decode_quantized(adc_data, adc.ranges())
+    if resample is not None:
+        with profile_stage(profiler, f"resample ({resample[0]})", n):
+            cur, vol, tmp, t = resample_samples(cur, vol, tmp, t, resample)
+        n = len(t)
+    with profile_stage(profiler, f"bms ({mode})", n):
+        soc = estimate_bms_soc(initial_soc, np_value, capacity, BMS_configuration,
+                               cur, vol, tmp, t, mode=mode)
+    if bms_file is not None:
+        with profile_stage(profiler, "save bms", n):
+            write_bms_output(bms_file, t, cur, vol, tmp, soc)
+
+    return {
+        "simulation": sim_data,
+        "adc": adc_data,
+        "Time [s]": t,
+        "Decoded cell current": cur,
+        "Decoded terminal voltage": vol,
+        "Decoded temperature": tmp,
+        "SOC": soc,
+    }
+
+
+def run_ensemble(simulation, adc, n_realizations, initial_soc, np_value, capacity, BMS_configuration,
+                 reference, mode="current-voltage", seed=None, tol=1e-6, profiler=None):
+    """
+    ADC 노이즈 Monte-Carlo ensemble: K 개의 realization 을 한 번에 양자화/디코딩하고
+    realization 을 셀 축으로 둔 batched 추정기로 SOC 를 계산한 뒤 기준 SOC 대비 오차 분포 계산
+    Args:
+        simulation (BatterySimulation): run_simulation 이 끝난 시뮬레이션 객체
+        adc (ADC): ADC 객체 (calibration 및 기본 시드)
+        n_realizations (int): realization 수 K
+        initial_soc (float): BMS 초기 SOC
+        np_value (int): 병렬 연결된 셀의 수
+        capacity (float): 배터리의 정격 용량 (Ah)
+        BMS_configuration (dict): BMS 설정값
+        reference (SOCReference or str): 기준 SOC 또는 soc_log.csv 경로
+        mode (str): SOC 추정 모드
+        seed (int): ensemble 시드 (None 이면 adc.random_seed)
+        tol (float): 같은 시각으로 볼 허용 오차 (s)
+        profiler (StageProfiler): 단계별 시간/메모리 측정 (None 이면 측정하지 않음)
+    Returns:
+        dict: "seeds", "Time [s]", (K, samples) "SOC", evaluate_ensemble 결과 ("members", "summary", "samples")
+    """
+    sim_data = simulation.get_arrays()
+    if sim_data is None:
+        raise ValueError("Simulation has no output; call run_simulation first")
+    n = len(sim_data["Time [s]"]) * n_realizations
+
+    with profile_stage(profiler, "adc ensemble", n):
+        adc_data = adc.process_ensemble(sim_data, n_realizations, seed)
+    with profile_stage(profiler, "decode ensemble", n):
+        cur, vol, tmp, t = decode_quantized(adc_data, adc.ranges())
+    with profile_stage(profiler, f"bms ensemble ({mode})", n):
+        soc = estimate_bms_soc(initial_soc, np_value, capacity, BMS_configuration,
+                               cur, vol, tmp, t, mode=mode)
+    with profile_stage(profiler, "evaluation ensemble", n):
+        result = evaluate_ensemble(reference, t, soc, tol)
+
+    result.update({"seeds": adc_data["seeds"], "Time [s]": t, "SOC": soc})
+    return result
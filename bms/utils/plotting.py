@@ -0,0 +1,193 @@
+import numpy as np
+import pandas as pd
+
+from utils.evaluation import SOCReference
+from utils.sim_results import TIME_COLUMN
+
+# plot_simulation 기본 변수 (lp.plot_output 과 같은 셀 변수)
+PLOT_VARIABLES = [
+    "Cell current [A]",
+    "Terminal voltage [V]",
+    "X-averaged cell temperature [K]",
+    "Battery open-circuit voltage [V]",
+]
+
+
+def minmax_indices(values, n_bins, columns=None, block_bins=4096):
+    """
+    샘플을 n_bins 개의 같은 길이 구간으로 나누고 구간별 첫/최소/최대/마지막 샘플 번호 선택
+    (선을 그리면 원본과 같은 픽셀 envelope 가 되는 min/max decimation)
+    Args:
+        values (numpy.array): (samples,) 또는 (samples, cells) 배열 (memmap 이면 block_bins 구간씩 읽음)
+        n_bins (int): 구간 수 (보통 가로 픽셀 수)
+        columns (list): (samples, cells) 입력에서 사용할 셀 번호 (None 이면 전체)
+        block_bins (int): 한 번에 읽는 구간 수
+    Returns:
+        numpy.array: (samples,) 입력은 정렬된 샘플 번호, (samples, cells) 입력은 셀별 샘플 번호 리스트
+    """
+    squeeze = np.ndim(values) == 1
+    n = len(values)
+    if not squeeze and columns is None:
+        columns = np.arange(values.shape[1])
+    cells = 1 if squeeze else len(columns)
+    if n <= 4 * n_bins:
+        keep = np.arange(n)
+        return keep if squeeze else [keep] * cells
+
+    width = -(-n // n_bins)
+    n_bins = -(-n // width)
+    picks = [[] for _ in range(cells)]
+    for lo in range(0, n_bins, block_bins):
+        hi = min(lo + block_bins, n_bins)
+        block = values[lo * width:min(hi * width, n)]
+        if not squeeze:
+            block = block[:, columns]
+        block = np.asarray(block, dtype=float).reshape(-1, cells)
+        # 마지막 구간은 마지막 샘플로 채워 (구간 수, 구간 길이, 셀) 로 reshape
+        pad = (hi - lo) * width - block.shape[0]
+        if pad:
+            block = np.concatenate([block, np.repeat(block[-1:], pad, axis=0)])
+        block = block.reshape(hi - lo, width, cells)
+        nan = np.isnan(block)
+        base = np.arange(lo, hi)[:, None] * width
+        lows = base + np.argmin(np.where(nan, np.inf, block), axis=1)
+        highs = base + np.argmax(np.where(nan, -np.inf, block), axis=1)
+        for cell in range(cells):
+            picks[cell].extend([base[:, 0], lows[:, cell], highs[:, cell]])
+
+    last = np.minimum(np.arange(1, n_bins + 1) * width, n) - 1
+    result = [np.unique(np.minimum(np.concatenate(p + [last]), n - 1)) for p in picks]
+    return result[0] if squeeze else result
+
+
+def decimate_minmax(x, y, width_px, columns=None):
+    """
+    그릴 선을 가로 픽셀 수에 맞춰 min/max decimation
+    Args:
+        x (numpy.array): (samples,) x 값 (예: 시간)
+        y (numpy.array): (samples,) 또는 (samples, cells) y 값
+        width_px (int): 가로 픽셀 수
+        columns (list): (samples, cells) 입력에서 사용할 셀 번호 (None 이면 전체)
+    Returns:
+        list: 셀별 (x, y) 배열 tuple
+    """
+    if np.ndim(y) == 1:
+        indices = minmax_indices(y, width_px)
+        return [(np.asarray(x[indices], dtype=float), np.asarray(y[indices], dtype=float))]
+    if columns is None:
+        columns = np.arange(y.shape[1])
+    indices = minmax_indices(y, width_px, columns)
+    return [(np.asarray(x[idx], dtype=float), np.asarray(y[idx, cell], dtype=float))
+            for cell, idx in zip(columns, indices)]
+
+
+def new_figure(n_rows, width_px=1200, row_px=300, dpi=100, interactive=False):
+    """
+    세로로 쌓은 subplot figure 생성
+    Args:
+        n_rows (int): subplot 수
+        width_px (int): 가로 픽셀 수
+        row_px (int): subplot 하나의 세로 픽셀 수
+        dpi (int): 해상도
+        interactive (bool): True 면 pyplot figure (plt.show 용), False 면 display 없이 Agg canvas
+    Returns:
+        tuple: (matplotlib Figure, Axes 리스트)
+    """
+    figsize = (width_px / dpi, n_rows * row_px / dpi)
+    if interactive:
+        import matplotlib.pyplot as plt
+
+        fig = plt.figure(figsize=figsize, dpi=dpi)
+    else:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(fig)
+    axes = fig.subplots(n_rows, 1, sharex=True, squeeze=False)[:, 0]
+    return fig, list(axes)
+
+
+def _finish(fig, out_file, interactive):
+    fig.tight_layout()
+    if out_file is not None:
+        fig.savefig(out_file)
+    if interactive:
+        import matplotlib.pyplot as plt
+
+        plt.show()
+    return fig
+
+
+def plot_simulation(output, out_file=None, width_px=1200, variables=None, cells=None,
+                    dpi=100, interactive=False):
+    """
+    시뮬레이션 결과를 변수별 subplot 으로 그림 (셀별 선은 width_px 에 맞춰 min/max decimation)
+    Args:
+        output (dict): lp.solve 결과, collect_results / load_results 결과 또는 ArrayStore
+        out_file (str): 저장 경로 (None 이면 저장하지 않음)
+        width_px (int): 가로 픽셀 수 (선마다 최대 약 4 * width_px 점만 그림)
+        variables (list): 그릴 변수 (None 이면 PLOT_VARIABLES 중 output 에 있는 변수)
+        cells (int, slice, list): 그릴 셀 (None 이면 전체)
+        dpi (int): 해상도
+        interactive (bool): True 면 plt.show 로 창 띄움
+    Returns:
+        matplotlib.figure.Figure: 그린 figure
+    """
+    if variables is None:
+        variables = [name for name in PLOT_VARIABLES if name in output]
+    t = np.asarray(output[TIME_COLUMN]).ravel()
+    fig, axes = new_figure(len(variables), width_px, dpi=dpi, interactive=interactive)
+    for ax, name in zip(axes, variables):
+        values = np.asarray(output[name]).reshape(t.size, -1)
+        columns = None if cells is None else np.atleast_1d(np.arange(values.shape[1])[cells])
+        for x, y in decimate_minmax(t, values, width_px, columns):
+            ax.plot(x, y, linewidth=0.8)
+        ax.set_ylabel(name)
+    axes[-1].set_xlabel(TIME_COLUMN)
+    return _finish(fig, out_file, interactive)
+
+
+def _read_estimate(estimate):
+    if isinstance(estimate, str):
+        frame = pd.read_csv(estimate, usecols=[TIME_COLUMN, "SOC"])
+        return frame[TIME_COLUMN].to_numpy(dtype=float), frame["SOC"].to_numpy(dtype=float)
+    return np.asarray(estimate[TIME_COLUMN], dtype=float), np.asarray(estimate["SOC"], dtype=float)
+
+
+def plot_soc_overlay(reference, estimate, out_file=None, width_px=1200, tol=1e-6,
+                     dpi=100, interactive=False):
+    """
+    BMS 추정 SOC 와 기준 SOC 를 겹쳐 그리고, 같은 시각의 오차를 아래 subplot 에 그림
+    Args:
+        reference (SOCReference or str): 기준 SOC 또는 soc_log.csv 경로
+        estimate (str or dict): run_bms 결과 CSV 경로 또는 "Time [s]", "SOC" 배열 dict (run_pipeline 결과)
+        out_file (str): 저장 경로 (None 이면 저장하지 않음)
+        width_px (int): 가로 픽셀 수
+        tol (float): 같은 시각으로 볼 허용 오차 (s)
+        dpi (int): 해상도
+        interactive (bool): True 면 plt.show 로 창 띄움
+    Returns:
+        matplotlib.figure.Figure: 그린 figure
+    """
+    if isinstance(reference, str):
+        reference = SOCReference.from_csv(reference)
+    t, soc = _read_estimate(estimate)
+    if reference.indexed:
+        t = np.arange(soc.size, dtype=float)
+    matched, ref_soc = reference.align(t, tol)
+
+    fig, axes = new_figure(2, width_px, dpi=dpi, interactive=interactive)
+    (x, y), = decimate_minmax(reference.time, reference.soc, width_px)
+    axes[0].plot(x, y, linewidth=0.8, label="Reference SOC")
+    (x, y), = decimate_minmax(t, soc, width_px)
+    axes[0].plot(x, y, linewidth=0.8, label="BMS SOC")
+    axes[0].set_ylabel("SOC")
+    axes[0].legend(loc="best")
+
+    (x, y), = decimate_minmax(t[matched], soc[matched] - ref_soc, width_px)
+    axes[1].plot(x, y, linewidth=0.8, color="tab:red")
+    axes[1].axhline(0.0, color="gray", linewidth=0.5)
+    axes[1].set_ylabel("SOC error")
+    axes[1].set_xlabel(TIME_COLUMN)
+    return _finish(fig, out_file, interactive)
@@ -0,0 +1,110 @@
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+HOOKS = (None, "cprofile", "tracemalloc")
+
+
+class StageProfiler:
+    def __init__(self, track_memory=True, hook=None, hook_stages=None, top=15):
+        """
+        파이프라인 단계별 wall time, 초당 샘플 수, peak memory 기록
+        Args:
+            track_memory (bool): tracemalloc 으로 단계별 peak memory 측정 (NumPy 배열 포함,
+                CSV 쓰기처럼 Python 객체를 많이 만드는 단계는 wall time 이 크게 늘어남)
+            hook (str): 단계를 감쌀 상세 profiler (None, "cprofile", "tracemalloc")
+            hook_stages (iterable): hook 을 적용할 단계 이름 (None 이면 전체)
+            top (int): hook 결과에 남길 항목 수
+        """
+        if hook not in HOOKS:
+            raise ValueError(f"Unsupported hook: {hook}")
+        self.track_memory = track_memory
+        self.hook = hook
+        self.hook_stages = None if hook_stages is None else set(hook_stages)
+        self.top = top
+        self.records = []
+
+    def _hooked(self, name):
+        return self.hook is not None and (self.hook_stages is None or name in self.hook_stages)
+
+    @contextmanager
+    def stage(self, name, samples=None):
+        """
+        with 블록을 한 단계로 측정 (블록 안에서 record["samples"] 를 갱신할 수 있음)
+        Args:
+            name (str): 단계 이름
+            samples (int): 처리한 샘플 수 (초당 샘플 수 계산용)
+        Yields:
+            dict: 이 단계의 기록
+        """
+        record = {"stage": name, "samples": samples}
+        hooked = self._hooked(name)
+        own_tracing = (self.track_memory or (hooked and self.hook == "tracemalloc")) \
+            and not tracemalloc.is_tracing()
+        if own_tracing:
+            tracemalloc.start()
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+        profiler = cProfile.Profile() if hooked and self.hook == "cprofile" else None
+        before = tracemalloc.take_snapshot() if hooked and self.hook == "tracemalloc" else None
+
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record["wall_time [s]"] = time.perf_counter() - start
+            if tracemalloc.is_tracing():
+                _, peak = tracemalloc.get_traced_memory()
+                record["peak_memory [MB]"] = (peak - base) / 1024 ** 2
+            if profiler is not None:
+                out = io.StringIO()
+                pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(self.top)
+                record["profile"] = out.getvalue()
+            if before is not None:
+                diff = tracemalloc.take_snapshot().compare_to(before, "lineno")
+                record["profile"] = "\n".join(str(s) for s in diff[:self.top])
+            if own_tracing:
+                tracemalloc.stop()
+            self.records.append(record)
+
+    def report(self):
+        """
+        단계별 기록 표
+        Returns:
+            pandas.DataFrame: stage, samples, wall_time [s], samples/s, peak_memory [MB]
+        """
+        columns = ["stage", "samples", "wall_time [s]", "samples/s", "peak_memory [MB]"]
+        table = pd.DataFrame(self.records).reindex(columns=columns)
+        table["samples/s"] = table["samples"] / table["wall_time [s]"]
+        return table
+
+    def print_report(self):
+        table = self.report()
+        print(table.to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+        for record in self.records:
+            if "profile" in record:
+                print(f"\n[{record['stage']}] {self.hook}")
+                print(record["profile"])
+        return table
+
+
+@contextmanager
+def profile_stage(profiler, name, samples=None):
+    """
+    profiler 가 None 이면 아무것도 하지 않는 StageProfiler.stage
+    """
+    if profiler is None:
+        yield {"stage": name, "samples": samples}
+    else:
+        with profiler.stage(name, samples) as record:
+            yield record
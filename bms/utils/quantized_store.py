@@ -0,0 +1,209 @@
+import json
+import os
+
+import numpy as np
+
+from adc.calibration import default_calibrations, ranges_bits, ranges_from_calibrations
+
+MAGIC = b"QADC"
+VERSION = 1
+HEADER_SIZE = 1024  # magic + JSON header (고정 크기, 이후 레코드 영역)
+
+# CSV 출력 옆에 저장하는 디코딩 설정 파일 (ADC.ranges() 형식 JSON) 의 접미어
+RANGES_SUFFIX = ".ranges.json"
+
+QUANTIZED_COLUMNS = [
+    "Quantized Cell current [A]",
+    "Quantized Terminal voltage [V]",
+    "Quantized X-averaged cell temperature [K]",
+]
+
+
+def code_dtype(adc_bits):
+    """
+    adc_bits 를 담을 수 있는 가장 작은 부호 없는 정수형
+    Args:
+        adc_bits (int): ADC 비트 수
+    Returns:
+        numpy.dtype: uint8 / uint16 / uint32 / uint64 (little-endian)
+    """
+    for bits in (8, 16, 32, 64):
+        if adc_bits <= bits:
+            return np.dtype(f"<u{bits // 8}")
+    raise ValueError(f"Unsupported adc_bits: {adc_bits}")
+
+
+def record_dtype(adc_bits):
+    """
+    샘플 하나의 레코드 형식 (타임스탬프 + 채널별 코드, padding 없음)
+    """
+    return np.dtype([("time", "<f8"), ("codes", code_dtype(adc_bits), (len(QUANTIZED_COLUMNS),))])
+
+
+def _header_bytes(header):
+    body = json.dumps(header).encode()
+    if len(MAGIC) + len(body) > HEADER_SIZE:
+        raise ValueError("Quantized file header too large")
+    return (MAGIC + body).ljust(HEADER_SIZE, b" ")
+
+
+class QuantizedWriter:
+    def __init__(self, path, ranges, adc_bits):
+        """
+        양자화 코드를 블록 단위로 이어 쓰는 binary writer
+        Args:
+            path (str): 저장 경로 (.qadc)
+            ranges (dict): ADC.ranges() 형식의 채널 범위 (채널별 비트 수 "<prefix>_bits" 포함)
+            adc_bits (int): 코드 저장 비트 수 (채널마다 비트 수가 다르면 가장 넓은 채널 이상)
+        """
+        self.path = path
+        self.channel_bits = ranges_bits(ranges)
+        if max(self.channel_bits) > adc_bits:
+            raise ValueError(f"adc_bits {adc_bits} is narrower than channel bits {self.channel_bits}")
+        self.dtype = record_dtype(adc_bits)
+        self.header = {
+            "version": VERSION,
+            "adc_bits": int(adc_bits),
+            "channel_bits": self.channel_bits,
+            "ranges": {k: float(v) for k, v in ranges.items()},
+            "channels": QUANTIZED_COLUMNS,
+            "record_dtype": self.dtype.descr,
+            "n_samples": 0,
+        }
+        self.f = open(path, "wb")
+        self.f.write(_header_bytes(self.header))
+
+    def append(self, time_stamps, codes):
+        """
+        블록 추가
+        Args:
+            time_stamps (numpy.array): (samples,) 타임스탬프 (s)
+            codes (numpy.array): (samples, 3) 양자화 코드 (QUANTIZED_COLUMNS 순서)
+        """
+        codes = np.asarray(codes)
+        limits = 2 ** np.array(self.channel_bits, dtype=np.int64) - 1
+        if codes.size and (codes.min() < 0 or np.any(codes.max(axis=0) > limits)):
+            raise ValueError("Quantized codes out of range for channel bits")
+        records = np.empty(len(time_stamps), dtype=self.dtype)
+        records["time"] = time_stamps
+        records["codes"] = codes
+        self.f.write(records.tobytes())
+        self.header["n_samples"] += len(records)
+
+    def close(self):
+        """
+        헤더의 샘플 수를 갱신하고 파일 닫기
+        """
+        if self.f.closed:
+            return
+        self.f.seek(0)
+        self.f.write(_header_bytes(self.header))
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def save_quantized(path, time_stamps, codes, ranges, adc_bits):
+    """
+    양자화 결과를 한 번에 저장
+    Args:
+        path (str): 저장 경로 (.qadc)
+        time_stamps (numpy.array): (samples,) 타임스탬프 (s)
+        codes (numpy.array): (samples, 3) 양자화 코드
+        ranges (dict): ADC.ranges() 형식의 채널 범위
+        adc_bits (int): ADC 비트 수
+    Returns:
+        str: 저장 경로
+    """
+    with QuantizedWriter(path, ranges, adc_bits) as writer:
+        writer.append(time_stamps, codes)
+    return path
+
+
+def read_header(path):
+    """
+    .qadc 파일 헤더 읽기
+    Args:
+        path (str): 파일 경로
+    Returns:
+        dict: 헤더 (adc_bits, ranges, n_samples 등)
+    """
+    with open(path, "rb") as f:
+        raw = f.read(HEADER_SIZE)
+    if not raw.startswith(MAGIC):
+        raise ValueError(f"Not a quantized ADC file: {path}")
+    return json.loads(raw[len(MAGIC):].decode().rstrip())
+
+
+def open_quantized(path):
+    """
+    .qadc 파일을 복사 없이 memory-map 으로 열기
+    Args:
+        path (str): 파일 경로
+    Returns:
+        dict: "Time [s]" 및 QUANTIZED_COLUMNS 채널별 memmap view, "header"
+    """
+    header = read_header(path)
+    dtype = record_dtype(header["adc_bits"])
+    n = header["n_samples"]
+    if n == 0:
+        records = np.empty(0, dtype=dtype)
+    else:
+        records = np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(n,))
+    data = {"header": header, "Time [s]": records["time"]}
+    for k, col in enumerate(QUANTIZED_COLUMNS):
+        data[col] = records["codes"][:, k]
+    return data
+
+
+def is_quantized_file(path):
+    """
+    .qadc 형식 여부 (확장자 기준)
+    """
+    return os.path.splitext(path)[1].lower() == ".qadc"
+
+
+def ranges_path(path):
+    """
+    CSV 출력의 디코딩 설정 파일 경로 (<CSV 경로>.ranges.json)
+    """
+    return path + RANGES_SUFFIX
+
+
+def save_ranges(path, ranges):
+    """
+    CSV 출력 옆에 채널별 비트 수/범위/trim 을 저장 (.qadc 는 헤더에 같은 값이 있음)
+    Args:
+        path (str): CSV 경로
+        ranges (dict): ADC.ranges() 형식의 디코딩 설정
+    Returns:
+        str: 설정 파일 경로
+    """
+    with open(ranges_path(path), "w") as f:
+        json.dump(ranges, f, indent=1)
+    return ranges_path(path)
+
+
+def csv_ranges(path, adc_bits=None):
+    """
+    CSV 입력의 디코딩 설정 (ADC 가 함께 저장한 설정 파일, 없으면 이전 형식으로 보고 기본 범위)
+    Args:
+        path (str): CSV 경로
+        adc_bits (int): 설정 파일이 없는 CSV 의 ADC 비트 수 (None 이면 16),
+            설정 파일이 있으면 모든 채널의 비트 수와 같아야 함
+    Returns:
+        dict: ADC.ranges() 형식의 디코딩 설정
+    """
+    try:
+        with open(ranges_path(path)) as f:
+            ranges = json.load(f)
+    except FileNotFoundError:
+        return ranges_from_calibrations(default_calibrations(16 if adc_bits is None else adc_bits))
+    channel_bits = ranges_bits(ranges)
+    if adc_bits is not None and any(bits != adc_bits for bits in channel_bits):
+        raise ValueError(f"{path} was written with channel bits {channel_bits}, not adc_bits={adc_bits}")
+    return ranges
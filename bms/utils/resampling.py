@@ -0,0 +1,117 @@
+import numpy as np
+
+
+def cumulative_charge(current, time_stamps):
+    """
+    샘플 k 의 전류가 (t[k-1], t[k]] 동안 일정하다고 보고 누적 전하 계산 (rectangular 적분과 동일)
+    Args:
+        current (numpy.array): 전류 (A)
+        time_stamps (numpy.array): 타임스탬프 (s)
+    Returns:
+        numpy.array: 각 타임스탬프까지의 누적 전하 (A*s), 첫 값은 0
+    """
+    current = np.asarray(current, dtype=float)
+    charge = np.zeros(current.shape)
+    charge[1:] = np.cumsum(current[1:] * np.diff(np.asarray(time_stamps, dtype=float)))
+    return charge
+
+
+def _bin_means(values, weights, starts):
+    # 구간별 시간 가중 평균 (첫 샘플은 가중치 0 이므로 그대로 둠)
+    sums = np.add.reduceat(values * weights, starts)
+    totals = np.add.reduceat(weights, starts)
+    return np.divide(sums, totals, out=values[starts].astype(float), where=totals > 0)
+
+
+def decimate(current, voltage, temp, time_stamps, interval):
+    """
+    interval 보다 촘촘한 구간만 묶는 전하 보존 decimation (느린 구간의 샘플은 그대로 유지)
+    출력 샘플은 각 구간의 마지막 타임스탬프를 쓰고, 전류는 구간 전하 / 구간 길이이므로
+    rectangular Coulomb Counting 결과가 원본과 같음 (구간 안에서 충/방전이 섞이면 효율 적용만 달라짐)
+    Args:
+        current (numpy.array): 전류 (A)
+        voltage (numpy.array): 전압 (V)
+        temp (numpy.array): 온도 (K)
+        time_stamps (numpy.array): 타임스탬프 (s), 오름차순
+        interval (float): 최소 출력 샘플 간격 (s)
+    Returns:
+        tuple: (current, voltage, temp, time_stamps) decimation 결과 (전압/온도는 시간 가중 평균)
+    """
+    current = np.asarray(current, dtype=float)
+    voltage = np.asarray(voltage, dtype=float)
+    temp = np.asarray(temp, dtype=float)
+    t = np.asarray(time_stamps, dtype=float)
+    if t.size < 2:
+        return current.copy(), voltage.copy(), temp.copy(), t.copy()
+
+    # 구간 번호: 첫 샘플은 단독 구간, 이후는 (t - t0) / interval 의 올림
+    bins = np.ceil((t - t[0]) / interval)
+    bins[0] = -1
+    starts = np.flatnonzero(np.diff(bins, prepend=bins[0] - 1))
+    ends = np.append(starts[1:] - 1, t.size - 1)
+
+    weights = np.zeros(t.shape)
+    weights[1:] = np.diff(t)
+    return (
+        _bin_means(current, weights, starts),
+        _bin_means(voltage, weights, starts),
+        _bin_means(temp, weights, starts),
+        t[ends],
+    )
+
+
+def resample_uniform(current, voltage, temp, time_stamps, period):
+    """
+    균일 간격 grid 로 전하 보존 resampling (전류는 누적 전하의 차분, 전압/온도는 선형 보간)
+    Args:
+        current (numpy.array): 전류 (A)
+        voltage (numpy.array): 전압 (V)
+        temp (numpy.array): 온도 (K)
+        time_stamps (numpy.array): 타임스탬프 (s), 오름차순
+        period (float): 출력 샘플 간격 (s)
+    Returns:
+        tuple: (current, voltage, temp, time_stamps) resampling 결과 (grid 는 t[0] 부터 t[-1] 이하)
+    """
+    t = np.asarray(time_stamps, dtype=float)
+    if t.size == 0:
+        return np.empty(0), np.empty(0), np.empty(0), np.empty(0)
+    grid = t[0] + period * np.arange(int(np.floor((t[-1] - t[0]) / period)) + 1)
+
+    # 샘플 사이에서 전류가 일정하므로 누적 전하는 구간별 선형, np.interp 가 정확한 값
+    charge = np.interp(grid, t, cumulative_charge(current, t))
+    grid_current = np.empty(grid.shape)
+    grid_current[0] = float(np.asarray(current, dtype=float)[0])
+    grid_current[1:] = np.diff(charge) / period
+    return (
+        grid_current,
+        np.interp(grid, t, np.asarray(voltage, dtype=float)),
+        np.interp(grid, t, np.asarray(temp, dtype=float)),
+        grid,
+    )
+
+
+# resample 옵션의 방식 이름
+RESAMPLE_METHODS = {"decimate": decimate, "uniform": resample_uniform}
+
+
+def resample_samples(current, voltage, temp, time_stamps, resample):
+    """
+    run_bms / run_pipeline 의 resample 옵션 적용 (추정 전에 디코딩 값에 적용)
+    Args:
+        current (numpy.array): 전류 (A)
+        voltage (numpy.array): 전압 (V)
+        temp (numpy.array): 온도 (K)
+        time_stamps (numpy.array): 타임스탬프 (s), 오름차순
+        resample (tuple): (방식, 간격 s), 방식은 "decimate" (decimate) 또는 "uniform" (resample_uniform),
+            None 이면 그대로 반환
+    Returns:
+        tuple: (current, voltage, temp, time_stamps)
+    """
+    if resample is None:
+        return current, voltage, temp, time_stamps
+    method, interval = resample
+    if method not in RESAMPLE_METHODS:
+        raise ValueError(f"Unsupported resample method: {method}")
+    if interval <= 0:
+        raise ValueError("resample interval must be positive")
+    return RESAMPLE_METHODS[method](current, voltage, temp, time_stamps, interval)
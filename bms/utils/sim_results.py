@@ -0,0 +1,180 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+TIME_COLUMN = "Time [s]"
+
+# BatterySimulation.get_results 가 저장하는 셀 단위 변수
+CELL_COLUMNS = [
+    "Cell current [A]",
+    "Terminal voltage [V]",
+    "X-averaged cell temperature [K]",
+    "Battery open-circuit voltage [V]",
+    "Cell internal resistance [Ohm]",
+]
+
+FORMATS = {".csv": "csv", ".npz": "npz", ".npy": "npy", ".parquet": "parquet", ".store": "store"}
+
+
+def _format_of(path, fmt):
+    if fmt is not None:
+        return fmt
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Unsupported result format: {ext}")
+    return FORMATS[ext]
+
+
+def _cell_column(name, cell, n_cells):
+    return name if n_cells == 1 else f"{name} #{cell}"
+
+
+def collect_results(output, columns=CELL_COLUMNS):
+    """
+    lp.solve 출력에서 저장할 변수만 float 배열로 정리
+    Args:
+        output (dict): lp.solve 결과 (셀 변수는 (time, cells) 배열)
+        columns (list): 저장할 셀 변수 이름
+    Returns:
+        dict: "Time [s]" 는 (time,), 셀 변수는 (time, cells) float64 배열
+    """
+    data = {TIME_COLUMN: np.asarray(output[TIME_COLUMN], dtype=float).ravel()}
+    n = data[TIME_COLUMN].size
+    for name in columns:
+        data[name] = np.asarray(output[name], dtype=float).reshape(n, -1)
+    return data
+
+
+def to_frame(data):
+    """
+    결과 dict 를 컬럼형 DataFrame 으로 변환 (셀이 여러 개면 "이름 #셀번호" 컬럼)
+    Args:
+        data (dict): collect_results / load_results 형식의 배열 dict
+    Returns:
+        pandas.DataFrame: float 컬럼 DataFrame
+    """
+    frame = {TIME_COLUMN: data[TIME_COLUMN]}
+    for name, values in data.items():
+        if name == TIME_COLUMN:
+            continue
+        values = values.reshape(len(data[TIME_COLUMN]), -1)
+        for cell in range(values.shape[1]):
+            frame[_cell_column(name, cell, values.shape[1])] = values[:, cell]
+    return pd.DataFrame(frame)
+
+
+def save_results(output, path, fmt=None, columns=CELL_COLUMNS):
+    """
+    시뮬레이션 결과를 한 번에 저장
+    Args:
+        output (dict): lp.solve 결과 또는 collect_results 결과
+        path (str): 저장 경로
+        fmt (str): "csv", "npz", "npy"(memory-map 용 structured 배열), "parquet",
+            "store"(변수별 memory-map 디렉터리, utils.array_store) (None 이면 확장자로 판단)
+        columns (list): 저장할 셀 변수 이름
+    Returns:
+        str: 저장 경로
+    """
+    fmt = _format_of(path, fmt)
+    if fmt == "store":
+        from utils.array_store import save_store
+
+        return save_store(output, path, columns=columns)
+    data = collect_results(output, columns)
+
+    if fmt == "csv":
+        to_frame(data).to_csv(path, index=False)
+    elif fmt == "parquet":
+        try:
+            to_frame(data).to_parquet(path, index=False)
+        except ImportError as e:
+            raise ImportError("Parquet export requires pyarrow or fastparquet") from e
+    elif fmt == "npz":
+        np.savez(path, **data)
+    elif fmt == "npy":
+        n = data[TIME_COLUMN].size
+        dtype = [(name, "<f8", values.shape[1:]) for name, values in data.items()]
+        arr = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(n,))
+        for name, values in data.items():
+            arr[name] = values
+        arr.flush()
+        del arr
+    else:
+        raise ValueError(f"Unsupported result format: {fmt}")
+    return path
+
+
+def _frame_to_results(df):
+    # 이전 버전의 "[값]" 문자열 컬럼도 읽을 수 있도록 변환
+    for col in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col].astype(str).str.strip("[]"), errors="coerce")
+
+    data = {TIME_COLUMN: df[TIME_COLUMN].to_numpy(dtype=float)}
+    for name in CELL_COLUMNS:
+        if name in df.columns:
+            data[name] = df[[name]].to_numpy(dtype=float)
+            continue
+        cells = [c for c in df.columns if c.startswith(f"{name} #")]
+        if cells:
+            cells.sort(key=lambda c: int(c.rsplit("#", 1)[1]))
+            data[name] = df[cells].to_numpy(dtype=float)
+    return data
+
+
+def load_results(path, fmt=None, mmap=True):
+    """
+    save_results 로 저장한 결과 읽기
+    Args:
+        path (str): 결과 파일 경로
+        fmt (str): 파일 형식 (None 이면 확장자로 판단)
+        mmap (bool): npy / store 형식일 때 memory-map 으로 열지 여부
+    Returns:
+        dict: "Time [s]" 는 (time,), 셀 변수는 (time, cells) float 배열
+    """
+    fmt = _format_of(path, fmt)
+    if fmt == "csv":
+        return _frame_to_results(pd.read_csv(path))
+    if fmt == "parquet":
+        return _frame_to_results(pd.read_parquet(path))
+    if fmt == "npz":
+        with np.load(path) as npz:
+            return {name: npz[name] for name in npz.files}
+    if fmt == "npy":
+        arr = np.load(path, mmap_mode="r" if mmap else None)
+        n = arr.shape[0]
+        return {name: arr[name].reshape(n, -1) if name != TIME_COLUMN else arr[name]
+                for name in arr.dtype.names}
+    if fmt == "store":
+        from utils.array_store import ArrayStore
+
+        store = ArrayStore(path)
+        return {name: store[name] if mmap else np.array(store[name]) for name in store}
+    raise ValueError(f"Unsupported result format: {fmt}")
+
+
+def iter_results(path, chunk_size=None, fmt=None):
+    """
+    결과 파일을 chunk_size 샘플 단위 블록으로 읽는 generator
+    Args:
+        path (str): 결과 파일 경로
+        chunk_size (int): 블록 크기 (None 이면 전체를 한 블록으로)
+        fmt (str): 파일 형식 (None 이면 확장자로 판단)
+    Yields:
+        dict: load_results 형식의 블록
+    """
+    fmt = _format_of(path, fmt)
+    if chunk_size is None:
+        yield load_results(path, fmt)
+        return
+    if fmt == "csv":
+        for chunk in pd.read_csv(path, chunksize=chunk_size):
+            yield _frame_to_results(chunk)
+        return
+
+    # npy / store 는 memory-map 이므로 블록을 잘라도 필요한 부분만 읽음
+    data = load_results(path, fmt)
+    n = len(data[TIME_COLUMN])
+    for start in range(0, n, chunk_size):
+        yield {name: np.asarray(values[start:start + chunk_size]) for name, values in data.items()}
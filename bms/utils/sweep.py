@@ -0,0 +1,167 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from bms.batch_estimator import estimate_soc_batch, get_thresholds
+from utils.evaluation import ErrorAccumulator, SOCReference
+
+# sweep 대상 BMS_configuration 키
+SWEEP_KEYS = [
+    "alpha", "charging_eta", "discharging_eta",
+    "i_low", "i_ocv", "t_relx_minutes", "t_ocv_minutes",
+]
+
+# 워커 프로세스별 입력 (initializer 에서 shared memory 에 연결)
+_worker = {}
+
+
+def parameter_grid(space):
+    """
+    grid search 조합 생성
+    Args:
+        space (dict): 키 -> 후보 값 리스트
+    Returns:
+        list: 파라미터 dict 리스트
+    """
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def random_search(space, n_samples, seed=0):
+    """
+    random search 조합 생성
+    Args:
+        space (dict): 키 -> 후보 값 리스트 또는 (low, high) 균등분포 구간
+        n_samples (int): 생성할 조합 수
+        seed (int): 난수 시드
+    Returns:
+        list: 파라미터 dict 리스트
+    """
+    rng = np.random.default_rng(seed)
+    params = []
+    for _ in range(n_samples):
+        p = {}
+        for key, values in space.items():
+            if isinstance(values, tuple):
+                p[key] = float(rng.uniform(values[0], values[1]))
+            else:
+                p[key] = values[int(rng.integers(len(values)))]
+        params.append(p)
+    return params
+
+
+def _share(arrays):
+    blocks, spec = [], {}
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr, dtype=float)
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+        blocks.append(shm)
+        spec[name] = (shm.name, arr.shape)
+    return blocks, spec
+
+
+def _init_worker(spec, settings):
+    _worker["blocks"] = []
+    for name, (shm_name, shape) in spec.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _worker["blocks"].append(shm)
+        _worker[name] = np.ndarray(shape, dtype=float, buffer=shm.buf)
+    _worker["settings"] = settings
+
+
+def _score(arrays, settings, params):
+    config = dict(settings["BMS_configuration"])
+    config.update(params)
+    soc = estimate_soc_batch(
+        arrays["current"], arrays["voltage"], arrays["time"],
+        settings["initial_soc"], settings["np_value"], settings["capacity"],
+        config, settings["mode"],
+    )
+    # 기준 시각이 있는 샘플만 채점 (reference 는 기준 시각이 없는 샘플이 NaN)
+    matched = ~np.isnan(arrays["reference"])
+    acc = ErrorAccumulator(get_thresholds(config))
+    acc.update(arrays["time"][matched], soc[matched] - arrays["reference"][matched], arrays["current"][matched])
+    overall = acc.result()["overall"]
+    return overall["mse"], overall["mae"], overall["max_error"], overall["max_time"]
+
+
+def _score_worker(job):
+    index, params = job
+    return index, _score(_worker, _worker["settings"], params)
+
+
+def run_sweep(param_sets, BMS_configuration, initial_soc, np_value, capacity,
+              current, voltage, time_stamps, reference,
+              mode="current-voltage", n_workers=None, chunksize=8, tol=1e-6):
+    """
+    BMS 파라미터 조합별 SOC 추정 후 compute_MSE 와 같은 기준 (기준 SOC 와 "Time [s]" 로 맞춘 오차) 으로 순위 매기기
+    Args:
+        param_sets (list): parameter_grid / random_search 결과 (SWEEP_KEYS 중 일부)
+        BMS_configuration (dict): 기본 BMS 설정값 (load_table 로 테이블이 로드된 상태)
+        initial_soc (float): 초기 SOC
+        np_value (int): 병렬 연결된 셀의 수
+        capacity (float): 배터리의 정격 용량 (Ah)
+        current (numpy.array): 디코딩된 전류 (A)
+        voltage (numpy.array): 디코딩된 전압 (V)
+        time_stamps (numpy.array): 타임스탬프 (s)
+        reference (SOCReference or str): 기준 SOC 또는 soc_log.csv 경로
+        mode (str): SOC 추정 모드
+        n_workers (int): 프로세스 풀 크기 (None 또는 1 이면 현재 프로세스에서 실행)
+        chunksize (int): 워커에 한 번에 넘기는 조합 수
+        tol (float): 같은 시각으로 볼 허용 오차 (s)
+    Returns:
+        pandas.DataFrame: 파라미터, mse, mae, max_error, max_time, rank (mse 오름차순)
+            (기준 시각이 있는 샘플 수는 attrs["samples"])
+    """
+    for params in param_sets:
+        unknown = set(params) - set(SWEEP_KEYS)
+        if unknown:
+            raise ValueError(f"Unsupported sweep keys: {sorted(unknown)}")
+
+    # 기준 SOC 정렬은 조합과 무관하므로 한 번만 계산
+    if isinstance(reference, str):
+        reference = SOCReference.from_csv(reference)
+    time_stamps = np.asarray(time_stamps, dtype=float)
+    t = np.arange(time_stamps.size, dtype=float) if reference.indexed else time_stamps
+    matched, ref_soc = reference.align(t, tol)
+    aligned = np.full(time_stamps.size, np.nan)
+    aligned[matched] = ref_soc
+
+    arrays = {
+        "current": current, "voltage": voltage,
+        "time": time_stamps, "reference": aligned,
+    }
+    settings = {
+        "BMS_configuration": BMS_configuration, "initial_soc": initial_soc,
+        "np_value": np_value, "capacity": capacity, "mode": mode,
+    }
+
+    scores = [None] * len(param_sets)
+    if not n_workers or n_workers <= 1:
+        arrays = {name: np.asarray(arr, dtype=float) for name, arr in arrays.items()}
+        for i, params in enumerate(param_sets):
+            scores[i] = _score(arrays, settings, params)
+    else:
+        blocks, spec = _share(arrays)
+        try:
+            with ProcessPoolExecutor(max_workers=min(n_workers, os.cpu_count() or 1),
+                                     initializer=_init_worker, initargs=(spec, settings)) as pool:
+                for i, score in pool.map(_score_worker, enumerate(param_sets), chunksize=chunksize):
+                    scores[i] = score
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+    table = pd.DataFrame(param_sets)
+    for k, name in enumerate(("mse", "mae", "max_error", "max_time")):
+        table[name] = [s[k] for s in scores]
+    table = table.sort_values("mse", kind="stable").reset_index(drop=True)
+    table["rank"] = np.arange(1, len(table) + 1)
+    table.attrs["samples"] = int(np.count_nonzero(matched))
+    return table